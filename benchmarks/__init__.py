@@ -0,0 +1,5 @@
+"""
+Benchmark suite for cf_cell_methods.
+
+Run with `python -m benchmarks --help` from the root of the repository.
+"""
@@ -0,0 +1,4 @@
+import sys
+from benchmarks.cli import main
+
+sys.exit(main())
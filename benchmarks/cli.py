@@ -0,0 +1,113 @@
+"""
+Command line interface of the benchmark suite.
+
+    python -m benchmarks [-k SUBSTRING ...] [--json OUTPUT]
+        [--baseline BASELINE --threshold FRACTION]
+
+With --baseline, the results are compared with those in a JSON file
+written by a previous run with --json, and the exit status is 1 if any
+benchmark is slower by more than the threshold.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from benchmarks import corpus, suite, timing
+
+
+def run(benchmarks, repeat=7, min_time=0.05, warmup=1, log=None):
+    """Measure each benchmark. Return a dict of name to measurement."""
+    results = {}
+    for benchmark in benchmarks:
+        case = benchmark.setup()
+        results[benchmark.name] = result = timing.measure(
+            case.func,
+            ops=case.ops,
+            repeat=repeat,
+            min_time=min_time,
+            warmup=warmup,
+        )
+        if case.size is not None:
+            result["size"] = case.size
+        if log:
+            log(
+                f"{benchmark.name:<64} {result['median'] * 1e6:12.3f} us "
+                f"± {result['iqr'] * 1e6:.3f}"
+                + (
+                    f" ({case.size:.1f} bytes)"
+                    if case.size is not None else ""
+                )
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "-k", dest="select", action="append",
+        help="Run benchmarks whose names contain this substring "
+             "(may be repeated)",
+    )
+    parser.add_argument("--list", action="store_true", help="List and exit")
+    parser.add_argument("--size", type=int, default=200,
+                        help="Number of strings per corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=7,
+                        help="Number of samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="Minimum duration (s) of a sample")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Number of discarded samples")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline",
+                        help="Compare with results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Fractional slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    benchmarks = suite.select(
+        suite.benchmarks(corpus.generate(args.size, args.seed)), args.select
+    )
+    if args.list:
+        for benchmark in benchmarks:
+            print(benchmark.name)
+        return 0
+
+    results = run(
+        benchmarks,
+        repeat=args.repeat,
+        min_time=args.min_time,
+        warmup=args.warmup,
+        log=print,
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                        "args": vars(args),
+                    },
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = timing.compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r.name}: {r.baseline * 1e6:.3f} us -> "
+                f"{r.current * 1e6:.3f} us ({r.ratio:.2f}x)",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
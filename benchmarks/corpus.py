@@ -0,0 +1,140 @@
+"""
+Generation of realistic corpora of cell_methods strings.
+
+Corpora are generated from a seeded random number generator, so a given
+seed and size always produce the same strings.
+"""
+import random
+from cf_cell_methods.semantics import conventional_methods
+
+
+axes = ("time", "lat", "lon", "area", "depth", "height", "plev", "models")
+methods = tuple(sorted(conventional_methods - {"num", "name"}))
+clauses = (
+    "",
+    "",
+    " where land",
+    " where sea_ice over sea",
+    " over years",
+    " over days",
+    " within days",
+    " within years",
+)
+units = ("day", "days", "hours", "minutes", "years", "km", "degree_N")
+words = (
+    "sampled", "instantaneously", "every", "hour", "from", "the", "model",
+    "output", "regridded", "to", "a", "common", "grid", "using", "bilinear",
+    "interpolation", "ensemble", "member", "r1i1p1", "bias", "corrected",
+)
+
+# Strings of the hydrology comparators in `cf_cell_methods.semantics`.
+hydrology = (
+    "time: mean within days",
+    "time: mean within days time: mean over days",
+    "time: mean within days time: max over days time: mean over days",
+    "time: mean within days time: max over days time: mean over days "
+    "models: mean",
+    "time: mean within days time: max over days time: mean over days "
+    "models: percentile[5]",
+)
+
+
+class Generator:
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+
+    def comment(self, size):
+        words_ = []
+        length = 0
+        while length < size:
+            word = self.rng.choice(words)
+            words_.append(word)
+            length += len(word) + 1
+        return " ".join(words_)
+
+    def extra_info(self, comment_size=40, interval_only=0.4):
+        choice = self.rng.random()
+        interval = (
+            f"interval: {self.rng.randint(1, 60)} {self.rng.choice(units)}"
+        )
+        if choice < interval_only:
+            return f" ({interval})"
+        if choice < (1 + interval_only) / 2:
+            return f" ({self.comment(comment_size)})"
+        return f" ({interval} comment: {self.comment(comment_size)})"
+
+    def method(self, percentile=0.1, max_params=1):
+        if self.rng.random() < percentile:
+            params = ",".join(
+                str(self.rng.choice((1, 5, 10, 25, 50, 75, 90, 95, 99)))
+                for _ in range(self.rng.randint(1, max_params))
+            )
+            return f"percentile[{params}]"
+        return self.rng.choice(methods)
+
+    def cell_method(
+        self,
+        extra_info=0.2,
+        comment_size=40,
+        interval_only=0.4,
+        percentile=0.1,
+        max_params=1,
+    ):
+        return "".join((
+            f"{self.rng.choice(axes)}: ",
+            self.method(percentile, max_params),
+            self.rng.choice(clauses),
+            self.extra_info(comment_size, interval_only)
+            if self.rng.random() < extra_info else "",
+        ))
+
+    def cell_methods(self, min_count, max_count, spacing=" ", **kwargs):
+        return spacing.join(
+            self.cell_method(**kwargs)
+            for _ in range(self.rng.randint(min_count, max_count))
+        )
+
+
+def generate(size=200, seed=0):
+    """
+    Return a dict of named corpora, each a list of `size` strings:
+
+    - short: a single cell method without clauses or extra info
+    - long: several cell methods with clauses and some extra info
+    - many: chains of 50 cell methods
+    - comment: extra info with long (1KB to 10KB) comments
+    - percentile: percentile methods with up to three parameters
+    - hydrology: the hydrology comparator strings, variously spaced
+    """
+    generator = Generator(seed)
+    rng = generator.rng
+    return {
+        "short": [
+            f"{rng.choice(axes)}: {rng.choice(methods)}" for _ in range(size)
+        ],
+        "long": [
+            generator.cell_methods(2, 6, extra_info=0.3) for _ in range(size)
+        ],
+        "many": [
+            generator.cell_methods(50, 50, extra_info=0.1)
+            for _ in range(size)
+        ],
+        "comment": [
+            generator.cell_methods(
+                1,
+                2,
+                extra_info=1,
+                comment_size=rng.randint(1000, 10000),
+                interval_only=0,
+            )
+            for _ in range(size)
+        ],
+        "percentile": [
+            generator.cell_methods(1, 4, percentile=0.8, max_params=3)
+            for _ in range(size)
+        ],
+        "hydrology": [
+            rng.choice(hydrology).replace(": ", rng.choice((": ", ":", " : ")))
+            for _ in range(size)
+        ],
+    }
@@ -0,0 +1,948 @@
+"""
+The benchmarks.
+
+Benchmarks are named `<stage>/<corpus>`, where the stage is one of
+
+- lex: tokenization by the SLY lexer
+- parse.sly, parse.fast: parsing by each engine
+- parse.sly.bytes, parse.fast.bytes: parsing UTF-8 encoded bytes
+- build: building representations from scanned (fast parser) matches
+- str: serialization of representations
+- round_trip: serialization and reparsing
+- eq: equality of representations; "eq.comparators" compares each with
+  the representations of the hydrology comparator strings, as `__eq__`
+  does now and as it did by splitting field names per call ("split")
+- match: `CellMethod.match` on representations, and "compiled" (a
+  `MatchSpec`); "matchers" uses `AnyOf` and `Regex`
+- pattern: compiled pattern matching, on strings and on representations
+- semantics.<predicate>: each predicate in `cf_cell_methods.semantics`,
+  including the batch validators over a `CellMethodsTable`
+- extra_info.<engine>: parsing the content of extra info, by the
+  "scan"ner of `cf_cell_methods.extra_info` and by the "regex" it replaced,
+  over the extra info of corpora, 10 KB comments, and several intervals
+- canonical.<stage>: the canonical form and fingerprint of strings,
+  compared with `str` of the parse result ("str_parse")
+- persistent.<run>: parsing through a `PersistentCache`, opened on an
+  empty ("cold") or a filled ("warm") database, including opening and
+  closing it; compare with parse.sly
+- serialize.<format>.<stage>: encoding ("dumps") and decoding ("loads")
+  lists of parse results, in the "binary" format of
+  `cf_cell_methods.binary`, with "pickle", and as "str" (decoding by
+  parsing with the fast engine); with the size of the encoding per string
+- async.<mode>: parsing concurrent requests in an asyncio event loop:
+  "inline" (blocking the loop), "executor" (`run_in_executor` per string)
+  and "aparse" (batched by `cf_cell_methods.aio`), including starting
+  and closing the loop
+- classify: classification against a registry of 1000 patterns
+- table.<stage>: building a `CellMethodsTable` from representations, and
+  selecting rows from it, compared with scanning the representations
+- scaling.<stage>.<n>: parsing, serializing (mutable and frozen) and
+  slicing chains of n cell methods; times are per cell method, so they
+  should not grow with n; "edit", re-parsing a chain incrementally
+  after typing or deleting a character in its middle, per edit; and
+  "edit.malformed", the same for deleting and retyping a colon, which
+  makes the chain malformed in between, and so parsed in full
+- instrumentation.<mode>.<engine>: parsing with instrumentation "off" and
+  "on", and "bare" (calling the engine's lexer and parser, or scanner,
+  directly), which bounds the cost of the disabled hooks
+- diagnose: parsing with structured diagnostics (`diagnose_many`) of valid
+  and malformed strings, compared with `parse` of malformed strings, which
+  prints its errors (here, to the null device)
+- import.<stage>: starting a Python process that imports nothing ("none"),
+  `cf_cell_methods.semantics` ("package"), and that also parses a string
+  ("first_parse"); the differences are the costs of the import and of
+  loading the SLY lexer and parser
+- parallel.<engine>.<workers>: parse_parallel (not run by default)
+
+and the corpus is one of the corpora of `benchmarks.corpus.generate`.
+Times are per string (per cell method for `match`).
+"""
+import asyncio
+import contextlib
+import itertools
+import os
+import pickle
+import random
+import re
+import subprocess
+import sys
+import tempfile
+from collections import namedtuple
+from functools import partial
+from operator import eq as _eq
+from benchmarks import corpus
+from cf_cell_methods import (
+    parse, fast_parser, representation, semantics, instrumentation,
+)
+from cf_cell_methods.lexer import CfcmLexer
+from cf_cell_methods.parser import CfcmParser
+from cf_cell_methods.patterns import compile_pattern, PatternSet
+from cf_cell_methods.classifier import Classifier
+from cf_cell_methods.table import CellMethodsTable
+from cf_cell_methods.incremental import IncrementalParse
+from cf_cell_methods.diagnostics import diagnose_many
+from cf_cell_methods.extra_info import parse_extra_info
+from cf_cell_methods.canonical import canonicalize, fingerprint
+from cf_cell_methods.persistent import PersistentCache
+from cf_cell_methods import binary
+from cf_cell_methods.aio import AsyncParser
+from cf_cell_methods.matching import AnyOf, Regex, compile_match
+
+
+# A benchmark is set up (its data built) only when it is run: `setup()`
+# returns its `Case`, the callable timed and the number of operations per
+# call (and the size of its output per operation, for some).
+Benchmark = namedtuple("Benchmark", "name setup default")
+Case = namedtuple("Case", "func ops size")
+
+
+def _case(func, ops, size=None):
+    return Case(func, ops, size)
+
+
+def _group(names, build, default=True):
+    """
+    Return benchmarks of the given names, whose cases share data: on the
+    first setup of any of them, `build()` returns the cases of all, as a
+    dict of name to `Case`.
+    """
+    cases = []
+
+    def setup(name):
+        if not cases:
+            cases.append(build())
+        return cases[0][name]
+
+    return [
+        Benchmark(name, partial(setup, name), default) for name in names
+    ]
+
+
+def _parse(string):
+    return parse(string, engine="fast")
+
+
+_stage_names = (
+    "lex",
+    "parse.sly",
+    "parse.fast",
+    "parse.sly.bytes",
+    "parse.fast.bytes",
+    "build",
+    "str",
+    "round_trip",
+    "eq",
+    "match",
+    "match.compiled",
+    "match.matchers",
+    "match.matchers.compiled",
+)
+
+
+def _stages(name, strings):
+    def build():
+        lexer = CfcmLexer()
+        encoded = [s.encode("utf-8") for s in strings]
+        matches = [fast_parser.scan(s) for s in strings]
+        parsed = [_parse(s) for s in strings]
+        others = [_parse(s) for s in strings]
+        cell_methods = [cm for cms in parsed for cm in cms]
+        n = len(strings)
+
+        def lex():
+            for s in strings:
+                for _ in lexer.tokenize(s):
+                    pass
+
+        def parser(engine, strings=strings):
+            def run():
+                for s in strings:
+                    parse(s, engine=engine)
+            return run
+
+        def represent():
+            for ms in matches:
+                representation.CellMethods(
+                    fast_parser.cell_method(m) for m in ms
+                )
+
+        def str_():
+            for cms in parsed:
+                str(cms)
+
+        def round_trip():
+            for cms in parsed:
+                parse(str(cms), engine="fast")
+
+        def eq():
+            for a, b in zip(parsed, others):
+                a == b
+
+        def match():
+            for cm in cell_methods:
+                cm.match(name="time", method={"name": "mean"})
+
+        spec = compile_match(name="time", method={"name": "mean"})
+
+        def match_compiled():
+            for cm in cell_methods:
+                spec.match(cm)
+
+        matchers = dict(
+            name=AnyOf("time", "lat", "area"),
+            method={"name": Regex("^m"), "params": ()},
+            within=None,
+        )
+        matchers_spec = compile_match(**matchers)
+
+        def match_matchers():
+            for cm in cell_methods:
+                cm.match(**matchers)
+
+        def match_matchers_compiled():
+            for cm in cell_methods:
+                matchers_spec.match(cm)
+
+        cases = (
+            _case(lex, n),
+            _case(parser("sly"), n),
+            _case(parser("fast"), n),
+            _case(parser("sly", encoded), n),
+            _case(parser("fast", encoded), n),
+            _case(represent, n),
+            _case(str_, n),
+            _case(round_trip, n),
+            _case(eq, n),
+            _case(match, len(cell_methods)),
+            _case(match_compiled, len(cell_methods)),
+            _case(match_matchers, len(cell_methods)),
+            _case(match_matchers_compiled, len(cell_methods)),
+        )
+        return {
+            f"{stage}/{name}": case
+            for stage, case in zip(_stage_names, cases)
+        }
+
+    return _group([f"{stage}/{name}" for stage in _stage_names], build)
+
+
+_string_predicates = (
+    "is_streamflow_raw",
+    "is_streamflow_climatology",
+    "is_rp5_streamflow_single_model",
+    "is_rp5_streamflow_climatology_single_model",
+    "is_rp5_streamflow_climatology_ensemble_mean",
+)
+_cell_method_predicates = ("is_conventional_1", "is_extended_1")
+_cell_methods_predicates = ("is_conventional_climatology", "is_conventional")
+
+
+# `__eq__` as it was: field names split on every call.
+_split_eq_fields = {
+    representation.CellMethod: (
+        "name, method, where, over, within, extra_info"
+    ),
+    representation.Method: "name, params",
+    representation.ExtraInfo: "standardized, non_standardized",
+    representation.SxiInterval: "value, unit",
+}
+
+
+def _split_eq(a, b):
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(
+            map(_split_eq, a, b)
+        )
+    fields = _split_eq_fields.get(type(a))
+    if fields is None:
+        return a == b
+    for attr in re.split(r"\s*,\s*", fields):
+        if not _split_eq(getattr(a, attr), getattr(b, attr)):
+            return False
+    return True
+
+
+def _equality(corpora):
+    def build():
+        subjects = [_parse(s) for s in corpora["hydrology"]]
+        comparators = [_parse(s) for s in corpus.hydrology]
+        n = len(subjects) * len(comparators)
+
+        def run(eq):
+            def compare():
+                for subject in subjects:
+                    for comparator in comparators:
+                        eq(subject, comparator)
+            return compare
+
+        return {
+            "eq.comparators/hydrology": _case(run(_eq), n),
+            "eq.comparators.split/hydrology": _case(run(_split_eq), n),
+        }
+
+    return _group(
+        ["eq.comparators/hydrology", "eq.comparators.split/hydrology"], build
+    )
+
+
+def _semantics(corpora):
+    def build():
+        strings = corpora["hydrology"]
+        parsed = [_parse(s) for s in corpora["long"]]
+        cell_methods = [cm for cms in parsed for cm in cms]
+        table = CellMethodsTable(parsed)
+
+        def apply(predicate, subjects):
+            def run():
+                for subject in subjects:
+                    predicate(subject)
+            return _case(run, len(subjects))
+
+        def batch(name, ops):
+            return _case(
+                lambda: getattr(semantics, f"batch_{name}")(table), ops
+            )
+
+        cases = {
+            f"semantics.{name}/hydrology": apply(
+                getattr(semantics, name), strings
+            )
+            for name in _string_predicates
+        }
+        cases[
+            "semantics.is_rp5_streamflow_ensemble_percentile/hydrology"
+        ] = apply(
+            lambda s: semantics.is_rp5_streamflow_ensemble_percentile(5, s),
+            strings,
+        )
+        for name in _cell_method_predicates:
+            cases[f"semantics.{name}/long"] = apply(
+                getattr(semantics, name), cell_methods
+            )
+        for name in _cell_methods_predicates:
+            cases[f"semantics.{name}/long"] = apply(
+                getattr(semantics, name), parsed
+            )
+        for name in _cell_method_predicates:
+            cases[f"semantics.batch_{name}/long"] = batch(
+                name, len(cell_methods)
+            )
+        for name in _cell_methods_predicates:
+            cases[f"semantics.batch_{name}/long"] = batch(name, len(parsed))
+        return cases
+
+    names = (
+        [f"semantics.{name}/hydrology" for name in _string_predicates]
+        + ["semantics.is_rp5_streamflow_ensemble_percentile/hydrology"]
+        + [
+            f"semantics.{name}/long"
+            for name in _cell_method_predicates + _cell_methods_predicates
+        ]
+        + [
+            f"semantics.batch_{name}/long"
+            for name in _cell_method_predicates + _cell_methods_predicates
+        ]
+    )
+    return _group(names, build)
+
+
+def _patterns(corpora):
+    def build():
+        strings = corpora["hydrology"]
+        parsed = [_parse(s) for s in strings]
+        pattern = compile_pattern(
+            "time: mean within days time: max over days time: mean over days"
+        )
+
+        def match(subjects):
+            def run():
+                for subject in subjects:
+                    pattern.match(subject)
+            return _case(run, len(subjects))
+
+        return {
+            "pattern.string/hydrology": match(strings),
+            "pattern.parsed/hydrology": match(parsed),
+        }
+
+    return _group(
+        ["pattern.string/hydrology", "pattern.parsed/hydrology"], build
+    )
+
+
+def _classify(seed=1):
+    """Classification against 1000 patterns, by trie and linearly."""
+    def build():
+        axes = ("time", "lat", "lon", "area", "models", "depth")
+        methods = ("mean", "max", "min", "median", "sum") + tuple(
+            f"percentile[{p}]" for p in (1, 5, 10, 50, 90, 95, 99)
+        )
+        clauses = (
+            "", " within days", " over days", " where land", " over years"
+        )
+        single = [
+            f"{axis}: {method}{clause}"
+            for axis, method, clause in itertools.product(
+                axes, methods, clauses
+            )
+        ]
+        rng = random.Random(seed)
+        templates = [
+            " ".join(rng.sample(single, rng.randint(1, 4)))
+            for _ in range(990)
+        ] + [
+            "time: * within {period} time: * over {period}",
+            "{axis}: percentile[{p}]",
+            "*: * where *",
+        ] + [f"time: mean within days {s}" for s in single[:7]]
+        registry = dict(enumerate(templates))
+        inputs = [rng.choice(templates[:990]) for _ in range(50)] + [
+            " ".join(rng.sample(single, rng.randint(1, 4)))
+            for _ in range(150)
+        ]
+        parsed = [_parse(s) for s in inputs]
+        classifier = Classifier(registry)
+        pattern_set = PatternSet(registry)
+
+        def apply(classify, subjects):
+            def run():
+                for subject in subjects:
+                    classify(subject)
+            return _case(run, len(subjects))
+
+        return {
+            "classify.trie.string/registry": apply(
+                classifier.classify, inputs
+            ),
+            "classify.trie.parsed/registry": apply(
+                classifier.classify, parsed
+            ),
+            "classify.linear.parsed/registry": apply(
+                pattern_set.match, parsed[:20]
+            ),
+        }
+
+    return _group(
+        [
+            "classify.trie.string/registry",
+            "classify.trie.parsed/registry",
+            "classify.linear.parsed/registry",
+        ],
+        build,
+    )
+
+
+# `parse_extra_info` as it was, with an inline regex, for comparison.
+def _regex_extra_info(text):
+    match = re.match(
+        r"(?P<interval>\s*interval:\s+(?P<value>\d+(\.\d+)?)\s+"
+        r"(?P<unit>\w+)(\s+comment: )?)?"
+        r"(?P<comment>.*)",
+        text
+    )
+    standardized = (
+        match.group("interval") and
+        representation.SxiInterval(
+            float(match.group("value")), match.group("unit")
+        )
+    )
+    return representation.ExtraInfo(
+        standardized, match.group("comment") or None
+    )
+
+
+_extra_info_engines = {"regex": _regex_extra_info, "scan": parse_extra_info}
+
+
+def _extra_info(corpora):
+    def build():
+        texts = {
+            name: [
+                match.group("extra_info")
+                for s in corpora[name]
+                for match in fast_parser.scan(s)
+                if match.group("extra_info") is not None
+            ]
+            for name in ("long", "comment")
+        }
+        rng = random.Random(0)
+        words = ("frogs", "toads", "newts")
+        texts["10kb"] = [
+            f"interval: {i} day comment: "
+            + " ".join(rng.choice(words) for _ in range(1700))
+            for i in range(20)
+        ]
+        texts["intervals"] = [
+            " ".join(f"interval: {j} {unit}" for j in range(1, i % 4 + 2))
+            for i, unit in enumerate(("day", "hour", "degree", "m") * 50)
+        ]
+        return {
+            f"extra_info.{engine}/{name}": _case(
+                lambda parse_one=parse_one, texts=texts[name]: [
+                    parse_one(text) for text in texts
+                ],
+                len(texts[name]),
+            )
+            for name in texts
+            for engine, parse_one in _extra_info_engines.items()
+        }
+
+    return _group(
+        [
+            f"extra_info.{engine}/{name}"
+            for name in ("long", "comment", "10kb", "intervals")
+            for engine in _extra_info_engines
+        ],
+        build,
+    )
+
+
+_canonical_stages = {
+    "str_parse": lambda strings: [str(_parse(s)) for s in strings],
+    "canonicalize": lambda strings: list(map(canonicalize, strings)),
+    "fingerprint": lambda strings: list(map(fingerprint, strings)),
+}
+
+
+def _canonical(corpora):
+    def build():
+        return {
+            f"canonical.{stage}/{name}": _case(
+                partial(run, corpora[name]), len(corpora[name])
+            )
+            for name in ("short", "long")
+            for stage, run in _canonical_stages.items()
+        }
+
+    return _group(
+        [
+            f"canonical.{stage}/{name}"
+            for name in ("short", "long")
+            for stage in _canonical_stages
+        ],
+        build,
+    )
+
+
+def _table(corpora):
+    def build():
+        parsed = [
+            _parse(s) for strings in corpora.values() for s in strings
+        ]
+        table = CellMethodsTable(parsed)
+        cell_methods = [cm for cms in parsed for cm in cms]
+
+        def scan():
+            return [
+                cm for cm in cell_methods
+                if cm.method.name == "percentile"
+                and cm.method.params == (5.0,)
+            ]
+
+        return {
+            "table.build/all": _case(
+                lambda: CellMethodsTable(parsed), len(parsed)
+            ),
+            "table.select/all": _case(
+                lambda: table.select(method="percentile", params=(5,)),
+                table.nrows,
+            ),
+            "table.scan.objects/all": _case(scan, table.nrows),
+            "table.select.multiple/all": _case(
+                lambda: table.select(name="time", within="days", unit=None),
+                table.nrows,
+            ),
+        }
+
+    return _group(
+        [
+            "table.build/all",
+            "table.select/all",
+            "table.scan.objects/all",
+            "table.select.multiple/all",
+        ],
+        build,
+    )
+
+
+def _typing(string, i):
+    # Type and delete a character in the interval of cell method i.
+    offset = string.index(f"interval: {i} ") + 10
+    state = [IncrementalParse(string)]
+
+    def edit():
+        state[0] = state[0].edit(offset, 0, "1").edit(offset, 1)
+
+    return edit
+
+
+def _breaking(string, i):
+    # Delete and retype the colon of cell method i.
+    offset = string.rindex(":", 0, string.index(f"(interval: {i} "))
+    state = [IncrementalParse(string)]
+
+    def edit():
+        state[0] = state[0].edit(offset, 1).edit(offset, 0, ":")
+
+    return edit
+
+
+_scaling_stages = (
+    "parse.sly", "parse.fast", "str", "str.frozen", "slice", "edit",
+    "edit.malformed",
+)
+
+
+def _scaling(sizes=(10, 100, 1000, 3000)):
+    def build(n):
+        from cf_cell_methods.frozen import freeze
+
+        string = " ".join(
+            f"time: mean within days (interval: {i} hours)" for i in range(n)
+        )
+        parsed = _parse(string)
+        frozen = freeze(parsed)
+        return {
+            f"scaling.parse.sly.{n}/chain": _case(
+                lambda: parse(string, "sly"), n
+            ),
+            f"scaling.parse.fast.{n}/chain": _case(
+                lambda: parse(string, "fast"), n
+            ),
+            f"scaling.str.{n}/chain": _case(lambda: str(parsed), n),
+            # Each cell method's string is cached after the first call.
+            f"scaling.str.frozen.{n}/chain": _case(lambda: str(frozen), n),
+            f"scaling.slice.{n}/chain": _case(
+                lambda: parsed[1:].endswith(parsed[-1:]), n
+            ),
+            f"scaling.edit.{n}/chain": _case(_typing(string, n // 2), 2),
+            f"scaling.edit.malformed.{n}/chain": _case(
+                _breaking(string, n // 2), 2
+            ),
+        }
+
+    benchmarks = []
+    for n in sizes:
+        benchmarks += _group(
+            [f"scaling.{stage}.{n}/chain" for stage in _scaling_stages],
+            partial(build, n),
+        )
+    return benchmarks
+
+
+def _instrumentation(corpora):
+    engines = ("sly", "fast")
+    modes = ("bare", "off", "on")
+
+    def build():
+        strings = corpora["long"]
+        lexer, parser = CfcmLexer(), CfcmParser()
+        bare = {
+            "sly": lambda s: parser.parse(lexer.tokenize(s)),
+            "fast": lambda s: [
+                fast_parser.cell_method(m) for m in fast_parser.scan(s)
+            ],
+        }
+
+        def run(engine, mode):
+            if mode == "bare":
+                parse_one = bare[engine]
+            else:
+                parse_one = lambda s: parse(s, engine=engine)
+
+            def run():
+                if mode == "on":
+                    instrumentation.enable()
+                try:
+                    for s in strings:
+                        parse_one(s)
+                finally:
+                    if mode == "on":
+                        instrumentation.disable()
+
+            return _case(run, len(strings))
+
+        return {
+            f"instrumentation.{mode}.{engine}/long": run(engine, mode)
+            for engine in engines
+            for mode in modes
+        }
+
+    return _group(
+        [
+            f"instrumentation.{mode}.{engine}/long"
+            for engine in engines
+            for mode in modes
+        ],
+        build,
+    )
+
+
+def _diagnostics(corpora):
+    engines = ("sly", "fast")
+
+    def build():
+        strings = corpora["long"]
+        # A syntax error (a missing colon) and a lexical error in each
+        # string.
+        malformed = [s.replace(":", "", 1) + " @" for s in strings]
+
+        def parse_all(strings, engine):
+            # Errors are printed; send them where a batch job's log might go.
+            with open(os.devnull, "w") as devnull, \
+                    contextlib.redirect_stdout(devnull), \
+                    contextlib.redirect_stderr(devnull):
+                for s in strings:
+                    parse(s, engine=engine)
+
+        cases = {
+            "diagnose/long": _case(
+                lambda: diagnose_many(strings), len(strings)
+            ),
+            "diagnose.malformed/long": _case(
+                lambda: diagnose_many(malformed), len(strings)
+            ),
+        }
+        for engine in engines:
+            cases[f"parse.{engine}.malformed/long"] = _case(
+                partial(parse_all, malformed, engine), len(strings)
+            )
+        return cases
+
+    return _group(
+        ["diagnose/long", "diagnose.malformed/long"]
+        + [f"parse.{engine}.malformed/long" for engine in engines],
+        build,
+    )
+
+
+def _persistent(corpora):
+    names = ("short", "long", "many")
+
+    def build():
+        # The directory is removed when the last benchmark using it is.
+        directory = tempfile.TemporaryDirectory()
+        cases = {}
+        for name in names:
+            strings = corpora[name]
+            warm = os.path.join(directory.name, f"{name}.db")
+            with PersistentCache(warm) as cache:
+                list(map(cache, strings))
+
+            def cold(strings=strings, name=name, directory=directory):
+                path = os.path.join(directory.name, f"{name}.cold.db")
+                for suffix in ("", "-wal", "-shm"):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(path + suffix)
+                with PersistentCache(path) as cache:
+                    return list(map(cache, strings))
+
+            def run_warm(strings=strings, path=warm, directory=directory):
+                with PersistentCache(path) as cache:
+                    return list(map(cache, strings))
+
+            cases[f"persistent.cold/{name}"] = _case(cold, len(strings))
+            cases[f"persistent.warm/{name}"] = _case(run_warm, len(strings))
+        return cases
+
+    return _group(
+        [
+            f"persistent.{run}/{name}"
+            for name in names
+            for run in ("cold", "warm")
+        ],
+        build,
+    )
+
+
+_serialize_formats = {
+    "binary": (binary.encode_many, binary.decode_many),
+    "pickle": (pickle.dumps, pickle.loads),
+    "str": (
+        lambda results: "\n".join(map(str, results)),
+        lambda text: [_parse(s) for s in text.split("\n")],
+    ),
+}
+
+
+def _serialize(corpora):
+    names = ("short", "long", "many", "percentile")
+
+    def build():
+        cases = {}
+        for name in names:
+            # Distinct objects, as from parsing each string.
+            results = [_parse(s) for s in corpora[name]]
+            n = len(results)
+            for format, (dumps, loads) in _serialize_formats.items():
+                encoded = dumps(results)
+                size = len(encoded) / n
+                cases[f"serialize.{format}.dumps/{name}"] = _case(
+                    partial(dumps, results), n, size
+                )
+                cases[f"serialize.{format}.loads/{name}"] = _case(
+                    partial(loads, encoded), n, size
+                )
+        return cases
+
+    return _group(
+        [
+            f"serialize.{format}.{stage}/{name}"
+            for name in names
+            for format in _serialize_formats
+            for stage in ("dumps", "loads")
+        ],
+        build,
+    )
+
+
+async def _inline(strings):
+    return [parse(s) for s in strings]
+
+
+async def _executor(strings):
+    loop = asyncio.get_event_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(None, parse, s) for s in strings)
+    )
+
+
+async def _batched(strings):
+    async with AsyncParser() as parser:
+        return await asyncio.gather(*map(parser.parse, strings))
+
+
+_async_modes = {"inline": _inline, "executor": _executor, "aparse": _batched}
+
+
+def _run_async(run, strings):
+    # As `asyncio.run` (Python 3.7) does; the modes leave no tasks behind.
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(run(strings))
+    finally:
+        loop.close()
+
+
+def _async(corpora):
+    names = ("short", "long")
+
+    def build():
+        return {
+            f"async.{mode}/{name}": _case(
+                partial(_run_async, run, corpora[name]), len(corpora[name])
+            )
+            for name in names
+            for mode, run in _async_modes.items()
+        }
+
+    return _group(
+        [f"async.{mode}/{name}" for name in names for mode in _async_modes],
+        build,
+    )
+
+
+_import_stages = {
+    "none": "pass",
+    "package": "import cf_cell_methods.semantics",
+    "first_parse": (
+        "import cf_cell_methods.semantics; "
+        "cf_cell_methods.parse('time: mean')"
+    ),
+}
+
+
+def _imports():
+    def build():
+        return {
+            f"import.{stage}/process": _case(
+                partial(
+                    subprocess.run,
+                    [sys.executable, "-c", code],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                ),
+                1,
+            )
+            for stage, code in _import_stages.items()
+        }
+
+    return _group(
+        [f"import.{stage}/process" for stage in _import_stages], build
+    )
+
+
+def _parallel():
+    """parse_parallel over 1, 2 and 4 workers. Not run by default."""
+    engines = ("sly", "fast")
+    workers = (1, 2, 4)
+
+    def build():
+        from cf_cell_methods.parallel import parse_parallel
+
+        strings = [
+            f"time: mean within days time: max over days (comment {i}) "
+            f"models: percentile[{i % 100}]"
+            for i in range(5000)
+        ]
+        return {
+            f"parallel.{engine}.{n}/numbered": _case(
+                partial(
+                    parse_parallel,
+                    strings,
+                    max_workers=n,
+                    chunksize=500,
+                    engine=engine,
+                ),
+                len(strings),
+            )
+            for engine in engines
+            for n in workers
+        }
+
+    return _group(
+        [
+            f"parallel.{engine}.{n}/numbered"
+            for engine in engines
+            for n in workers
+        ],
+        build,
+        default=False,
+    )
+
+
+def benchmarks(corpora):
+    """
+    Return the list of all benchmarks over the given corpora. Their data
+    is built when they are set up.
+    """
+    result = []
+    for name, strings in corpora.items():
+        result += _stages(name, strings)
+    result += _equality(corpora)
+    result += _semantics(corpora)
+    result += _patterns(corpora)
+    result += _classify()
+    result += _extra_info(corpora)
+    result += _canonical(corpora)
+    result += _persistent(corpora)
+    result += _serialize(corpora)
+    result += _async(corpora)
+    result += _table(corpora)
+    result += _scaling()
+    result += _instrumentation(corpora)
+    result += _diagnostics(corpora)
+    result += _imports()
+    result += _parallel()
+    return result
+
+
+def select(benchmarks, patterns=None):
+    """
+    Select benchmarks whose names contain any of the given substrings, or
+    all default benchmarks if none are given.
+    """
+    if not patterns:
+        return [b for b in benchmarks if b.default]
+    return [b for b in benchmarks if any(p in b.name for p in patterns)]
@@ -0,0 +1,109 @@
+"""
+Timing and comparison of benchmark results.
+
+Each benchmark is a callable that performs `ops` operations. It is first
+calibrated: the number of loops (calls) per sample is increased until a
+sample takes at least `min_time` seconds, which bounds the effect of timer
+resolution. After `warmup` discarded samples, `repeat` samples are taken
+with the garbage collector disabled (as `timeit` does). Results are
+reported per operation.
+
+The median is the statistic of choice for comparison: unlike the mean, it
+is robust to the occasional sample disturbed by other activity on the
+machine, and unlike the minimum it reflects typical cost.
+"""
+import gc
+import statistics
+import time
+from collections import namedtuple
+
+
+Regression = namedtuple("Regression", "name baseline current ratio")
+
+
+def _time(func, loops):
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def calibrate(func, min_time=0.05):
+    """Return the number of loops for a sample to take at least min_time."""
+    loops = 1
+    while True:
+        elapsed = _time(func, loops)
+        if elapsed >= min_time:
+            return loops
+        if elapsed <= 0:
+            loops *= 10
+        else:
+            loops = max(loops + 1, int(loops * 1.2 * min_time / elapsed))
+
+
+def _quartiles(samples):
+    """
+    The quartiles of samples, by the method of `statistics.quantiles`
+    (Python 3.8) with its default ("exclusive") method.
+    """
+    data = sorted(samples)
+    n = len(data)
+    if n < 2:
+        return data * 3
+    quartiles = []
+    for i in (1, 2, 3):
+        j = min(max(i * (n + 1) // 4, 1), n - 1)
+        delta = i * (n + 1) - 4 * j
+        quartiles.append((data[j - 1] * (4 - delta) + data[j] * delta) / 4)
+    return quartiles
+
+
+def summarize(samples):
+    """Summary statistics of a list of per-operation times."""
+    quartiles = _quartiles(samples)
+    return {
+        "min": min(samples),
+        "max": max(samples),
+        "mean": statistics.mean(samples),
+        "median": statistics.median(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "iqr": quartiles[2] - quartiles[0],
+    }
+
+
+def measure(func, ops=1, repeat=7, min_time=0.05, warmup=1):
+    """
+    Time `func`, which performs `ops` operations per call. Return a dict of
+    summary statistics of the time per operation, the samples, and the
+    number of loops per sample.
+    """
+    loops = calibrate(func, min_time)
+    for _ in range(warmup):
+        _time(func, loops)
+    samples = [_time(func, loops) / (loops * ops) for _ in range(repeat)]
+    return dict(summarize(samples), samples=samples, loops=loops, ops=ops)
+
+
+def compare(results, baseline, threshold=0.1, statistic="median"):
+    """
+    Compare results with baseline results (dicts of name to measurement).
+    Return a list of Regression for each benchmark whose time has increased
+    by more than the fraction `threshold`. Benchmarks absent from either
+    side are ignored.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        current = result[statistic]
+        base = baseline[name][statistic]
+        ratio = current / base if base > 0 else float("inf")
+        if ratio > 1 + threshold:
+            regressions.append(Regression(name, base, current, ratio))
+    return regressions
@@ -1,6 +1,139 @@
-from cf_cell_methods.lexer import lexer
-from cf_cell_methods.parser import parser as token_parser
+import sys
+import threading
+import types
+from functools import partial
+from cf_cell_methods import fast_parser, instrumentation
+from cf_cell_methods.cache import ParseCache, copy_cell_methods
 
 
-def parse(string):
-    return token_parser.parse(lexer.tokenize(string))
+# Importing the SLY lexer and parser builds the lexer regexes and the parser
+# tables, which is by far the largest part of the cost of importing this
+# package. They are therefore imported on first use, by `sly_parse` or by
+# access to the module attributes `lexer` and `token_parser`.
+
+def _load_sly():
+    from cf_cell_methods.lexer import CfcmLexer
+    from cf_cell_methods.parser import CfcmParser
+    return CfcmLexer, CfcmParser
+
+
+class _Module(types.ModuleType):
+    # `lexer` and `token_parser` are properties of the module, rather than
+    # found by a module `__getattr__` function (Python 3.7), which would not
+    # be called once importing the submodule `lexer` binds its name here.
+
+    @property
+    def lexer(self):
+        from cf_cell_methods.lexer import lexer
+        return lexer
+
+    @lexer.setter
+    def lexer(self, value):
+        # Ignore the binding of the submodule by the import system.
+        if not isinstance(value, types.ModuleType):
+            raise AttributeError("can't set attribute 'lexer'")
+
+    @property
+    def token_parser(self):
+        from cf_cell_methods.parser import parser
+        return parser
+
+
+sys.modules[__name__].__class__ = _Module
+
+
+# SLY keeps the state of a parse on the lexer and parser instances, so
+# each thread gets its own pair. They are cheap to construct: the lexer
+# regexes and the parser tables belong to the classes.
+_thread_local = threading.local()
+
+
+def sly_parse(string):
+    # The SLY lexer works on str only: decode bytes-like input, once.
+    string = fast_parser.decode(string)
+    recorder = instrumentation.active
+    if recorder is not None:
+        return instrumentation.sly_parse(recorder, string)
+    try:
+        thread_lexer, thread_parser = _thread_local.sly
+    except AttributeError:
+        CfcmLexer, CfcmParser = _load_sly()
+        thread_lexer, thread_parser = _thread_local.sly = (
+            CfcmLexer(), CfcmParser()
+        )
+    return thread_parser.parse(thread_lexer.tokenize(string))
+
+
+engines = {
+    "sly": sly_parse,
+    "fast": fast_parser.parse,
+}
+
+
+def parse(string, engine="sly"):
+    """
+    Parse a cell_methods string. Return a `CellMethods` representation, or
+    None if the string is syntactically invalid. The string may also be
+    bytes-like (`bytes`, `bytearray`, `memoryview`) encoded in UTF-8.
+
+    `engine` selects the parsing engine: "sly" (the SLY lexer and parser)
+    or "fast" (the hand-written parser in `cf_cell_methods.fast_parser`).
+    Both produce identical results.
+    """
+    try:
+        parse_engine = engines[engine]
+    except KeyError:
+        raise ValueError(f"Unknown parsing engine '{engine}'") from None
+    if instrumentation.active is not None:
+        return instrumentation.parse(parse_engine, string)
+    return parse_engine(string)
+
+
+# Memoizing front end to `parse`. See `cf_cell_methods.cache`.
+cached_parse = ParseCache(parse=parse)
+
+
+def parse_many(strings, engine="sly", cache=None, errors="raise"):
+    """
+    Parse an iterable of cell_methods strings. Return a list of results in
+    input order. Each distinct string is parsed only once; repeated
+    occurrences receive copies of the first result.
+
+    `cache`, if given, is a `ParseCache` (possibly pre-warmed) through which
+    the distinct strings are parsed. It then determines the engine.
+
+    `errors` determines what happens when parsing an item raises an
+    exception (e.g., the item is not a string):
+    "raise" propagates the exception; "capture" puts the exception object
+    in the item's place in the results; "ignore" puts None there.
+    """
+    if errors not in ("raise", "capture", "ignore"):
+        raise ValueError(f"Unknown errors mode '{errors}'")
+    if cache is not None:
+        parse_one = cache
+    elif engine in engines:
+        parse_one = engines[engine]
+        if instrumentation.active is not None:
+            parse_one = partial(instrumentation.parse, parse_one)
+    else:
+        raise ValueError(f"Unknown parsing engine '{engine}'")
+
+    parsed = {}
+    results = []
+    for string in strings:
+        try:
+            # Mutable bytes-like input is not hashable.
+            key = (
+                bytes(string) if isinstance(string, (bytearray, memoryview))
+                else string
+            )
+            if key in parsed:
+                result = copy_cell_methods(parsed[key])
+            else:
+                result = parsed[key] = parse_one(string)
+        except Exception as e:
+            if errors == "raise":
+                raise
+            result = e if errors == "capture" else None
+        results.append(result)
+    return results
@@ -0,0 +1,260 @@
+"""
+Asynchronous parsing, for asyncio applications.
+
+Parsing a long string inline blocks the event loop, and handing each
+string to an executor separately costs more in scheduling than the parse
+itself. An `AsyncParser` instead collects concurrent requests into
+batches, over a short window (`window` seconds, or until `max_batch`
+requests are queued), and parses each batch in one executor call.
+
+- Concurrent requests for the same string share one parse (and each
+  caller gets its own copy of the result).
+- Requests wait in a queue of at most `max_queued` strings, and at most
+  `max_batches` batches are parsed at a time: when the parser falls
+  behind, `parse` waits for room in the queue (backpressure).
+- The executor is the event loop's default (a thread pool) unless given;
+  a `concurrent.futures.ProcessPoolExecutor` parses batches in parallel.
+- The batching task runs only while requests are queued, so that the loop
+  can be closed as soon as the requests it waited for are parsed. An idle
+  parser keeps no reference to its loop.
+
+`aparse` parses with an `AsyncParser` per event loop and engine:
+
+    result = await aparse(string)
+"""
+import asyncio
+import contextlib
+import weakref
+from collections import namedtuple
+from functools import partial
+from cf_cell_methods import engines, instrumentation
+from cf_cell_methods.cache import copy_cell_methods
+
+
+AsyncParserStats = namedtuple(
+    "AsyncParserStats", "requests shared batches parsed"
+)
+
+
+def _parse_batch(engine, strings):
+    """Parse a batch of strings, in an executor. Capture exceptions."""
+    parse = engines[engine]
+    if instrumentation.active is not None:
+        parse = partial(instrumentation.parse, parse)
+    results = []
+    for string in strings:
+        try:
+            results.append(parse(string))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+class AsyncParser:
+    """
+    An asynchronous, batching front end to `parse`. See module docstring.
+    It belongs to the event loop it is first used in.
+    """
+
+    def __init__(
+        self,
+        engine="sly",
+        executor=None,
+        window=0.001,
+        max_batch=256,
+        max_queued=1024,
+        max_batches=2,
+    ):
+        if engine not in engines:
+            raise ValueError(f"Unknown parsing engine '{engine}'")
+        self.engine = engine
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self.max_queued = max_queued
+        self.max_batches = max_batches
+        self._inflight = {}
+        self._queue = None
+        self._task = None
+        self._error = None
+        # Numbers of batches being parsed, and of requests waiting for room
+        # in the queue.
+        self._running = 0
+        self._putting = 0
+        self._requests = 0
+        self._shared = 0
+        self._batches = 0
+        self._parsed = 0
+
+    def _start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_queued)
+            self._wake = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_batches)
+        self._task = asyncio.get_event_loop().create_task(self._run())
+        self._task.add_done_callback(self._stopped)
+
+    def _stopped(self, task):
+        if task is self._task:
+            self._task = None
+        if not task.cancelled() and task.exception() is not None:
+            # The batching task failed: fail the requests it will not parse.
+            self._error = task.exception()
+            for future, _ in self._inflight.values():
+                if not future.done():
+                    future.set_exception(self._error)
+            self._inflight.clear()
+        self._release()
+
+    def _release(self):
+        """Once idle, drop the objects bound to the event loop."""
+        if self._task is None and not (self._running or self._putting):
+            self._queue = self._wake = self._slots = None
+
+    async def _put(self, item):
+        """Put a request in the queue, waiting for room."""
+        try:
+            await self._queue.put(item)
+        finally:
+            self._putting -= 1
+
+    async def parse(self, string):
+        """Parse a cell_methods string, as `cf_cell_methods.parse` does."""
+        if self._error is not None:
+            raise RuntimeError(
+                "The batching task of this AsyncParser failed"
+            ) from self._error
+        self._requests += 1
+        # Mutable bytes-like input is not hashable.
+        key = (
+            bytes(string) if isinstance(string, (bytearray, memoryview))
+            else string
+        )
+        # The future of a string, and the number of its callers waiting.
+        entry = self._inflight.get(key)
+        if entry is None:
+            if self._task is None or self._task.done():
+                self._start()
+            entry = self._inflight[key] = [
+                asyncio.get_event_loop().create_future(), 1
+            ]
+            try:
+                self._queue.put_nowait((key, string))
+            except asyncio.QueueFull:
+                # Once requested, a string is parsed even if this caller
+                # is cancelled, as others may share its result. The
+                # batching task waits for it.
+                self._putting += 1
+                await asyncio.shield(self._put((key, string)))
+            if self._queue.qsize() >= self.max_batch:
+                self._wake.set()
+        else:
+            entry[1] += 1
+            self._shared += 1
+        try:
+            result = await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+        # Callers sharing a result get copies, except the last.
+        return copy_cell_methods(result) if entry[1] else result
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        queue = self._queue
+        # Stop when no requests are left; `parse` starts the task again.
+        while not queue.empty() or self._putting:
+            batch = [await queue.get()]
+            if queue.qsize() + 1 < self.max_batch:
+                timer = loop.call_later(self.window, self._wake.set)
+                await self._wake.wait()
+                timer.cancel()
+            self._wake.clear()
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            await self._slots.acquire()
+            self._running += 1
+            self._batches += 1
+            self._parsed += len(batch)
+            try:
+                future = loop.run_in_executor(
+                    self.executor,
+                    _parse_batch,
+                    self.engine,
+                    [string for _, string in batch],
+                )
+            except Exception as e:
+                # The executor cannot take the batch, e.g., it is shut down.
+                future = loop.create_future()
+                future.set_exception(e)
+            future.add_done_callback(
+                lambda future, batch=batch: self._done(batch, future)
+            )
+
+    def _done(self, batch, future):
+        self._slots.release()
+        self._running -= 1
+        if future.cancelled():
+            results = [asyncio.CancelledError()] * len(batch)
+        elif future.exception() is not None:
+            # The executor failed, e.g., a process pool broke.
+            results = [future.exception()] * len(batch)
+        else:
+            results = future.result()
+        for (key, _), result in zip(batch, results):
+            entry = self._inflight.pop(key, None)
+            if entry is None or entry[0].done():
+                continue
+            waiter = entry[0]
+            if isinstance(result, asyncio.CancelledError):
+                waiter.cancel()
+            elif isinstance(result, BaseException):
+                waiter.set_exception(result)
+            else:
+                waiter.set_result(result)
+        self._release()
+
+    def stats(self):
+        """
+        Return the numbers of requests, of requests that shared the parse of
+        another, of batches, and of strings parsed.
+        """
+        return AsyncParserStats(
+            self._requests, self._shared, self._batches, self._parsed
+        )
+
+    async def aclose(self):
+        """Wait for the pending requests, then stop the batching task."""
+        while self._inflight:
+            await asyncio.gather(
+                *(future for future, _ in self._inflight.values()),
+                return_exceptions=True,
+            )
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+# The parsers of `aparse`, by event loop and engine.
+_parsers = weakref.WeakKeyDictionary()
+
+
+async def aparse(string, engine="sly"):
+    """
+    Parse a cell_methods string asynchronously, in batches with concurrent
+    calls, by the default `AsyncParser` of the running event loop.
+    """
+    # Idle parsers keep no reference to their loop: they are collected
+    # with it.
+    parsers = _parsers.setdefault(asyncio.get_event_loop(), {})
+    try:
+        parser = parsers[engine]
+    except KeyError:
+        parser = parsers[engine] = AsyncParser(engine)
+    return await parser.parse(string)
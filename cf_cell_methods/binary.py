@@ -0,0 +1,263 @@
+"""
+Compact, versioned binary encoding of parse results.
+
+`encode_many` encodes a list of parse results (`CellMethods` or None) to
+bytes, and `decode_many` decodes them; `encode` and `decode` do the same
+for a single result. Frozen representations encode like mutable ones, and
+decode to mutable ones.
+
+The encoding is made of four sections:
+
+- header: the magic bytes `CFCM` and the format version (one byte);
+- strings: the number of distinct strings (varint), the length of each
+  (varint, in characters), and the byte length (varint) and UTF-8 encoding
+  of their concatenation;
+- floats: the number of distinct floats (varint), and each as a
+  little-endian float64;
+- structure: the number of results (varint), and a stream of varints
+  describing them, to the end of the data.
+
+Each string (names, methods, clauses, units and comments) is stored once,
+and referred to by its index plus 1 in the strings section; 0 is None.
+Likewise, each float (method params and interval values) is stored once,
+and referred to by its index in the floats section.
+In the structure, a result is the number of its cell methods plus 1 (0 is
+None), and a cell method is
+
+    name method n_params where over within extra_info
+
+where `n_params` is followed by the params, and `extra_info` is 0 for
+none, or the number of intervals plus 1, followed by the value and unit
+of each interval and the comment.
+
+Keeping strings, floats and varints in separate sections lets each be
+decoded in bulk. Strings and floats are numbered in order of decreasing
+frequency, so that nearly all varints in the structure are one byte, and
+runs of those decode to ints by `list(bytes)`.
+"""
+import re
+import struct
+from collections import Counter
+from functools import lru_cache
+from cf_cell_methods.representation import (
+    CellMethods, CellMethod, Method, ExtraInfo, SxiInterval,
+)
+
+
+FORMAT_VERSION = 1
+
+_magic = b"CFCM"
+_header = _magic + bytes([FORMAT_VERSION])
+_long_varint = re.compile(rb"[\x80-\xff]+[\x00-\x7f]")
+
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+@lru_cache(maxsize=4096)
+def _varint(n):
+    """Return the varint encoding of n."""
+    out = bytearray()
+    _write_varint(out, n)
+    return bytes(out)
+
+
+def _read_varint(data, pos):
+    """Return the varint at a position in data, and the next position."""
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _read_varints(data):
+    """Return the list of varints in data."""
+    if max(data, default=0) < 0x80:  # all one-byte varints
+        return list(data)
+    # Most varints are one byte: convert the runs of them in bulk.
+    result = []
+    pos = 0
+    for match in _long_varint.finditer(data):
+        result += data[pos:match.start()]
+        result.append(_read_varint(data, match.start())[0])
+        pos = match.end()
+    if data[-1:] >= b"\x80":
+        raise IndexError("Truncated varint")
+    result += data[pos:]
+    return result
+
+
+def encode_many(results):
+    """Encode a list of parse results (`CellMethods` or None) to bytes."""
+    # The structure is first built with the strings and floats themselves,
+    # and counts as 1-tuples (so that they are distinct from floats), then
+    # all are replaced by ids: strings and floats are numbered in order of
+    # decreasing frequency, so that most ids are one-byte varints.
+    stream = []
+    append = stream.append
+    for cell_methods in results:
+        if cell_methods is None:
+            append((0,))
+            continue
+        append((len(cell_methods) + 1,))
+        for cm in cell_methods:
+            params = cm.method.params
+            append(cm.name)
+            append(cm.method.name)
+            append((len(params),))
+            stream += map(float, params)
+            append(cm.where)
+            append(cm.over)
+            append(cm.within)
+            extra_info = cm.extra_info
+            if extra_info is None:
+                append((0,))
+                continue
+            intervals = extra_info.intervals
+            append((len(intervals) + 1,))
+            for interval in intervals:
+                append(float(interval.value))
+                append(interval.unit)
+            append(extra_info.non_standardized)
+
+    counts = Counter(stream)
+    ids = {None: 0}
+    strings = []
+    floats = []
+    for value in sorted(counts, key=counts.__getitem__, reverse=True):
+        if type(value) is tuple:
+            ids[value] = value[0]
+        elif type(value) is str:
+            strings.append(value)
+            ids[value] = len(strings)
+        elif value is not None:
+            ids[value] = len(floats)
+            floats.append(value)
+    structure = list(map(ids.__getitem__, stream))
+
+    write = _write_varint
+    out = bytearray(_header)
+    write(out, len(strings))
+    for string in strings:
+        write(out, len(string))
+    text = "".join(strings).encode("utf-8")
+    write(out, len(text))
+    out += text
+    write(out, len(floats))
+    out += struct.pack(f"<{len(floats)}d", *floats)
+    write(out, len(results))
+    if not structure or max(structure) < 0x80:
+        out += bytes(structure)
+    else:
+        out += b"".join(map(_varint, structure))
+    return bytes(out)
+
+
+def encode(cell_methods):
+    """Encode a parse result (`CellMethods` or None) to bytes."""
+    return encode_many([cell_methods])
+
+
+def decode_many(data):
+    """
+    Decode bytes (or a bytes-like object) encoded by `encode_many` to a
+    list of parse results. Raise ValueError if the data is not a valid
+    encoding.
+    """
+    data = bytes(data)
+    if data[:len(_magic)] != _magic:
+        raise ValueError("Not an encoding of cell_methods")
+    if data[len(_magic):len(_header)] != _header[len(_magic):]:
+        raise ValueError(
+            f"Unsupported encoding version {data[len(_magic):][:1]!r}, "
+            f"expected {FORMAT_VERSION}"
+        )
+    try:
+        return _decode(data, len(_header))
+    except (IndexError, StopIteration, struct.error, UnicodeDecodeError):
+        raise ValueError("Truncated or corrupt encoding") from None
+
+
+def decode(data):
+    """Decode bytes encoded by `encode` to a parse result."""
+    results = decode_many(data)
+    if len(results) != 1:
+        raise ValueError(f"Expected 1 encoded result, found {len(results)}")
+    return results[0]
+
+
+def _decode(data, pos):
+    n_strings, pos = _read_varint(data, pos)
+    lengths = []
+    for _ in range(n_strings):
+        length, pos = _read_varint(data, pos)
+        lengths.append(length)
+    size, pos = _read_varint(data, pos)
+    if pos + size > len(data):
+        raise IndexError
+    text = data[pos:pos + size].decode("utf-8")
+    pos += size
+    strings = [None]
+    start = 0
+    for length in lengths:
+        strings.append(text[start:start + length])
+        start += length
+
+    n_floats, pos = _read_varint(data, pos)
+    floats = struct.unpack_from(f"<{n_floats}d", data, pos)
+    pos += 8 * n_floats
+    n_results, pos = _read_varint(data, pos)
+
+    ints = iter(_read_varints(data[pos:]))
+    next_int = ints.__next__
+    results = []
+    for _ in range(n_results):
+        n = next_int()
+        if n == 0:
+            results.append(None)
+            continue
+        cell_methods = CellMethods()
+        for _ in range(n - 1):
+            name = strings[next_int()]
+            method = strings[next_int()]
+            n_params = next_int()
+            params = (
+                tuple([floats[next_int()] for _ in range(n_params)])
+                if n_params else ()
+            )
+            where = strings[next_int()]
+            over = strings[next_int()]
+            within = strings[next_int()]
+            n_intervals = next_int()
+            if n_intervals == 0:
+                extra_info = None
+            else:
+                intervals = [
+                    SxiInterval(floats[next_int()], strings[next_int()])
+                    for _ in range(n_intervals - 1)
+                ]
+                if not intervals:
+                    standardized = None
+                elif len(intervals) == 1:
+                    standardized = intervals[0]
+                else:
+                    standardized = tuple(intervals)
+                extra_info = ExtraInfo(standardized, strings[next_int()])
+            cell_methods.append(
+                CellMethod(
+                    name, Method(method, params), where, over, within,
+                    extra_info,
+                )
+            )
+        results.append(cell_methods)
+    if next(ints, None) is not None:
+        raise ValueError("Trailing data after the encoded results")
+    return results
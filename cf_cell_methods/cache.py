@@ -0,0 +1,144 @@
+"""
+Memoizing front end to `parse`.
+
+Archives typically contain only a few dozen distinct `cell_methods` strings,
+repeated millions of times. A `ParseCache` parses each distinct string once
+and serves later requests from a bounded LRU store.
+"""
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from cf_cell_methods import instrumentation
+from cf_cell_methods.fast_parser import decode
+from cf_cell_methods.representation import (
+    CellMethods, CellMethod, Method, ExtraInfo, SxiInterval,
+)
+
+
+CacheStats = namedtuple("CacheStats", "hits misses maxsize currsize")
+
+_missing = object()
+
+
+# Extra info content is lexed as a single token, and whitespace inside it is
+# significant. This is the same pattern as `CfcmLexer.EXTRA_INFO`.
+_extra_info = re.compile(r"(\([^)]*\))")
+_whitespace = re.compile(r"\s+")
+_punctuation = re.compile(r" ?([:,\[\]]) ?")
+
+
+def normalize(string):
+    """
+    Return a whitespace-normalized form of a cell_methods string. Strings with
+    the same normalized form parse identically, e.g., "time:mean" and
+    "time: mean ". Whitespace inside extra info is left untouched.
+    """
+    parts = _extra_info.split(string)
+    for i in range(0, len(parts), 2):
+        parts[i] = _punctuation.sub(
+            r"\1", _whitespace.sub(" ", parts[i])
+        ).strip()
+    return "".join(parts)
+
+
+def _copy_standardized(standardized):
+    if isinstance(standardized, tuple):  # several intervals
+        return tuple(map(_copy_standardized, standardized))
+    return standardized and SxiInterval(standardized.value, standardized.unit)
+
+
+def copy_cell_methods(cell_methods):
+    """
+    Return a copy of a parse result that shares no mutable objects with
+    the original.
+    """
+    if cell_methods is None:
+        return None
+    return CellMethods(
+        CellMethod(
+            cm.name,
+            Method(cm.method.name, cm.method.params),
+            where=cm.where,
+            over=cm.over,
+            within=cm.within,
+            extra_info=cm.extra_info and ExtraInfo(
+                _copy_standardized(cm.extra_info.standardized),
+                cm.extra_info.non_standardized,
+            ),
+        )
+        for cm in cell_methods
+    )
+
+
+class ParseCache:
+    """
+    A bounded LRU cache of parse results, keyed on whitespace-normalized
+    input. Calling the cache parses a string (or bytes-like input, which is
+    decoded first, as `parse` does). Each call returns a fresh copy
+    of the cached result, so callers may freely mutate what they get.
+
+    A cache is safe to use from several threads at once. Parsing happens
+    outside the lock, so concurrent misses on one string may parse it more
+    than once.
+
+    `maxsize=None` makes the cache unbounded. `copy=None` disables copying,
+    which is safe only when `parse` returns immutable results (e.g.,
+    `cf_cell_methods.frozen.parse`).
+    """
+
+    def __init__(self, maxsize=1024, parse=None, copy=copy_cell_methods):
+        if parse is None:
+            from cf_cell_methods import parse
+        self.maxsize = maxsize
+        self._parse = parse
+        self._copy = copy
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __call__(self, string):
+        string = decode(string)
+        data = self._data
+        # Fast path: the string is already in normalized form.
+        key = string if string in data else normalize(string)
+        with self._lock:
+            result = data.get(key, _missing)
+            if result is _missing:
+                self._misses += 1
+            else:
+                self._hits += 1
+                data.move_to_end(key)
+        recorder = instrumentation.active
+        if recorder is not None:
+            recorder.add(
+                {"cache_misses" if result is _missing else "cache_hits": 1}
+            )
+        if result is _missing:
+            result = self._parse(string)
+            with self._lock:
+                data[key] = result
+                if self.maxsize is not None and len(data) > self.maxsize:
+                    data.popitem(last=False)
+        return self._copy_result(result)
+
+    def _copy_result(self, result):
+        copy = self._copy
+        return result if copy is None else copy(result)
+
+    def __contains__(self, string):
+        string = decode(string)
+        return string in self._data or normalize(string) in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return CacheStats(self._hits, self._misses, self.maxsize, len(self))
+
+    def clear(self):
+        """Discard all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._hits = 0
+            self._misses = 0
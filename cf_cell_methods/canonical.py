@@ -0,0 +1,93 @@
+"""
+Canonical form and fingerprints of cell_methods strings, for grouping
+strings that are spelled differently but mean the same, e.g.,
+"time:mean" and "time: mean ", or "percentile[5]" and "percentile[5.0]".
+
+The canonical form of a string is `str` of its parse result: strings
+have the same canonical form if and only if they parse to equal
+representations. `canonicalize` builds it directly from the fields
+scanned by the fast parser, without building representation objects.
+Strings the fast scanner rejects are parsed (without printing errors);
+invalid strings have no canonical form (None).
+
+`fingerprint` is a stable 64-bit hash (BLAKE2b) of the canonical form, as
+a signed int, so that it fits, e.g., a PostgreSQL `bigint` column.
+"""
+from hashlib import blake2b
+from cf_cell_methods import fast_parser
+from cf_cell_methods.diagnostics import quiet_parse
+from cf_cell_methods.extra_info import _interval, _comment
+
+
+def _extra_info(text):
+    """Return the canonical form of the content of extra info."""
+    intervals = []
+    match_interval = _interval.match
+    pos = 0
+    while True:
+        match = match_interval(text, pos)
+        if match is None:
+            break
+        value, unit = match.groups()
+        intervals.append(f"interval: {float(value)} {unit}")
+        pos = match.end()
+    if intervals:
+        match = _comment.match(text, pos)
+        if match is not None:
+            pos = match.end()
+    standardized = " ".join(intervals)
+    comment = text[pos:]
+    if standardized and comment:
+        return f"({standardized} comment: {comment})"
+    # No extra info at all is "", as for `ExtraInfo.__str__`.
+    return f"({standardized or comment})" if standardized or comment else ""
+
+
+def _cell_method(match):
+    """Return the canonical form of a cell method scanned by `match`."""
+    name, method, params, where, over, within, extra_info = match.group(
+        *fast_parser.fields
+    )
+    if params is not None:
+        method += (
+            f"[{','.join(str(float(p)) for p in params.split(','))}]"
+        )
+    parts = [f"{name}: {method}"]
+    if where is not None:
+        parts.append(f"where {where}")
+    if over is not None:
+        parts.append(f"over {over}")
+    if within is not None:
+        parts.append(f"within {within}")
+    if extra_info is not None:
+        parts.append(_extra_info(extra_info))
+    return " ".join(parts)
+
+
+def canonicalize(string):
+    """
+    Return the canonical form of a cell_methods string (None if it is
+    invalid). The string may also be bytes-like.
+    """
+    string = fast_parser.decode(string)
+    matches = fast_parser.scan(string)
+    if matches is None:
+        result = quiet_parse(string)
+        return result if result is None else str(result)
+    return " ".join(map(_cell_method, matches))
+
+
+def fingerprint(string):
+    """
+    Return the fingerprint of a cell_methods string: a signed 64-bit int,
+    equal for strings with the same canonical form. None if the string is
+    invalid.
+    """
+    canonical = canonicalize(string)
+    if canonical is None:
+        return None
+    return int.from_bytes(
+        blake2b(canonical.encode("utf-8"), digest_size=8).digest(),
+        "big",
+        signed=True,
+    )
@@ -0,0 +1,149 @@
+"""
+Classification of cell methods against a large registry of named patterns.
+
+Testing an input against each pattern in turn costs time proportional to
+the number of patterns. A `Classifier` instead compiles its patterns into a
+trie keyed on successive cell method keys
+
+    (name, method signature, where, over, within)
+
+so that classifying an input costs time proportional to its length (plus
+verifying the few patterns that survive the trie walk), independent of the
+number of patterns.
+
+Patterns are templates as in `cf_cell_methods.patterns`. A template
+cell method with a placeholder in any of its key fields becomes a wildcard
+edge in the trie, which is tested field by field; all others become exact
+edges, which are found by a dict lookup. Parameter values and extra
+information are checked when a candidate pattern is verified.
+"""
+from cf_cell_methods.fast_parser import decode_bytes_like
+from cf_cell_methods.patterns import (
+    compile_pattern, scan_values, LITERAL, ANY, VARIABLE,
+)
+
+
+# Positions of the key fields in a cell method's field values (and field
+# tests): name, method, where, over, within. See `fast_parser.values`.
+_key_positions = (0, 1, 3, 4, 5)
+
+
+def _edge(cell_method_tests):
+    """
+    Return the trie edge for a compiled template cell method: an exact key,
+    or a tuple of field tests for a wildcard edge. Return also whether the
+    edge is exact.
+    """
+    tests = tuple(cell_method_tests[i] for i in _key_positions)
+    # Parameters are either a literal tuple or a tuple of tests.
+    count = len(cell_method_tests[2][1])
+    if all(kind == LITERAL for kind, _ in tests):
+        name, method, where, over, within = (value for _, value in tests)
+        return (name, (method, count), where, over, within), True
+    return (tests, count), False
+
+
+def _matches_edge(edge, key):
+    tests, count = edge
+    name, (method, params_count), where, over, within = key
+    if params_count != count:
+        return False
+    values = (name, method, where, over, within)
+    for (kind, expected), value in zip(tests, values):
+        if kind == LITERAL:
+            if value != expected:
+                return False
+        elif kind in (ANY, VARIABLE):
+            if value is None:
+                return False
+    return True
+
+
+def _object_key(cm):
+    return cm.name, cm.method.signature(), cm.where, cm.over, cm.within
+
+
+def _values_key(values):
+    name, method, params, where, over, within, _ = values
+    return name, (method, len(params)), where, over, within
+
+
+class _Node:
+    __slots__ = ("children", "wild_children", "patterns")
+
+    def __init__(self):
+        self.children = {}
+        self.wild_children = {}
+        self.patterns = []
+
+
+class Classifier:
+    """
+    A registry of named patterns, compiled into a trie. `classify` returns
+    the name and variable bindings of every pattern an input matches.
+    """
+
+    def __init__(self, patterns=None):
+        self._root = _Node()
+        self.patterns = {}
+        for name, pattern in (patterns or {}).items():
+            self.add(name, pattern)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def add(self, name, pattern):
+        """Add a pattern (a template or a compiled `Pattern`) by name."""
+        if isinstance(pattern, str):
+            pattern = compile_pattern(pattern)
+        if name in self.patterns:
+            raise ValueError(f"Pattern '{name}' is already registered")
+        self.patterns[name] = pattern
+        node = self._root
+        for cell_method_tests in pattern.cell_methods:
+            edge, exact = _edge(cell_method_tests)
+            children = node.children if exact else node.wild_children
+            node = children.setdefault(edge, _Node())
+        node.patterns.append((name, pattern))
+
+    def _candidates(self, keys):
+        nodes = [self._root]
+        for key in keys:
+            next_nodes = []
+            for node in nodes:
+                child = node.children.get(key)
+                if child is not None:
+                    next_nodes.append(child)
+                for edge, child in node.wild_children.items():
+                    if _matches_edge(edge, key):
+                        next_nodes.append(child)
+            if not next_nodes:
+                return ()
+            nodes = next_nodes
+        return [candidate for node in nodes for candidate in node.patterns]
+
+    def classify(self, cell_methods):
+        """
+        Classify a cell_methods string or parsed representation. Return a
+        dict mapping the name of each matching pattern to its bindings.
+        """
+        cell_methods = decode_bytes_like(cell_methods)
+        if isinstance(cell_methods, str):
+            values = scan_values(cell_methods)
+            if values is None:
+                return {}
+            candidates = self._candidates(_values_key(v) for v in values)
+            match = lambda pattern: pattern.match_values(values)
+        else:
+            if cell_methods is None:
+                return {}
+            candidates = self._candidates(
+                _object_key(cm) for cm in cell_methods
+            )
+            match = lambda pattern: pattern.match(cell_methods)
+        hits = {}
+        for name, pattern in candidates:
+            bindings = match(pattern)
+            if bindings is not None:
+                hits[name] = bindings
+        return hits
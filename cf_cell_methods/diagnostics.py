@@ -0,0 +1,238 @@
+"""
+Parsing with structured diagnostics.
+
+`parse` reports errors in malformed strings by printing them (the SLY
+lexer to stdout, the SLY parser to stderr), and returns None for strings
+with syntax errors. `diagnose` instead collects the errors as `Diagnostic`
+objects, without any I/O, and recovers the valid cell methods of a
+malformed string.
+
+`quiet_parse` is `parse` without the printing: its results are those of
+`parse`, including those of SLY's own error recovery.
+
+Cell methods are scanned by the fast scanner (see `fast_parser`). Where it
+fails, recovery relies on every cell method beginning with `NAME COLON`:
+the tokens up to the next such pair are parsed on their own by the SLY
+parser, and dropped if they have a syntax error, with a diagnostic for the
+first error in them. Lexical errors (unexpected characters) are skipped,
+as by `parse`.
+"""
+import re
+import threading
+from collections import Counter, namedtuple
+from cf_cell_methods import fast_parser
+from cf_cell_methods.cache import copy_cell_methods
+from cf_cell_methods.fast_parser import _end_pattern
+from cf_cell_methods.representation import CellMethods
+
+
+Diagnostic = namedtuple("Diagnostic", "position kind text expected")
+Diagnostic.__doc__ = """
+An error in a cell_methods string: its position (index in the string),
+kind (one of the constants below), offending text, and the names of the
+tokens that were expected there (empty for lexical errors).
+"""
+
+# Kinds of errors
+UNEXPECTED_CHARACTER = "unexpected character"
+UNEXPECTED_TOKEN = "unexpected token"
+UNEXPECTED_END = "unexpected end"
+
+Diagnosis = namedtuple("Diagnosis", "result diagnostics")
+Diagnosis.__doc__ = """
+The result of `diagnose`: the `CellMethods` recovered from a string (None
+if there are none), and a tuple of `Diagnostic`s, in order of position.
+"""
+
+
+class _SyntaxError(Exception):
+    pass
+
+
+_num = re.compile(fast_parser.num_token)
+
+
+def _text(string, token):
+    """Return the text of a token in a string."""
+    if token.type == "EXTRA_INFO":
+        return f"({token.value})"
+    if token.type == "NUM":
+        return _num.match(string, token.index).group()
+    return token.value
+
+
+# A lexer and parser per thread (see `cf_cell_methods.sly_parse`), whose
+# error handlers record diagnostics instead of printing.
+_thread_local = threading.local()
+
+
+def _sly():
+    try:
+        return _thread_local.sly
+    except AttributeError:
+        pass
+    from cf_cell_methods import _load_sly
+
+    CfcmLexer, CfcmParser = _load_sly()
+    lexer, parser = CfcmLexer(), CfcmParser()
+    # Diagnostics of the current string.
+    diagnostics = []
+    actions = CfcmParser._lrtable.lr_action
+
+    def lexer_error(t):
+        diagnostics.append(
+            Diagnostic(lexer.index, UNEXPECTED_CHARACTER, t.value[0], ())
+        )
+        lexer.index += 1
+
+    def parser_error(token):
+        expected = tuple(
+            sorted(
+                "END" if name == "$end" else name
+                for name in actions[parser.state]
+                if name != "error"
+            )
+        )
+        raise _SyntaxError(token, expected)
+
+    lexer.error = lexer_error
+    parser.error = parser_error
+    _thread_local.sly = lexer, parser, diagnostics
+    return _thread_local.sly
+
+
+def _quiet_sly():
+    try:
+        return _thread_local.quiet_sly
+    except AttributeError:
+        pass
+    from cf_cell_methods import _load_sly
+
+    CfcmLexer, CfcmParser = _load_sly()
+    lexer, parser = CfcmLexer(), CfcmParser()
+
+    def lexer_error(t):
+        lexer.index += 1
+
+    lexer.error = lexer_error
+    parser.error = lambda token: None
+    _thread_local.quiet_sly = lexer, parser
+    return _thread_local.quiet_sly
+
+
+def quiet_parse(string):
+    """
+    Parse a cell_methods string as `parse` does, but without printing
+    errors. The string may also be bytes-like.
+    """
+    string = fast_parser.decode(string)
+    matches = fast_parser.scan(string)
+    if matches is not None:
+        return CellMethods(map(fast_parser.cell_method, matches))
+    lexer, parser = _quiet_sly()
+    result = parser.parse(lexer.tokenize(string))
+    return result if result is None else CellMethods(result)
+
+
+def _part(lexer, string, pos):
+    """
+    Lex the tokens of a string from a position up to the next `NAME COLON`
+    pair (but the first). Return them, and the token NAME (None if none).
+    """
+    part = []
+    for token in lexer.tokenize(string, index=pos):
+        if token.type == "COLON" and len(part) > 1:
+            if part[-1].type == "NAME":
+                return part, part.pop()
+        part.append(token)
+    return part, None
+
+
+def diagnose(string):
+    """
+    Parse a cell_methods string, collecting errors. Return a `Diagnosis`.
+    The string may also be bytes-like, as for `parse`.
+    """
+    string = fast_parser.decode(string)
+    lexer, parser, diagnostics = _sly()
+    diagnostics.clear()
+    cell_methods = CellMethods()
+    match_cell_method = fast_parser.cell_method_pattern.match
+    pos = 0
+    # The position of the last cell method scanned, since the last part.
+    last = None
+    # Scan cell methods with the fast scanner. Where it fails, the last cell
+    # method scanned may be incomplete (e.g., `time: mean over`): parse
+    # the part from it up to the next cell method with SLY, then resume.
+    while pos is not None:
+        match = match_cell_method(string, pos)
+        if match is not None:
+            cell_methods.append(fast_parser.cell_method(match))
+            last, pos = pos, match.end()
+            continue
+        if cell_methods and _end_pattern.match(string, pos):
+            break
+        if last is not None:
+            cell_methods.pop()
+            pos, last = last, None
+        part, next_token = _part(lexer, string, pos)
+        pos = None if next_token is None else next_token.index
+        try:
+            cell_methods.extend(parser.parse(iter(part)))
+        except _SyntaxError as e:
+            # If the part ended before the cell method was complete, the
+            # unexpected token is the next one.
+            token, expected = e.args
+            token = token or next_token
+            if token is None:
+                diagnostic = Diagnostic(
+                    len(string), UNEXPECTED_END, "", expected
+                )
+            else:
+                diagnostic = Diagnostic(
+                    token.index,
+                    UNEXPECTED_TOKEN,
+                    _text(string, token),
+                    expected,
+                )
+            diagnostics.append(diagnostic)
+    return Diagnosis(
+        cell_methods or None,
+        tuple(sorted(diagnostics, key=lambda d: d.position)),
+    )
+
+
+def diagnose_many(strings):
+    """
+    Diagnose an iterable of cell_methods strings. Return a list of
+    `Diagnosis`es in input order. Each distinct string is parsed only once,
+    as by `parse_many`.
+    """
+    diagnosed = {}
+    results = []
+    for string in strings:
+        key = (
+            bytes(string) if isinstance(string, (bytearray, memoryview))
+            else string
+        )
+        if key in diagnosed:
+            result, diagnostics = diagnosed[key]
+            diagnosis = Diagnosis(copy_cell_methods(result), diagnostics)
+        else:
+            diagnosis = diagnosed[key] = diagnose(string)
+        results.append(diagnosis)
+    return results
+
+
+def error_counts(diagnoses):
+    """
+    Return a `Counter` of the errors in `Diagnosis`es: the number of
+    diagnostics of each kind, and, under "strings", the number of strings
+    with any.
+    """
+    counts = Counter()
+    for _, diagnostics in diagnoses:
+        if diagnostics:
+            counts["strings"] += 1
+            counts.update(diagnostic.kind for diagnostic in diagnostics)
+    return counts
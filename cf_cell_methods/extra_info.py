@@ -0,0 +1,65 @@
+"""
+Parsing of the content of extra method information.
+
+Extra information is lexed as a single parenthesis-delimited token. Its
+content is parsed separately, here, so that both parsing engines share it.
+
+The content is any number of standardized intervals, e.g.,
+`interval: 1 day interval: 0.5 degree`, optionally followed by
+`comment: ` and a comment, or just a non-standardized comment. It is
+scanned in one pass: a precompiled pattern matches each interval in turn,
+and the rest is the comment, which is never matched against (so long
+comments cost no more than taking a slice).
+"""
+import re
+from time import perf_counter
+from cf_cell_methods import instrumentation
+from cf_cell_methods.representation import ExtraInfo, SxiInterval
+
+
+_interval = re.compile(r"\s*interval:\s+(\d+(?:\.\d+)?)\s+(\w+)")
+_comment = re.compile(r"\s+comment: ")
+
+
+def scan_extra_info(text):
+    """
+    Scan the content of extra info (without parentheses). Return a list of
+    its intervals (`SxiInterval`s), and its comment (None if empty).
+    """
+    intervals = []
+    match_interval = _interval.match
+    pos = 0
+    while True:
+        match = match_interval(text, pos)
+        if match is None:
+            break
+        value, unit = match.groups()
+        intervals.append(SxiInterval(float(value), unit))
+        pos = match.end()
+    if intervals:
+        match = _comment.match(text, pos)
+        if match is not None:
+            pos = match.end()
+    return intervals, text[pos:] or None
+
+
+def parse_extra_info(text):
+    """
+    Parse the content of extra info (without parentheses) to `ExtraInfo`.
+    Its `standardized` part is None, an `SxiInterval`, or a tuple of them
+    if there are several.
+    """
+    recorder = instrumentation.active
+    if recorder is not None:
+        start = perf_counter()
+    intervals, comment = scan_extra_info(text)
+    if not intervals:
+        standardized = None
+    elif len(intervals) == 1:
+        standardized = intervals[0]
+    else:
+        standardized = tuple(intervals)
+    result = ExtraInfo(standardized, comment)
+    if recorder is not None:
+        recorder.add({"extra_info": 1}, {"extra_info": perf_counter() - start})
+    return result
@@ -0,0 +1,164 @@
+"""
+A hand-written, single-pass parser for cell_methods strings.
+
+This is an alternative to the SLY engine (`CfcmLexer` and `CfcmParser`) for
+the same grammar. It is considerably faster, since it neither builds token
+objects nor drives an LALR table.
+
+The grammar of a single cell method is regular, so each cell method is
+recognized by one precompiled pattern, and the start symbol
+
+    cell_methods : cell_method*
+
+is a loop over that pattern. Each pattern element corresponds to a token of
+`CfcmLexer`, and is delimited as that lexer would delimit it (keywords are
+not names, a name is never followed directly by a name character, etc.).
+
+Malformed input is handed over to the SLY engine, so that its behaviour on
+syntax errors (error messages, error recovery) is reproduced exactly.
+
+Input may also be bytes-like (`bytes`, `bytearray`, `memoryview`), as
+attribute values come from NetCDF libraries. It is decoded (as UTF-8) once,
+up front. Scanning the bytes and decoding each field instead turns out to
+be slower: every field then costs two allocations rather than one.
+"""
+import re
+from cf_cell_methods.representation import CellMethods, CellMethod, Method
+from cf_cell_methods.extra_info import parse_extra_info
+
+
+# Token patterns. See `CfcmLexer`.
+_ignore = r"[ \t]*"
+name_token = (
+    r"(?!(?:where|over|within)(?![a-zA-Z0-9_]))"
+    r"[a-zA-Z_][a-zA-Z0-9_]*(?![a-zA-Z0-9_])"
+)
+num_token = r"\d+(?:\.\d+)?"
+
+
+def _keyword(keyword):
+    return rf"{_ignore}{keyword}(?![a-zA-Z0-9_])"
+
+
+def compile_cell_method_pattern(name=name_token, num=num_token):
+    """
+    Compile the pattern for a single cell method. The patterns for the
+    NAME and NUM tokens can be replaced, e.g., to admit placeholders.
+    """
+    return re.compile(
+        rf"""
+        {_ignore} (?P<name>{name})
+        {_ignore} :
+        {_ignore} (?P<method>{name})
+        (?:
+            {_ignore} \[
+            (?P<params> {_ignore} {num} (?: {_ignore} , {_ignore} {num} )* )
+            {_ignore} \]
+        )?
+        (?:
+            {_keyword("within")} {_ignore} (?P<within>{name})
+        |
+            (?: {_keyword("where")} {_ignore} (?P<where>{name}) )?
+            (?: {_keyword("over")} {_ignore} (?P<over>{name}) )?
+        )
+        (?: {_ignore} \( (?P<extra_info>[^)]*) \) )?
+        """,
+        re.VERBOSE,
+    )
+
+
+cell_method_pattern = compile_cell_method_pattern()
+
+_end_pattern = re.compile(rf"{_ignore}\Z")
+
+fields = ("name", "method", "params", "where", "over", "within", "extra_info")
+
+
+def scan(string, pattern=cell_method_pattern):
+    """
+    Scan a cell_methods string. Return a list of match objects of
+    `pattern`, one per cell method, or None if the string is malformed.
+    """
+    matches = []
+    match_cell_method = pattern.match
+    pos = 0
+    while True:
+        match = match_cell_method(string, pos)
+        if match is None:
+            break
+        matches.append(match)
+        pos = match.end()
+    if not matches or _end_pattern.match(string, pos) is None:
+        return None
+    return matches
+
+
+def parse_params(params):
+    """Convert the params group of a match to a tuple of floats."""
+    if params is None:
+        return ()
+    return tuple(float(param) for param in params.split(","))
+
+
+def values(match):
+    """
+    Return the values of the fields of a cell method from a match of
+    `cell_method_pattern`, in the order
+    (name, method, params, where, over, within, extra_info).
+    """
+    name, method, params, where, over, within, extra_info = match.group(
+        *fields
+    )
+    return (
+        name,
+        method,
+        parse_params(params),
+        where,
+        over,
+        within,
+        None if extra_info is None else parse_extra_info(extra_info),
+    )
+
+
+def cell_method(match):
+    """Build a `CellMethod` from a match of `cell_method_pattern`."""
+    name, method, params, where, over, within, extra_info = match.group(
+        *fields
+    )
+    return CellMethod(
+        name,
+        Method(method, params and parse_params(params)),
+        where=where,
+        over=over,
+        within=within,
+        extra_info=(
+            None if extra_info is None else parse_extra_info(extra_info)
+        ),
+    )
+
+
+def decode(string):
+    """Decode a bytes-like string (as UTF-8). Leave str (and None) as is."""
+    if string is None or isinstance(string, str):
+        return string
+    return str(string, "utf-8", "replace")
+
+
+def decode_bytes_like(value):
+    """
+    Decode bytes-like input, as `decode` does. Leave anything else (e.g.,
+    parsed cell methods) as is.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return str(value, "utf-8", "replace")
+    return value
+
+
+def parse(string):
+    string = decode(string)
+    matches = scan(string)
+    if matches is None:
+        from cf_cell_methods import sly_parse
+        result = sly_parse(string)
+        return result if result is None else CellMethods(result)
+    return CellMethods([cell_method(match) for match in matches])
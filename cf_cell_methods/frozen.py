@@ -0,0 +1,216 @@
+"""
+Immutable variant of the representation classes.
+
+Objects are `__slots__`-based, cannot be modified after construction, and
+are hashable, so they can be used as dict keys and set members and shared
+freely between threads and caches. `CellMethods` is a tuple.
+
+String conversion and matching are shared with the mutable classes in
+`cf_cell_methods.representation`, so `str()` output is identical.
+Use `freeze` and `thaw` to convert between the two variants.
+"""
+from operator import attrgetter
+from cf_cell_methods import representation, parse as parse_mutable
+
+
+class Frozen:
+    """
+    Base class for immutable representation objects. Subclasses list their
+    attributes in `__slots__` (slots starting with "_" are caches, not
+    attributes); the hash is computed once, on construction.
+    """
+    __slots__ = ("_hash",)
+
+    def __init__(self, **kwargs):
+        for attr, value in kwargs.items():
+            object.__setattr__(self, attr, value)
+        object.__setattr__(
+            self, "_hash", hash((type(self).__name__, self._key(self)))
+        )
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = [attr for attr in cls.__slots__ if not attr.startswith("_")]
+        if len(fields) > 1:
+            cls._key = staticmethod(attrgetter(*fields))
+
+    def __setattr__(self, attr, value):
+        raise AttributeError(f"{type(self).__name__} object is immutable")
+
+    def __delattr__(self, attr):
+        raise AttributeError(f"{type(self).__name__} object is immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self._key(self) == other._key(other)
+        )
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return type(self), self._key(self)
+
+    match = representation.CellMethod.match
+
+
+class CellMethods(tuple):
+    # A tuple subclass cannot have non-empty `__slots__`: each `CellMethod`
+    # caches its own `str()` instead.
+    __slots__ = ()
+
+    __str__ = representation.CellMethods.__str__
+
+    match = representation.CellMethods.match
+    startswith = representation.CellMethods.startswith
+    endswith = representation.CellMethods.endswith
+
+    def __getitem__(self, index):
+        result = tuple.__getitem__(self, index)
+        return CellMethods(result) if isinstance(index, slice) else result
+
+    def __add__(self, other):
+        return CellMethods(tuple.__add__(self, tuple(other)))
+
+    def __radd__(self, other):
+        return CellMethods(tuple.__add__(tuple(other), self))
+
+
+class CellMethod(Frozen):
+    __slots__ = (
+        "name", "method", "where", "over", "within", "extra_info", "_str",
+    )
+
+    def __init__(
+        self, name, method, where=None, over=None, within=None, extra_info=None
+    ):
+        if (where is not None or over is not None) and within is not None:
+            raise ValueError(
+                "'where' and/or 'over' are mutually exclusive with 'within'"
+            )
+        super().__init__(
+            name=name,
+            method=method,
+            where=where,
+            over=over,
+            within=within,
+            extra_info=extra_info,
+        )
+
+    def __str__(self):
+        # Safe to cache, as the contents are immutable.
+        try:
+            return self._str
+        except AttributeError:
+            string = representation.CellMethod.__str__(self)
+            object.__setattr__(self, "_str", string)
+            return string
+
+
+class ExtraInfo(Frozen):
+    __slots__ = ("standardized", "non_standardized")
+
+    def __init__(self, standardized, non_standardized):
+        super().__init__(
+            standardized=standardized, non_standardized=non_standardized
+        )
+
+    intervals = representation.ExtraInfo.intervals
+    __str__ = representation.ExtraInfo.__str__
+
+
+class StandardizedExtraInfo(Frozen):
+    __slots__ = ()
+
+
+class SxiInterval(StandardizedExtraInfo):
+    __slots__ = ("value", "unit")
+
+    def __init__(self, value, unit):
+        super().__init__(value=value, unit=unit)
+
+    __str__ = representation.SxiInterval.__str__
+
+
+class Method(Frozen):
+    __slots__ = ("name", "params")
+
+    def __init__(self, name, params):
+        super().__init__(name=name, params=tuple(params or ()))
+
+    signature = representation.Method.signature
+    __str__ = representation.Method.__str__
+
+
+def freeze(obj):
+    """
+    Convert a (mutable) representation object, or a list of them, into its
+    immutable equivalent. None converts to None.
+    """
+    if obj is None or isinstance(obj, (Frozen, CellMethods)):
+        return obj
+    if isinstance(obj, list):
+        return CellMethods(freeze(cm) for cm in obj)
+    if isinstance(obj, representation.CellMethod):
+        return CellMethod(
+            obj.name,
+            freeze(obj.method),
+            where=obj.where,
+            over=obj.over,
+            within=obj.within,
+            extra_info=freeze(obj.extra_info),
+        )
+    if isinstance(obj, representation.Method):
+        return Method(obj.name, obj.params)
+    if isinstance(obj, representation.ExtraInfo):
+        return ExtraInfo(freeze(obj.standardized), obj.non_standardized)
+    if isinstance(obj, representation.SxiInterval):
+        return SxiInterval(obj.value, obj.unit)
+    if isinstance(obj, tuple):  # several intervals
+        return tuple(map(freeze, obj))
+    raise TypeError(f"Cannot freeze object of type {type(obj).__name__}")
+
+
+def thaw(obj):
+    """
+    Convert an immutable representation object into its mutable equivalent.
+    None converts to None.
+    """
+    if obj is None:
+        return None
+    if isinstance(obj, CellMethods):
+        return representation.CellMethods(thaw(cm) for cm in obj)
+    if isinstance(obj, CellMethod):
+        return representation.CellMethod(
+            obj.name,
+            thaw(obj.method),
+            where=obj.where,
+            over=obj.over,
+            within=obj.within,
+            extra_info=thaw(obj.extra_info),
+        )
+    if isinstance(obj, Method):
+        return representation.Method(obj.name, obj.params)
+    if isinstance(obj, ExtraInfo):
+        return representation.ExtraInfo(
+            thaw(obj.standardized), obj.non_standardized
+        )
+    if isinstance(obj, SxiInterval):
+        return representation.SxiInterval(obj.value, obj.unit)
+    if isinstance(obj, tuple):  # several intervals
+        return tuple(map(thaw, obj))
+    raise TypeError(f"Cannot thaw object of type {type(obj).__name__}")
+
+
+def parse(string):
+    """Parse a cell_methods string into an immutable representation."""
+    return freeze(parse_mutable(string))
@@ -0,0 +1,154 @@
+"""
+Incremental re-parsing of edited cell_methods strings.
+
+An `IncrementalParse` holds the parse of a string, split into segments, one
+per cell method, as scanned by `fast_parser.scan`. `edit` applies an edit
+(offset, deleted length, inserted text) and returns the parse of the
+edited string, re-scanning only the segments around the edit and reusing
+the `CellMethod` objects of the others, e.g.,
+
+    state = IncrementalParse("time: mean area: sum")
+    state = state.edit(6, 4, "max")  # "time: max area: sum"
+    state.result
+
+`result` is always what `parse` returns for the string. The results of
+successive edits share their untouched `CellMethod` objects.
+
+Matching a cell method at a position depends only on the text after it,
+up to at most the name of the next cell method (where matching of the
+optional clauses fails). An edit within segment i therefore leaves
+segments before i - 1 unchanged; re-scanning starts at segment i - 1. Once
+re-scanning, past the edit, reaches a position at which an old segment
+started, the rest of the text is unchanged, and so are the rest of the
+segments. Text after the last segment (normally only white space) is
+treated as a segment of its own.
+
+Malformed strings are parsed in full by the SLY engine, as `parse` does
+(see `fast_parser`), for its error recovery, but without printing errors
+(see `diagnostics.quiet_parse`). An edit that leaves the string malformed
+therefore costs a full parse, which is slower than a full parse by the
+fast engine of a well-formed string of the same length.
+"""
+from bisect import bisect_left, bisect_right
+from cf_cell_methods.diagnostics import quiet_parse
+from cf_cell_methods.representation import CellMethods
+from cf_cell_methods.fast_parser import (
+    cell_method, cell_method_pattern, decode, _end_pattern,
+)
+
+
+class IncrementalParse:
+    """The parse of a cell_methods string. See module docstring."""
+
+    def __init__(self, string):
+        self.string = decode(string)
+        self._scan(0, [], [])
+
+    # The bounds of the segments are kept in a list, in which segment i is
+    # `string[bounds[i]:bounds[i + 1]]`, and the last bound is the start of
+    # the text after the last segment. Bounds before index `_split` are
+    # positions; bounds from it on (those after the last edit) are
+    # positions relative to the end of the string (`position - len(string)`)
+    # so that an edit needs not shift them.
+
+    def _position(self, i):
+        """Return the position of bound i."""
+        bound = self._bounds[i]
+        return bound if i < self._split else bound + len(self.string)
+
+    def _bisect(self, bisect, position):
+        """Bisect (`bisect_left` or `bisect_right`) bounds for a position."""
+        bounds, split = self._bounds, self._split
+        i = bisect(bounds, position, 0, split)
+        if i < split:
+            return i
+        return bisect(bounds, position - len(self.string), split)
+
+    def _positions(self, start, stop):
+        """Return a list of the positions of bounds start to stop."""
+        bounds, split = self._bounds, self._split
+        if stop <= split:
+            return bounds[start:stop]
+        length = len(self.string)
+        return bounds[start:split] + [
+            bound + length for bound in bounds[max(start, split):stop]
+        ]
+
+    def _relative(self, start):
+        """Return a list of the relative positions of bounds from start on."""
+        bounds, split = self._bounds, self._split
+        if start >= split:
+            return bounds[start:]
+        length = len(self.string)
+        return [bound - length for bound in bounds[start:split]] + (
+            bounds[split:]
+        )
+
+    def _scan(self, pos, bounds, cell_methods, previous=None, j=0, delta=0):
+        """
+        Scan `string` from `pos` on, given the bounds (positions) and cell
+        methods of the segments before `pos`. With `previous` (the parse
+        before an edit, of which `delta` is the change in length), stop at
+        the first position at which a segment of `previous` from the `j`th
+        on (those after the edit) started.
+        """
+        string = self.string
+        match_cell_method = cell_method_pattern.match
+        # The next position at which a segment of `previous` started.
+        split = position = None
+        if previous is not None:
+            last = len(previous._bounds) - 1
+            position = previous._position(j) + delta if j <= last else None
+        while True:
+            while position is not None and position < pos:
+                j += 1
+                position = (
+                    previous._position(j) + delta if j <= last else None
+                )
+            if position == pos:
+                split = len(bounds)
+                bounds.extend(previous._relative(j))
+                cell_methods.extend(previous._cell_methods[j:])
+                blank_tail = previous._blank_tail
+                break
+            match = match_cell_method(string, pos)
+            bounds.append(pos)
+            if match is None:
+                blank_tail = _end_pattern.match(string, pos) is not None
+                break
+            cell_methods.append(cell_method(match))
+            pos = match.end()
+        self._bounds = bounds
+        self._split = len(bounds) if split is None else split
+        self._cell_methods = cell_methods
+        self._blank_tail = blank_tail
+        if blank_tail and cell_methods:
+            self.result = CellMethods(cell_methods)
+        else:
+            self.result = quiet_parse(string)
+
+    def edit(self, offset, deleted=0, inserted=""):
+        """
+        Return the parse of the string edited by deleting `deleted`
+        characters at `offset`, and inserting `inserted` there.
+        """
+        inserted = decode(inserted)
+        end = offset + deleted
+        if not 0 <= offset <= end <= len(self.string):
+            raise ValueError(
+                f"Edit [{offset}:{end}] out of range of string of length "
+                f"{len(self.string)}"
+            )
+        # Re-scan from the segment before the one containing the edit.
+        start = max(self._bisect(bisect_right, offset) - 2, 0)
+        edited = IncrementalParse.__new__(IncrementalParse)
+        edited.string = self.string[:offset] + inserted + self.string[end:]
+        edited._scan(
+            self._position(start),
+            self._positions(0, start),
+            self._cell_methods[:start],
+            previous=self,
+            j=self._bisect(bisect_left, end),
+            delta=len(inserted) - deleted,
+        )
+        return edited
@@ -0,0 +1,184 @@
+"""
+Opt-in instrumentation of the parse pipeline.
+
+While a `Recorder` is active, the pipeline records counters and
+cumulative timings (in seconds) of its stages:
+
+- strings, invalid, parse: strings parsed (by either engine, through
+  `parse`, `parse_many`, `parse_parallel`, `aparse` or a `PersistentCache`),
+  those that were invalid, and the time spent on them
+- tokens, lex: tokens produced by the SLY lexer, and the time spent on it
+- reductions, reduce: grammar reductions of the SLY parser, and the time
+  spent parsing the tokens (excluding lexing)
+- extra_info: extra information parsed (either engine), and the time spent
+- errors: lexical and syntax errors reported by the SLY engine
+- cache_hits, cache_misses: lookups in a `ParseCache`
+- semantics: calls to the pattern-based predicates of
+  `cf_cell_methods.semantics`, and the time spent in them
+
+Timings are inclusive: for example, `parse` includes `lex` and `reduce`,
+which include `extra_info`.
+
+Use the context manager `instrument`, or `enable` and `disable`, e.g.
+
+    with instrument() as recorder:
+        parse_many(strings)
+    print(recorder.as_dict())
+
+The recorder is global, so that it sees work done in all threads, but not
+in other processes: only strings, invalid and parse are recorded for the
+worker processes of `parse_parallel`, and nothing for an `AsyncParser`
+with a process pool executor. When no recorder is active, the cost to the
+pipeline is a test of `active` at each instrumented point.
+"""
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from copy import copy
+from time import perf_counter
+from types import SimpleNamespace
+
+
+# The active recorder, or None.
+active = None
+
+
+class Recorder:
+    """Accumulates counters and timings. Safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = Counter()
+        self.timings = defaultdict(float)
+
+    def add(self, counters=None, timings=None):
+        """Add to counters and timings (dicts of name to amount)."""
+        with self._lock:
+            if counters:
+                self.counters.update(counters)
+            if timings:
+                for name, elapsed in timings.items():
+                    self.timings[name] += elapsed
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timings.clear()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timings": dict(self.timings),
+            }
+
+
+def enable(recorder=None):
+    """Make a recorder (by default, a new one) active. Return it."""
+    global active
+    active = recorder or Recorder()
+    return active
+
+
+def disable():
+    """Deactivate recording. Return the recorder that was active."""
+    global active
+    recorder, active = active, None
+    return recorder
+
+
+@contextmanager
+def instrument(callback=None):
+    """
+    Record within a context. Yield the recorder. On exit, the previously
+    active recorder (if any) is restored, and `callback`, if given, is
+    called with the collected data (see `Recorder.as_dict`).
+    """
+    global active
+    previous = active
+    recorder = enable()
+    try:
+        yield recorder
+    finally:
+        active = previous
+        if callback is not None:
+            callback(recorder.as_dict())
+
+
+def record(stage, elapsed, count=1):
+    """Record `count` occurrences of a stage taking `elapsed` seconds."""
+    recorder = active
+    if recorder is not None:
+        recorder.add({stage: count}, {stage: elapsed})
+
+
+def parse(parse_engine, string):
+    """Parse a string with an engine function, recording it."""
+    recorder = active
+    start = perf_counter()
+    result = parse_engine(string)
+    elapsed = perf_counter() - start
+    if recorder is not None:
+        recorder.add(
+            {"strings": 1, "invalid": result is None}, {"parse": elapsed}
+        )
+    return result
+
+
+# The SLY engine is instrumented through a separate lexer and parser pair
+# per thread. Lexing is done ahead of parsing, to time them separately.
+# Reductions are counted by wrapping the production functions, which the
+# parser looks up through its `_grammar` (a SLY internal). Errors are
+# counted by wrapping the error handlers.
+_thread_local = threading.local()
+
+
+def _counting(func, counter):
+    def counting_func(self, *args):
+        counter[0] += 1
+        return func(self, *args)
+    return counting_func
+
+
+def _instrumented_sly():
+    from cf_cell_methods import _load_sly
+
+    CfcmLexer, CfcmParser = _load_sly()
+    lexer, parser = CfcmLexer(), CfcmParser()
+    # Counts of [reductions] and [errors], for the current string.
+    reductions, errors = [0], [0]
+    productions = []
+    for production in CfcmParser._grammar.Productions:
+        production = copy(production)
+        if production.func is not None:
+            production.func = _counting(production.func, reductions)
+        productions.append(production)
+    parser._grammar = SimpleNamespace(Productions=productions)
+    lexer.error = _counting(CfcmLexer.error, errors).__get__(lexer)
+    parser.error = _counting(CfcmParser.error, errors).__get__(parser)
+    return lexer, parser, reductions, errors
+
+
+def sly_parse(recorder, string):
+    """Parse a string with the SLY engine, recording it."""
+    try:
+        lexer, parser, reductions, errors = _thread_local.sly
+    except AttributeError:
+        lexer, parser, reductions, errors = _thread_local.sly = (
+            _instrumented_sly()
+        )
+    reductions[0] = errors[0] = 0
+    start = perf_counter()
+    tokens = list(lexer.tokenize(string))
+    lexed = perf_counter()
+    result = parser.parse(iter(tokens))
+    parsed = perf_counter()
+    recorder.add(
+        {
+            "tokens": len(tokens),
+            "reductions": reductions[0],
+            "errors": errors[0],
+        },
+        {"lex": lexed - start, "reduce": parsed - lexed},
+    )
+    return result
@@ -0,0 +1,261 @@
+"""
+Compiled match specifications.
+
+The `match` methods of the representation classes take a specification
+of attribute values as keyword arguments, e.g.,
+
+    cell_method.match(name="time", method={"name": "mean"})
+
+and interpret it anew on every call. A `MatchSpec` is the same
+specification validated once against the fields of the classes, and
+compiled to a flat list of field accessors and tests, to be applied to
+many objects:
+
+    spec = compile_match(name="time", method={"name": "mean"})
+    matching = [cm for cm in cell_methods if spec.match(cm)]
+
+In a specification, a dict matches the fields of a compound value (as
+`match` of its class does); None matches None; a `Matcher` tests the
+value; anything else matches an equal value. The matchers are
+
+- `AnyOf(*values)`: any of the given values;
+- `Range(low, high)`: a number within bounds (inclusive, either optional);
+- `Regex(pattern)`: a string in which the regular expression is found.
+
+A tuple of matchers, e.g., `method={"params": (Range(90, 100),)}`,
+matches a tuple of as many values, each matched by its matcher. Matchers
+compare equal to the values they match, so they can also be used in the
+`match` methods.
+
+`compile_cell_methods_match` compiles a sequence of specifications, one
+per cell method, to a `CellMethodsMatchSpec`.
+"""
+import re
+from abc import ABC, abstractmethod
+from functools import partial
+from operator import attrgetter, eq, is_
+from cf_cell_methods.representation import (
+    CellMethod, Method, ExtraInfo, SxiInterval,
+)
+
+
+class Matcher(ABC):
+    """Base class of matchers. Subclasses define `test(value)`."""
+
+    @abstractmethod
+    def test(self, value):
+        """Test (bool) whether a value matches."""
+
+    def __eq__(self, other):
+        return self.test(other)
+
+    __hash__ = None
+
+
+class AnyOf(Matcher):
+    """Match any of the given values."""
+
+    def __init__(self, *values):
+        self.values = values
+        try:
+            self._set = frozenset(values)
+        except TypeError:  # unhashable values
+            self._set = None
+
+    def test(self, value):
+        if self._set is not None:
+            try:
+                return value in self._set
+            except TypeError:  # unhashable value
+                pass
+        return value in self.values
+
+    def __repr__(self):
+        return f"AnyOf({', '.join(map(repr, self.values))})"
+
+
+class Range(Matcher):
+    """Match a number between `low` and `high` (inclusive), if given."""
+
+    def __init__(self, low=None, high=None):
+        self.low = low
+        self.high = high
+
+    def test(self, value):
+        return (
+            value is not None
+            and (self.low is None or self.low <= value)
+            and (self.high is None or value <= self.high)
+        )
+
+    def __repr__(self):
+        return f"Range({self.low!r}, {self.high!r})"
+
+
+class Regex(Matcher):
+    """Match a string in which a regular expression is found."""
+
+    def __init__(self, pattern, flags=0):
+        self.regex = re.compile(pattern, flags)
+
+    def test(self, value):
+        return isinstance(value, str) and self.regex.search(value) is not None
+
+    def __repr__(self):
+        return f"Regex({self.regex.pattern!r})"
+
+
+# The fields of each representation class, and the class of compound
+# values, for those that have one.
+_fields = {
+    CellMethod: {
+        "name": None,
+        "method": Method,
+        "where": None,
+        "over": None,
+        "within": None,
+        "extra_info": ExtraInfo,
+    },
+    Method: {"name": None, "params": None},
+    ExtraInfo: {"standardized": SxiInterval, "non_standardized": None},
+    SxiInterval: {"value": None, "unit": None},
+}
+
+# Fields that are never None, whose fields are accessed directly.
+_required = {(CellMethod, "method")}
+
+
+def _tuple_test(tests, value):
+    return (
+        isinstance(value, tuple)
+        and len(value) == len(tests)
+        and all(test(v) for test, v in zip(tests, value))
+    )
+
+
+def _value_test(expected):
+    """Return a test of a value against a non-dict specification."""
+    if expected is None:
+        return partial(is_, None)
+    if isinstance(expected, Matcher):
+        return expected.test
+    if isinstance(expected, tuple) and any(
+        isinstance(e, Matcher) for e in expected
+    ):
+        return partial(_tuple_test, tuple(map(_value_test, expected)))
+    return partial(eq, expected)
+
+
+def _compound_test(spec, value):
+    return value is not None and not isinstance(value, tuple) and (
+        spec.match(value)
+    )
+
+
+def _compile(cls, spec, prefix=""):
+    """Compile a specification to a list of (accessor, test) pairs."""
+    fields = _fields[cls]
+    tests = []
+    for field, expected in spec.items():
+        if field not in fields:
+            raise ValueError(
+                f"{cls.__name__} has no field '{field}' "
+                f"(it has {', '.join(fields)})"
+            )
+        path = prefix + field
+        if isinstance(expected, dict):
+            field_cls = fields[field]
+            if field_cls is None:
+                raise ValueError(
+                    f"Field '{path}' is not compound; "
+                    f"cannot match {expected!r}"
+                )
+            if (cls, field) in _required:
+                tests += _compile(field_cls, expected, f"{path}.")
+            else:
+                tests.append(
+                    (
+                        attrgetter(path),
+                        partial(
+                            _compound_test, MatchSpec(expected, field_cls)
+                        ),
+                    )
+                )
+        else:
+            tests.append((attrgetter(path), _value_test(expected)))
+    return tests
+
+
+class MatchSpec:
+    """
+    A compiled match specification (a dict of field values) for objects
+    of a representation class, by default `CellMethod`. See module
+    docstring.
+    """
+
+    def __init__(self, spec, cls=CellMethod):
+        if cls not in _fields:
+            raise ValueError(f"Cannot match {cls.__name__} objects")
+        self.spec = spec
+        self.cls = cls
+        self._tests = tuple(_compile(cls, spec))
+
+    def match(self, obj):
+        """Test (bool) whether an object matches this specification."""
+        for get, test in self._tests:
+            if not test(get(obj)):
+                return False
+        return True
+
+    __call__ = match
+
+    def __repr__(self):
+        return f"MatchSpec({self.spec!r}, {self.cls.__name__})"
+
+
+def compile_match(**spec):
+    """Compile a match specification for `CellMethod`s."""
+    return MatchSpec(spec)
+
+
+class CellMethodsMatchSpec:
+    """
+    Compiled match specifications for a sequence of cell methods, one per
+    cell method, in order. Cell methods beyond the specifications are not
+    matched, unless `strict`, in which case there must be none.
+    """
+
+    def __init__(self, specs, strict=False):
+        self.specs = tuple(
+            spec if isinstance(spec, MatchSpec) else MatchSpec(spec)
+            for spec in specs
+        )
+        self.strict = strict
+
+    def match(self, cell_methods):
+        """Test (bool) whether cell methods match these specifications."""
+        if cell_methods is None:
+            return False
+        n = len(cell_methods)
+        if n < len(self.specs) or (self.strict and n > len(self.specs)):
+            return False
+        for spec, cm in zip(self.specs, cell_methods):
+            if not spec.match(cm):
+                return False
+        return True
+
+    __call__ = match
+
+    def __repr__(self):
+        return (
+            f"CellMethodsMatchSpec({list(self.specs)!r}, "
+            f"strict={self.strict})"
+        )
+
+
+def compile_cell_methods_match(*specs, strict=False):
+    """
+    Compile match specifications (dicts, or `MatchSpec`s) for a sequence
+    of cell methods.
+    """
+    return CellMethodsMatchSpec(specs, strict)
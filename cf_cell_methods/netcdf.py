@@ -0,0 +1,248 @@
+"""
+Streaming extraction of cell_methods attributes from NetCDF headers.
+
+Two sources are supported:
+
+- CDL text, as output by `ncdump -h`. It is read line by line.
+- NetCDF classic format files (CDF-1, CDF-2 a.k.a. 64-bit offset, and
+  CDF-5 a.k.a. 64-bit data). Only the header is read, through a memory
+  map, so the size of the data section is irrelevant.
+
+All scanners are generators of records `(file, variable, cell_methods)`,
+where `cell_methods` is the parsed attribute value (None if it is not
+valid). Memory use is bounded regardless of the number or size of files.
+"""
+import mmap
+import os
+import re
+import struct
+from collections import namedtuple
+
+
+Record = namedtuple("Record", "file variable cell_methods")
+
+
+def _default_parse():
+    # Archives repeat a few distinct cell_methods values many times.
+    from cf_cell_methods import cached_parse
+    return cached_parse
+
+
+# CDL
+
+# A variable attribute definition, e.g., `tas:cell_methods = "time: mean" ;`,
+# optionally typed (`string tas:cell_methods = ...`). Variable names in CDL
+# may contain escaped characters.
+_cdl_attribute = re.compile(
+    r'\s*(?:string\s+)?(?P<variable>(?:[^\s:\\]|\\.)+)'
+    r':cell_methods\s*=\s*(?P<rest>.*)'
+)
+_cdl_string = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_cdl_escape = re.compile(r"\\(.)")
+_cdl_escapes = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "b": "\b"}
+
+
+def _cdl_unescape(text):
+    return _cdl_escape.sub(
+        lambda m: _cdl_escapes.get(m.group(1), m.group(1)), text
+    )
+
+
+def scan_cdl(lines, file=None, parse=None):
+    """
+    Scan CDL text (an iterable of lines) for cell_methods attributes.
+    `file` is the file name reported in the records.
+    """
+    parse = parse or _default_parse()
+    lines = iter(lines)
+    for line in lines:
+        match = _cdl_attribute.match(line)
+        if match is None:
+            continue
+        variable = _cdl_unescape(match.group("variable"))
+        # A long or multi-line string value is written by ncdump as a
+        # comma-separated sequence of strings, over several lines, ending
+        # with ";".
+        rest = match.group("rest")
+        while not rest.rstrip().endswith(";"):
+            try:
+                rest += next(lines)
+            except StopIteration:
+                break
+        value = "".join(
+            _cdl_unescape(s) for s in _cdl_string.findall(rest)
+        )
+        yield Record(file, variable, parse(value))
+
+
+def scan_cdl_file(path, parse=None):
+    """Scan a CDL file for cell_methods attributes."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        yield from scan_cdl(f, file=path, parse=parse)
+
+
+# NetCDF classic format. See
+# https://docs.unidata.ucar.edu/netcdf-c/current/file_format_specifications.html
+
+NC_DIMENSION = 10
+NC_VARIABLE = 11
+NC_ATTRIBUTE = 12
+NC_CHAR = 2
+
+# Sizes of external types, by nc_type.
+_type_sizes = {
+    1: 1, 2: 1, 3: 2, 4: 4, 5: 4, 6: 8,  # classic
+    7: 1, 8: 2, 9: 4, 10: 8, 11: 8,  # CDF-5 only
+}
+
+
+def _padded(n):
+    return (n + 3) & ~3
+
+
+# Versions of the classic format: CDF-1, CDF-2 and CDF-5.
+_versions = (1, 2, 5)
+
+_int = struct.Struct(">I")
+_int64 = struct.Struct(">Q")
+
+
+class _HeaderReader:
+    """Reads the elements of a NetCDF classic header from a buffer."""
+
+    def __init__(self, buffer, version):
+        self.buffer = buffer
+        self.pos = 4
+        # Sizes of NON_NEG values (counts, lengths) and of `begin` offsets.
+        self.non_neg_struct = _int64 if version == 5 else _int
+        self.offset_struct = _int if version == 1 else _int64
+
+    def _read(self, struct_):
+        value, = struct_.unpack_from(self.buffer, self.pos)
+        self.pos += struct_.size
+        return value
+
+    def read_int(self):
+        return self._read(_int)
+
+    def read_non_neg(self):
+        return self._read(self.non_neg_struct)
+
+    def read_offset(self):
+        return self._read(self.offset_struct)
+
+    def read_bytes(self, n):
+        value = self.buffer[self.pos:self.pos + n]
+        self.pos += _padded(n)
+        return value
+
+    def read_name(self):
+        return self.read_bytes(self.read_non_neg()).decode(
+            "utf-8", errors="replace"
+        )
+
+    def read_list_header(self, tag):
+        """Read the tag and count of a list. Return the count."""
+        actual_tag = self.read_int()
+        count = self.read_non_neg()
+        if actual_tag not in (0, tag):
+            raise ValueError(
+                f"Malformed NetCDF header: expected tag {tag}, "
+                f"got {actual_tag} at byte {self.pos}"
+            )
+        return count
+
+    def read_attributes(self):
+        """
+        Read an attribute list. Yield (name, value) for character
+        attributes; skip the values of others.
+        """
+        for _ in range(self.read_list_header(NC_ATTRIBUTE)):
+            name = self.read_name()
+            nc_type = self.read_int()
+            n = self.read_non_neg()
+            if nc_type == NC_CHAR:
+                yield name, self.read_bytes(n)
+            else:
+                self.pos += _padded(n * _type_sizes[nc_type])
+
+
+def scan_netcdf3(path, parse=None):
+    """
+    Scan the header of a NetCDF classic format file for cell_methods
+    attributes.
+    """
+    parse = parse or _default_parse()
+    with open(path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        magic = buffer[:4]
+        if magic[:3] != b"CDF" or magic[3] not in _versions:
+            raise ValueError(f"{path} is not a NetCDF classic format file")
+        header = _HeaderReader(buffer, magic[3])
+        header.read_non_neg()  # numrecs
+        for _ in range(header.read_list_header(NC_DIMENSION)):
+            header.read_name()
+            header.read_non_neg()  # dim_length
+        for _ in header.read_attributes():  # global attributes
+            pass
+        for _ in range(header.read_list_header(NC_VARIABLE)):
+            variable = header.read_name()
+            for _ in range(header.read_non_neg()):
+                header.read_non_neg()  # dimid
+            for name, value in header.read_attributes():
+                if name == "cell_methods":
+                    value = value.rstrip(b"\0").decode(
+                        "utf-8", errors="replace"
+                    )
+                    yield Record(path, variable, parse(value))
+            header.read_int()  # nc_type
+            header.read_non_neg()  # vsize
+            header.read_offset()  # begin
+
+
+def scan_file(path, parse=None):
+    """
+    Scan a file, either NetCDF classic format or CDL, for cell_methods
+    attributes. The format is determined from the content of the file.
+    Files in other formats (e.g., NetCDF-4, or unsupported versions of the
+    classic format) raise ValueError.
+    """
+    with open(path, "rb") as f:
+        start = f.read(6)
+    if start[:3] == b"CDF":
+        # `scan_netcdf3` is a generator: check its version now.
+        if len(start) < 4 or start[3] not in _versions:
+            raise ValueError(
+                f"{path} is an unsupported NetCDF classic format version"
+            )
+        return scan_netcdf3(path, parse=parse)
+    if start.lstrip().startswith(b"netcdf"):
+        return scan_cdl_file(path, parse=parse)
+    raise ValueError(f"{path} is neither a NetCDF classic nor a CDL file")
+
+
+def scan(paths, parse=None, suffixes=(".nc", ".cdl")):
+    """
+    Scan files for cell_methods attributes. `paths` is an iterable of file
+    and directory paths. Directories are walked recursively for files with
+    the given suffixes. Files in unsupported formats and files that cannot
+    be read (e.g., dangling symbolic links) are skipped, as are the rest of
+    files with malformed or truncated headers.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, files in os.walk(path):
+                yield from scan(
+                    (
+                        os.path.join(directory, file)
+                        for file in sorted(files)
+                        if file.endswith(suffixes)
+                    ),
+                    parse=parse,
+                )
+            continue
+        try:
+            for record in scan_file(path, parse=parse):
+                yield record
+        except (ValueError, struct.error, KeyError, EOFError, OSError):
+            continue
@@ -0,0 +1,116 @@
+"""
+Parallel parsing of very large batches of cell_methods strings.
+
+The distinct strings in a batch are sharded into chunks and parsed by a
+`concurrent.futures` process pool. Each worker process constructs its own
+lexer and parser once, and returns results in the compact plain form of
+`representation.to_plain`, which is cheap to pickle, together with the
+time it spent parsing them, for `cf_cell_methods.instrumentation`.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from time import perf_counter
+from cf_cell_methods import instrumentation
+from cf_cell_methods.representation import to_plain, from_plain
+
+
+# The engine and parse function of this worker process, set up on its first
+# chunk. (ProcessPoolExecutor takes an initializer only from Python 3.7.)
+_worker = None
+
+
+def _worker_parse(engine):
+    global _worker
+    if _worker is None or _worker[0] != engine:
+        _worker = engine, _make_parse(engine)
+    return _worker[1]
+
+
+def _make_parse(engine):
+    if engine == "sly":
+        from cf_cell_methods.lexer import CfcmLexer
+        from cf_cell_methods.parser import CfcmParser
+        from cf_cell_methods.fast_parser import decode
+        lexer, parser = CfcmLexer(), CfcmParser()
+        return lambda string: parser.parse(lexer.tokenize(decode(string)))
+    from cf_cell_methods import engines
+    return engines[engine]
+
+
+def _parse_chunk(engine, chunk):
+    parse = _worker_parse(engine)
+    results = []
+    start = perf_counter()
+    for string in chunk:
+        try:
+            results.append(to_plain(parse(string)))
+        except Exception as e:
+            results.append(e)
+    return perf_counter() - start, results
+
+
+def parse_parallel(
+    strings, max_workers=None, chunksize=1000, engine="sly", errors="raise"
+):
+    """
+    Parse an iterable of cell_methods strings in parallel. Return a list of
+    results in input order, as `parse_many` does, including its treatment
+    of `errors`.
+
+    Distinct strings are parsed once, in chunks of `chunksize` strings, by a
+    pool of `max_workers` processes (default: the number of processors).
+    """
+    from cf_cell_methods import engines
+    if errors not in ("raise", "capture", "ignore"):
+        raise ValueError(f"Unknown errors mode '{errors}'")
+    if engine not in engines:
+        raise ValueError(f"Unknown parsing engine '{engine}'")
+
+    # Mutable bytes-like input is neither hashable nor, for memoryview,
+    # picklable.
+    keys = [
+        bytes(s) if isinstance(s, (bytearray, memoryview)) else s
+        for s in strings
+    ]
+    distinct = {}
+    for key in keys:
+        try:
+            distinct[key] = None
+        except TypeError:  # unhashable: fails below, as in `parse_many`
+            pass
+    distinct = list(distinct)
+    chunks = [
+        distinct[i:i + chunksize] for i in range(0, len(distinct), chunksize)
+    ]
+    plain = {}
+    elapsed = 0.0
+    with ProcessPoolExecutor(max_workers) as executor:
+        for chunk, (chunk_elapsed, results) in zip(
+            chunks, executor.map(partial(_parse_chunk, engine), chunks)
+        ):
+            plain.update(zip(chunk, results))
+            elapsed += chunk_elapsed
+    recorder = instrumentation.active
+    if recorder is not None:
+        # The workers' own recorders are not seen here: record what they
+        # parsed, as `parse` does.
+        parsed = [r for r in plain.values() if not isinstance(r, Exception)]
+        recorder.add(
+            {"strings": len(parsed), "invalid": parsed.count(None)},
+            {"parse": elapsed},
+        )
+
+    results = []
+    for key in keys:
+        try:
+            result = plain[key]
+        except TypeError as e:
+            result = e
+        if isinstance(result, Exception):
+            if errors == "raise":
+                raise result
+            result = result if errors == "capture" else None
+        else:
+            result = from_plain(result)
+        results.append(result)
+    return results
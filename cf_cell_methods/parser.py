@@ -1,9 +1,7 @@
-import re
 from sly import Parser
 from cf_cell_methods.lexer import CfcmLexer
-from cf_cell_methods.representation import (
-    CellMethods, CellMethod, Method, ExtraInfo, SxiInterval,
-)
+from cf_cell_methods.representation import CellMethods, CellMethod, Method
+from cf_cell_methods.extra_info import parse_extra_info
 
 
 class CfcmParser(Parser):
@@ -15,9 +13,12 @@ class CfcmParser(Parser):
 
     # Start symbol
 
+    # Append in place: building the result by concatenation would copy it
+    # on every reduction, which is quadratic in the number of cell methods.
     @_("cell_methods cell_method")
     def cell_methods(self, p):
-        return p.cell_methods + CellMethods([p.cell_method])
+        p.cell_methods.append(p.cell_method)
+        return p.cell_methods
 
     @_("cell_method")
     def cell_methods(self, p):
@@ -114,23 +115,11 @@ class CfcmParser(Parser):
     # This is our workaround for the fact that the cell_methods grammar is
     # not quite context-free due to the format for "extra information." We treat
     # extra information like a quoted string, but the "quotes" are matching
-    # parentheses. The string between the parentheses is then parsed separately.
+    # parentheses. The string between the parentheses is then parsed separately
+    # (see `cf_cell_methods.extra_info`).
     @_("EXTRA_INFO")
     def extra_info(self, p):
-        # TODO: It would be better to parse this little sub-language with a real
-        #   parser. regex FTW :-P
-        match = re.match(
-            r"(?P<interval>\s*interval:\s+(?P<value>\d+(\.\d+)?)\s+"
-            r"(?P<unit>\w+)(\s+comment: )?)?"
-            r"(?P<comment>.*)",
-            p.EXTRA_INFO
-        )
-        standardized = (
-            match.group('interval') and
-            SxiInterval(float(match.group('value')), match.group('unit'))
-        )
-        non_standardized = match.group('comment') or None
-        return ExtraInfo(standardized, non_standardized)
+        return parse_extra_info(p.EXTRA_INFO)
 
     # Helper symbols
 
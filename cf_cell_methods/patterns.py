@@ -0,0 +1,258 @@
+"""
+Compiled cell_methods patterns.
+
+A pattern is written as a cell_methods string (a template) in which any
+name or parameter may be replaced by a placeholder:
+
+- `*` matches any value.
+- `{var}` matches any value and binds it to the variable `var`. All
+  occurrences of a variable must match equal values.
+
+Extra information may be given as `(*)`, which matches any extra
+information, or none. Any other part of a template must match exactly;
+in particular an optional part (clause, parameters, extra information)
+that is absent from a template must be absent from what it matches.
+
+For example, the template
+
+    "models: percentile[{p}] over *"
+
+matches "models: percentile[5] over ensemble" and binds `p` to 5.0.
+
+A template is compiled once into a flat list of field tests, which is then
+applied directly to a parsed representation, or to a raw cell_methods
+string scanned by the fast parser (no representation objects are built).
+"""
+from functools import lru_cache
+from operator import attrgetter
+from cf_cell_methods import fast_parser
+from cf_cell_methods.extra_info import parse_extra_info
+
+
+# Kinds of field tests
+LITERAL = "literal"
+ANY = "any"
+VARIABLE = "variable"
+OPTIONAL = "optional"
+
+
+_placeholder = r"(?:\*|\{[a-zA-Z_][a-zA-Z0-9_]*\})"
+
+
+@lru_cache(maxsize=None)
+def _template_pattern():
+    return fast_parser.compile_cell_method_pattern(
+        name=rf"(?:{_placeholder}|{fast_parser.name_token})",
+        num=rf"(?:{_placeholder}|{fast_parser.num_token})",
+    )
+
+
+# Field names, accessors on representation objects, and positions in the
+# values of `fast_parser.values`.
+_fields = (
+    ("name", attrgetter("name")),
+    ("method", attrgetter("method.name")),
+    ("params", attrgetter("method.params")),
+    ("where", attrgetter("where")),
+    ("over", attrgetter("over")),
+    ("within", attrgetter("within")),
+    ("extra_info", attrgetter("extra_info")),
+)
+
+
+def _value_test(text, convert=str):
+    if text is None:
+        return LITERAL, None
+    if text == "*":
+        return ANY, None
+    if text.startswith("{"):
+        return VARIABLE, text[1:-1]
+    return LITERAL, convert(text)
+
+
+def _compile_cell_method(match):
+    """Compile a match of the template pattern to a tuple of field tests."""
+    name, method, params, where, over, within, extra_info = match.group(
+        *fast_parser.fields
+    )
+    if params is None:
+        params_test = (LITERAL, ())
+    else:
+        param_tests = tuple(
+            _value_test(param.strip(), float) for param in params.split(",")
+        )
+        if all(kind == LITERAL for kind, _ in param_tests):
+            params_test = (LITERAL, tuple(value for _, value in param_tests))
+        else:
+            params_test = ("params", param_tests)
+    if extra_info is None:
+        extra_info_test = (LITERAL, None)
+    elif extra_info.strip() == "*":
+        extra_info_test = (OPTIONAL, None)
+    else:
+        extra_info_test = (LITERAL, parse_extra_info(extra_info))
+    return (
+        _value_test(name),
+        _value_test(method),
+        params_test,
+        _value_test(where),
+        _value_test(over),
+        _value_test(within),
+        extra_info_test,
+    )
+
+
+def _test(kind, expected, value, bindings):
+    """Apply a single field test to a value. Update `bindings`."""
+    if kind == LITERAL:
+        if value is None or expected is None:
+            return value is expected
+        return value == expected
+    if kind == ANY:
+        return value is not None
+    if kind == VARIABLE:
+        if value is None:
+            return False
+        bound = bindings.setdefault(expected, value)
+        return bound is value or bound == value
+    if kind == OPTIONAL:
+        return True
+    # Parameters with placeholders: `expected` is a tuple of tests.
+    return len(value) == len(expected) and all(
+        _test(k, e, v, bindings) for (k, e), v in zip(expected, value)
+    )
+
+
+class Pattern:
+    """
+    A compiled cell_methods template. Create with `compile_pattern`.
+    """
+
+    def __init__(self, template):
+        matches = fast_parser.scan(template, _template_pattern())
+        if matches is None:
+            raise ValueError(f"Invalid cell_methods template: '{template}'")
+        self.template = template
+        self.cell_methods = tuple(_compile_cell_method(m) for m in matches)
+        # Flattened field tests, for objects and for scanned values.
+        self._object_tests = tuple(
+            (i, getter, kind, expected)
+            for i, cm in enumerate(self.cell_methods)
+            for (_, getter), (kind, expected) in zip(_fields, cm)
+            if kind != OPTIONAL
+        )
+        self._value_tests = tuple(
+            (i, j, kind, expected)
+            for i, cm in enumerate(self.cell_methods)
+            for j, (kind, expected) in enumerate(cm)
+            if kind != OPTIONAL
+        )
+
+    def __len__(self):
+        return len(self.cell_methods)
+
+    def __repr__(self):
+        return f"Pattern({self.template!r})"
+
+    def match(self, cell_methods):
+        """
+        Match a cell_methods string or parsed representation against this
+        pattern. Return a dict of variable bindings if it matches (empty if
+        the pattern has no variables), otherwise None.
+        """
+        cell_methods = fast_parser.decode_bytes_like(cell_methods)
+        if isinstance(cell_methods, str):
+            return self.match_values(scan_values(cell_methods))
+        if cell_methods is None or len(cell_methods) != len(self):
+            return None
+        bindings = {}
+        for i, getter, kind, expected in self._object_tests:
+            if not _test(kind, expected, getter(cell_methods[i]), bindings):
+                return None
+        return bindings
+
+    def match_values(self, values):
+        """
+        Match against a sequence of cell method field values, as returned
+        by `scan_values`.
+        """
+        if values is None or len(values) != len(self):
+            return None
+        bindings = {}
+        for i, j, kind, expected in self._value_tests:
+            if not _test(kind, expected, values[i][j], bindings):
+                return None
+        return bindings
+
+
+@lru_cache(maxsize=512)
+def compile_pattern(template):
+    """
+    Compile a cell_methods template to a `Pattern`. Like `re.compile`,
+    recently compiled patterns are cached.
+    """
+    return Pattern(template)
+
+
+def scan_values(string):
+    """
+    Scan a cell_methods string into a list of tuples of field values, one
+    per cell method (see `fast_parser.values`), or None if it is invalid.
+    """
+    matches = fast_parser.scan(string)
+    if matches is None:
+        # Malformed; let the full parser (and its error recovery) decide.
+        from cf_cell_methods import parse
+        cell_methods = parse(string)
+        return cell_methods and [
+            tuple(getter(cm) for _, getter in _fields)
+            for cm in cell_methods
+        ]
+    return [fast_parser.values(match) for match in matches]
+
+
+class PatternSet:
+    """
+    A collection of named patterns, against which an input is tested all
+    at once. The input is scanned only once, and only patterns with a
+    matching number of cell methods are tried.
+    """
+
+    def __init__(self, patterns=None):
+        self._by_length = {}
+        self.patterns = {}
+        for name, pattern in (patterns or {}).items():
+            self.add(name, pattern)
+
+    def add(self, name, pattern):
+        if isinstance(pattern, str):
+            pattern = compile_pattern(pattern)
+        self.patterns[name] = pattern
+        self._by_length.setdefault(len(pattern), {})[name] = pattern
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def match(self, cell_methods):
+        """
+        Return a dict mapping the name of each matching pattern to its
+        variable bindings.
+        """
+        cell_methods = fast_parser.decode_bytes_like(cell_methods)
+        if isinstance(cell_methods, str):
+            values = scan_values(cell_methods)
+            candidates = self._by_length.get(values and len(values), {})
+            match = Pattern.match_values
+            subject = values
+        else:
+            candidates = self._by_length.get(
+                cell_methods and len(cell_methods), {}
+            )
+            match = Pattern.match
+            subject = cell_methods
+        hits = {}
+        for name, pattern in candidates.items():
+            bindings = match(pattern, subject)
+            if bindings is not None:
+                hits[name] = bindings
+        return hits
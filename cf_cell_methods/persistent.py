@@ -0,0 +1,270 @@
+"""
+Persistent on-disk cache of parse results, shared across processes and runs.
+
+A `PersistentCache` stores parse results in an SQLite database file, in
+the compact plain form of `representation.to_plain`, serialized with
+`marshal`. Like a `ParseCache`, it is keyed on whitespace-normalized
+input, and calling it parses a string; a hit does not use the parser.
+
+The database is in WAL mode, so any number of processes can read it while
+one writes. New results are written in batches (of `batch_size`, and on
+`flush` or `close`), each in one transaction.
+
+The cache is tied to a version of the grammar: a hash of the source of the
+modules that determine parse results, and the version of Python (which
+determines the `marshal` format). When either changes, entries made with
+another version are discarded on opening.
+
+The cache is bounded by the size of its data (`max_bytes`). When a batch
+of writes makes it exceed that, the oldest entries are evicted (first in,
+first out: hits do not write to the database).
+
+Hits return new objects each time, as from `from_plain`. For faster hits
+of recurring strings, put a `ParseCache` in front of it:
+
+    cache = ParseCache(parse=PersistentCache(path))
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+import sqlite3
+import sys
+import threading
+from collections import namedtuple
+from cf_cell_methods import engines, instrumentation
+from cf_cell_methods.cache import normalize
+from cf_cell_methods.fast_parser import decode
+from cf_cell_methods.representation import to_plain, from_plain
+
+
+PersistentCacheStats = namedtuple(
+    "PersistentCacheStats", "hits misses entries bytes max_bytes"
+)
+
+# The modules whose source determines parse results.
+_grammar_modules = (
+    "cf_cell_methods.lexer",
+    "cf_cell_methods.parser",
+    "cf_cell_methods.fast_parser",
+    "cf_cell_methods.extra_info",
+    "cf_cell_methods.representation",
+)
+
+_grammar_version = None
+
+
+def grammar_version():
+    """
+    Return a hash of the source of the modules that determine parse
+    results (and of the version of SLY), and of the version of Python,
+    which determines the format of the stored results. The modules are not
+    imported.
+    """
+    global _grammar_version
+    if _grammar_version is None:
+        digest = hashlib.sha256()
+        digest.update("python {}.{}".format(*sys.version_info[:2]).encode())
+        for name in _grammar_modules + ("sly",):
+            spec = importlib.util.find_spec(name)
+            source = spec.loader.get_source(spec.name) or ""
+            digest.update(name.encode())
+            digest.update(source.encode())
+        _grammar_version = digest.hexdigest()
+    return _grammar_version
+
+
+class PersistentCache:
+    """
+    A persistent cache of parse results in an SQLite file. See module
+    docstring. Safe to use from several threads, and in forked processes.
+    """
+
+    def __init__(
+        self,
+        path,
+        max_bytes=64 * 2 ** 20,
+        engine="sly",
+        batch_size=256,
+        timeout=30.0,
+    ):
+        if engine not in engines:
+            raise ValueError(f"Unknown parsing engine '{engine}'")
+        # sqlite3 takes path-like objects only from Python 3.7.
+        self.path = os.fspath(path)
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._parse = engines[engine]
+        self._lock = threading.RLock()
+        self._pending = {}
+        self._hits = 0
+        self._misses = 0
+        self._connection = None
+        self._pid = None
+        self._connect()
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with _transaction(connection):
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS meta "
+                "(key TEXT PRIMARY KEY, value TEXT)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(string TEXT PRIMARY KEY, result BLOB)"
+            )
+            row = connection.execute(
+                "SELECT value FROM meta WHERE key = 'grammar'"
+            ).fetchone()
+            if row is None or row[0] != grammar_version():
+                connection.execute("DELETE FROM entries")
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('grammar', ?)",
+                    (grammar_version(),),
+                )
+        self._connection = connection
+        self._pid = os.getpid()
+
+    def _db(self):
+        """Return the connection, reconnecting in a forked process."""
+        if self._connection is None:
+            raise ValueError("Operation on closed PersistentCache")
+        if self._pid != os.getpid():
+            # The results pending in the parent are the parent's to write.
+            self._pending.clear()
+            self._connect()
+        return self._connection
+
+    def __call__(self, string):
+        key = normalize(decode(string))
+        with self._lock:
+            result = self._pending.get(key)
+            if result is None:
+                row = self._db().execute(
+                    "SELECT result FROM entries WHERE string = ?", (key,)
+                ).fetchone()
+                result = row and row[0]
+            if result is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        recorder = instrumentation.active
+        if recorder is not None:
+            recorder.add(
+                {"cache_misses" if result is None else "cache_hits": 1}
+            )
+        if result is not None:
+            return from_plain(marshal.loads(result))
+        if recorder is not None:
+            parsed = instrumentation.parse(self._parse, string)
+        else:
+            parsed = self._parse(string)
+        with self._lock:
+            self._pending[key] = marshal.dumps(to_plain(parsed))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+        return parsed
+
+    def flush(self):
+        """Write the pending results, and evict entries if necessary."""
+        with self._lock:
+            if not self._pending:
+                return
+            connection = self._db()
+            with _transaction(connection):
+                connection.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?)",
+                    self._pending.items(),
+                )
+                self._evict(connection)
+            self._pending.clear()
+
+    def _size(self, connection):
+        """Return the size of the data in the database, in bytes."""
+        (page_size,), = connection.execute("PRAGMA page_size")
+        (page_count,), = connection.execute("PRAGMA page_count")
+        (free,), = connection.execute("PRAGMA freelist_count")
+        return (page_count - free) * page_size
+
+    def _evict(self, connection):
+        # Freed pages are reused, so the file stops growing too.
+        while self._size(connection) > self.max_bytes:
+            (count,), = connection.execute("SELECT count(*) FROM entries")
+            if count == 0:
+                break
+            connection.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY rowid LIMIT ?)",
+                (max(1, count // 4),),
+            )
+
+    def __contains__(self, string):
+        key = normalize(decode(string))
+        with self._lock:
+            return key in self._pending or self._db().execute(
+                "SELECT 1 FROM entries WHERE string = ?", (key,)
+            ).fetchone() is not None
+
+    def __len__(self):
+        self.flush()
+        with self._lock:
+            (count,), = self._db().execute("SELECT count(*) FROM entries")
+            return count
+
+    def stats(self):
+        entries = len(self)
+        with self._lock:
+            return PersistentCacheStats(
+                self._hits,
+                self._misses,
+                entries,
+                self._size(self._db()),
+                self.max_bytes,
+            )
+
+    def clear(self):
+        """Discard all entries and reset the statistics."""
+        with self._lock:
+            self._pending.clear()
+            connection = self._db()
+            with _transaction(connection):
+                connection.execute("DELETE FROM entries")
+            self._hits = 0
+            self._misses = 0
+
+    def close(self):
+        """Write the pending results and close the database."""
+        with self._lock:
+            if self._connection is None:
+                return
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _transaction:
+    """An immediate (write-locking) transaction on a connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
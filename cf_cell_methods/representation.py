@@ -1,9 +1,16 @@
 import re
+from functools import lru_cache
+from operator import attrgetter, eq as _eq
+
+
+@lru_cache(maxsize=None)
+def _attr_names(attrs):
+    return re.split(r"\s*,\s*", attrs)
 
 
 def eq(a, b, attrs):
     """Compare two objects on named attributes"""
-    for attr in re.split(r"\s*,\s*", attrs):
+    for attr in _attr_names(attrs):
         left, right = (getattr(obj, attr) for obj in (a, b))
         if left != right:
             # print(f"eq False on attr '{attr}': {left!r} != {right!r}")
@@ -11,20 +18,37 @@ def eq(a, b, attrs):
     return True
 
 
+def _fields_eq(self, other):
+    """
+    `__eq__` of the representation classes: compare the values of the
+    fields of the class (`_fields`), all at once, as tuples. Objects
+    without these fields (e.g., None) are not equal.
+    """
+    if self is other:
+        return True
+    values = self._values
+    try:
+        theirs = values(other)
+    except AttributeError:
+        return NotImplemented
+    return values(self) == theirs
+
+
 def _match(obj, what):
     """
     Test (bool) whether an object matches on a subset of its attributes.
     Any attribute value itself having a "match" method is tested with that
-    method. This enables matching down a data structure hierarchy.
-    All other attribute values are tested with equality.
+    method, against a dict of its attributes. This enables matching down a
+    data structure hierarchy. All other attribute values are tested with
+    equality (see `cf_cell_methods.matching` for matchers that compare
+    equal to more than one value).
     """
-    return all(
-        getattr(obj, attr).match(**value)
-        if getattr(obj, attr) is not None
-           and hasattr(getattr(obj, attr), "match")
-        else getattr(obj, attr) == value
-        for attr, value in what.items()
-    )
+    for attr, value in what.items():
+        actual = getattr(obj, attr)
+        match = isinstance(value, dict) and getattr(actual, "match", None)
+        if not (match(**value) if match else actual == value):
+            return False
+    return True
 
 
 def strict_join(seq, sep=" "):
@@ -34,11 +58,48 @@ def strict_join(seq, sep=" "):
 
 
 class CellMethods(list):
+    """
+    A list of `CellMethod`s. Concatenation and slicing return `CellMethods`.
+    """
+
     def __str__(self):
-        return " ".join(str(x) for x in self)
+        return " ".join(map(str, self))
+
+    def __getitem__(self, index):
+        result = list.__getitem__(self, index)
+        return CellMethods(result) if isinstance(index, slice) else result
+
+    def __add__(self, other):
+        result = CellMethods(self)
+        result.extend(other)
+        return result
+
+    def __radd__(self, other):
+        result = CellMethods(other)
+        result.extend(self)
+        return result
+
+    def startswith(self, prefix):
+        """Test whether these begin with a sequence of cell methods."""
+        return len(prefix) <= len(self) and all(map(_eq, self, prefix))
+
+    def endswith(self, suffix):
+        """Test whether these end with a sequence of cell methods."""
+        return len(suffix) <= len(self) and all(
+            map(_eq, self[len(self) - len(suffix):], suffix)
+        )
 
-    def match(self,  *args):
-        return all(cm.match(arg) for cm, arg in zip(self, args))
+    def match(self, *specs, strict=False):
+        """
+        Test whether these match a sequence of match specifications (dicts
+        of keyword arguments to `CellMethod.match`), one per cell method.
+        Cell methods beyond the specifications are not matched, unless
+        `strict`, in which case there must be none.
+        See `cf_cell_methods.matching`, to compile specifications once.
+        """
+        from cf_cell_methods.matching import CellMethodsMatchSpec
+
+        return CellMethodsMatchSpec(specs, strict).match(self)
 
 
 class CellMethod:
@@ -56,12 +117,13 @@ class CellMethod:
         self.within = within
         self.extra_info = extra_info
 
+    _fields = ("name", "method", "where", "over", "within", "extra_info")
+    _values = staticmethod(attrgetter(*_fields))
+    __eq__ = _fields_eq
+
     def match(self,  **kwargs):
         return _match(self, kwargs)
 
-    def __eq__(*args):
-        return eq(*args, "name, method, where, over, within, extra_info")
-
     def __str__(self):
         return strict_join(
             (
@@ -75,24 +137,41 @@ class CellMethod:
 
 
 class ExtraInfo:
+    """
+    Extra method information. `standardized` is None, an `SxiInterval`, or
+    a tuple of several.
+    """
+
     def __init__(self, standardized, non_standardized):
         self.standardized = standardized
         self.non_standardized = non_standardized
 
+    @property
+    def intervals(self):
+        """The standardized intervals, as a list."""
+        standardized = self.standardized
+        if standardized is None:
+            return []
+        if isinstance(standardized, tuple):
+            return list(standardized)
+        return [standardized]
+
+    _fields = ("standardized", "non_standardized")
+    _values = staticmethod(attrgetter(*_fields))
+    __eq__ = _fields_eq
+
     def match(self,  **kwargs):
         return _match(self, kwargs)
 
-    def __eq__(*args):
-        return eq(*args, "standardized, non_standardized")
-
     def __str__(self):
-        if self.standardized is None and self.non_standardized is None:
+        standardized = " ".join(map(str, self.intervals))
+        if not standardized and self.non_standardized is None:
             # This actually should never occur
             return ""
         return (
             f"("
-            f"{self.standardized or ''}"
-            f"{' comment: ' if self.standardized and self.non_standardized else ''}"
+            f"{standardized}"
+            f"{' comment: ' if standardized and self.non_standardized else ''}"
             f"{self.non_standardized or ''}"
             f")"
         )
@@ -107,12 +186,13 @@ class SxiInterval(StandardizedExtraInfo):
         self.value = value
         self.unit = unit
 
+    _fields = ("value", "unit")
+    _values = staticmethod(attrgetter(*_fields))
+    __eq__ = _fields_eq
+
     def match(self,  **kwargs):
         return _match(self, kwargs)
 
-    def __eq__(*args):
-        return eq(*args, "value, unit")
-
     def __str__(self):
         return f"interval: {self.value} {self.unit}"
 
@@ -125,12 +205,13 @@ class Method:
     def signature(self):
         return self.name, len(self.params)
 
+    _fields = ("name", "params")
+    _values = staticmethod(attrgetter(*_fields))
+    __eq__ = _fields_eq
+
     def match(self,  **kwargs):
         return _match(self, kwargs)
 
-    def __eq__(*args):
-        return eq(*args, "name, params")
-
     def __str__(self):
         params = (
             f"[{','.join(str(p) for p in self.params)}]"
@@ -138,3 +219,60 @@ class Method:
             else ""
         )
         return f"{self.name}{params}"
+
+
+# Compact plain form of representations: nested tuples of str, float and None.
+# It is cheap to pickle and marshal, and so suits moving results between
+# processes and into storage.
+
+def _plain_standardized(standardized):
+    # An interval is a pair (value, unit); several, a tuple of pairs.
+    if isinstance(standardized, tuple):
+        return tuple(map(_plain_standardized, standardized))
+    return standardized and (standardized.value, standardized.unit)
+
+
+def _standardized(plain):
+    if plain and isinstance(plain[0], tuple):
+        return tuple(map(_standardized, plain))
+    return plain and SxiInterval(*plain)
+
+
+def to_plain(cell_methods):
+    """Convert a list of `CellMethod`s (or None) to compact plain form."""
+    if cell_methods is None:
+        return None
+    return tuple(
+        (
+            cm.name,
+            cm.method.name,
+            tuple(cm.method.params),
+            cm.where,
+            cm.over,
+            cm.within,
+            cm.extra_info and (
+                _plain_standardized(cm.extra_info.standardized),
+                cm.extra_info.non_standardized,
+            ),
+        )
+        for cm in cell_methods
+    )
+
+
+def from_plain(plain):
+    """Convert compact plain form back to `CellMethods` (or None)."""
+    if plain is None:
+        return None
+    return CellMethods(
+        CellMethod(
+            name,
+            Method(method, params),
+            where=where,
+            over=over,
+            within=within,
+            extra_info=extra_info and ExtraInfo(
+                _standardized(extra_info[0]), extra_info[1]
+            ),
+        )
+        for name, method, params, where, over, within, extra_info in plain
+    )
@@ -1,17 +1,38 @@
 """
 Semantic checks on cell methods.
 """
-from cf_cell_methods import parse
+from collections import namedtuple
+from functools import reduce
+from itertools import compress, repeat
+from operator import is_, not_, or_
+from time import perf_counter
+from cf_cell_methods import parse, instrumentation
+from cf_cell_methods.fast_parser import decode_bytes_like
+from cf_cell_methods.patterns import compile_pattern
 
 
 def parse_if_str(cell_methods):
+    cell_methods = decode_bytes_like(cell_methods)
     return parse(cell_methods) if isinstance(cell_methods, str) \
         else cell_methods
 
 
 def make_equality_comparator(comparison):
-    comparison = parse_if_str(comparison)
-    return lambda cell_methods: parse_if_str(cell_methods) == comparison
+    if not isinstance(comparison, str):
+        return lambda cell_methods: parse_if_str(cell_methods) == comparison
+
+    # A comparison string is compiled to a pattern (on first use, which
+    # keeps the import of this module cheap). The pattern matches parsed
+    # cell methods and raw strings without parsing them into objects.
+    def comparator(cell_methods):
+        if instrumentation.active is not None:
+            start = perf_counter()
+            result = compile_pattern(comparison).match(cell_methods)
+            instrumentation.record("semantics", perf_counter() - start)
+            return result is not None
+        return compile_pattern(comparison).match(cell_methods) is not None
+
+    return comparator
 
 
 # Hydrology cell method comparators
@@ -33,12 +54,14 @@ is_rp5_streamflow_climatology_ensemble_mean = make_equality_comparator(
 
 
 def is_rp5_streamflow_ensemble_percentile(p, cell_methods):
-    cell_methods = parse_if_str(cell_methods)
-    return (
-        len(cell_methods) == 4
-        and is_rp5_streamflow_climatology_single_model(cell_methods[0:3])
-        and cell_methods[4] == parse(f"models: percentile[{p}]")[0]
-    )
+    start = perf_counter() if instrumentation.active is not None else None
+    bindings = compile_pattern(
+        "time: mean within days time: max over days time: mean over days "
+        "models: percentile[{p}]"
+    ).match(cell_methods)
+    if start is not None:
+        instrumentation.record("semantics", perf_counter() - start)
+    return bindings is not None and bindings["p"] == p
 
 
 # These comparators may or may not be useful to us and/or may be better
@@ -133,3 +156,218 @@ def is_conventional(cell_methods):
         return False
 
     return True
+
+
+# Batch validation of many cell methods, stored in a `CellMethodsTable`.
+# The batch functions give the same results as the functions above, and
+# also the reason each failure fails (the first check it fails, in the
+# order the functions above check). The checks of single cell methods
+# are done in one pass over the columns of pool ids, giving a code per row;
+# entries are then decided from the union of the codes of their rows.
+
+Validation = namedtuple("Validation", "mask reasons")
+
+INVALID = "invalid cell_methods"
+UNCONVENTIONAL_METHOD = "unconventional method"
+UNEXTENDED_METHOD = "method neither conventional nor extended"
+NOT_TIME = "climatology over an axis other than time"
+NOT_CLIMATOLOGICAL = "not a climatological sequence of within/over clauses"
+OVER_WITHOUT_WHERE = "over clause without where clause"
+WITHIN_OUTSIDE_CLIMATOLOGY = "within clause outside a climatology"
+
+_climatological_sequences = (
+    (("years", None), (None, "years")),
+    (("days", None), (None, "days")),
+    (("days", None), (None, "days"), (None, "years")),
+)
+
+
+def _id(pool, value):
+    # Id of a value, or -1 (which matches nothing) if it is not in the pool.
+    id_ = pool.get(value)
+    return -1 if id_ is None else id_
+
+
+def _method_pairs(table, signatures):
+    """
+    Return the set of pairs of pool ids (method, params) of a table having
+    a method signature in `signatures`.
+    """
+    return {
+        (method_id, params_id)
+        for name, count in signatures
+        for method_id in (_id(table.pool, name),)
+        for params_id, params in enumerate(table.params_pool.values)
+        if params is not None and len(params) == count
+    }
+
+
+def _method_mask(table, signatures):
+    """
+    Return a bytearray mask of the rows of a table whose method signature
+    is in `signatures`.
+    """
+    pairs = _method_pairs(table, signatures)
+    return bytearray(
+        map(
+            pairs.__contains__,
+            zip(table.columns["method"], table.columns["params"]),
+        )
+    )
+
+
+def _conventional_mask(table):
+    return _method_mask(table, {(name, 0) for name in conventional_methods})
+
+
+def batch_is_conventional_1(table):
+    """`is_conventional_1` of each row (cell method) of a table."""
+    mask = _conventional_mask(table)
+    return Validation(
+        mask, [None if ok else UNCONVENTIONAL_METHOD for ok in mask]
+    )
+
+
+def batch_is_extended_1(table):
+    """`is_extended_1` of each row (cell method) of a table."""
+    mask = _method_mask(
+        table,
+        {(name, 0) for name in conventional_methods} | extended_methods,
+    )
+    return Validation(
+        mask, [None if ok else UNEXTENDED_METHOD for ok in mask]
+    )
+
+
+# Failures of single rows (cell methods), as bits of a row code.
+_UNCONVENTIONAL = 1
+_NOT_TIME = 2
+_OVER_WITHOUT_WHERE = 4
+_WITHIN = 8
+
+
+def _flags(values):
+    """
+    Return an int whose big-endian bytes are 1 where values are true, 0
+    elsewhere. Bitwise operations on such ints operate on all rows at once.
+    """
+    return int.from_bytes(bytes(map(bool, values)), "big")
+
+
+def _entry_codes(table):
+    """Return the code of each entry: the union of the codes of its rows."""
+    columns = table.columns
+    conventional = _method_pairs(
+        table, {(name, 0) for name in conventional_methods}
+    )
+    unconventional = _flags(
+        map(
+            not_,
+            map(
+                conventional.__contains__,
+                zip(columns["method"], columns["params"]),
+            ),
+        )
+    )
+    not_time = _flags(map(_id(table.pool, "time").__ne__, columns["name"]))
+    over_without_where = _flags(columns["over"]) & ~_flags(columns["where"])
+    within = _flags(columns["within"])
+    # Codes fit in a byte, so the shifts never carry between rows.
+    codes = (
+        unconventional * _UNCONVENTIONAL
+        | not_time * _NOT_TIME
+        | over_without_where * _OVER_WITHOUT_WHERE
+        | within * _WITHIN
+    ).to_bytes(table.nrows, "big")
+    offsets = table.offsets
+    # The codes of the rows of entries; few distinct ones in practice.
+    chunks = list(map(codes.__getitem__, map(slice, offsets, offsets[1:])))
+    unions = {chunk: reduce(or_, chunk, 0) for chunk in set(chunks)}
+    return list(map(unions.__getitem__, chunks))
+
+
+def _climatology_test(table):
+    """
+    Return a function testing whether an entry (of conventional time
+    methods) has a climatological sequence of within/over clauses.
+    """
+    pool = table.pool
+    offsets = table.offsets
+    withins = table.columns["within"]
+    overs = table.columns["over"]
+    sequences = {
+        tuple((_id(pool, w), _id(pool, o)) for w, o in sequence)
+        for sequence in _climatological_sequences
+    }
+    lengths = {len(sequence) for sequence in sequences}
+
+    def is_climatological(i):
+        start, stop = offsets[i], offsets[i + 1]
+        return stop - start in lengths and tuple(
+            zip(withins[start:stop], overs[start:stop])
+        ) in sequences
+
+    return is_climatological
+
+
+# Stands for a reason that depends on more than the code of an entry.
+_CHECK = object()
+
+
+def _validation(table, reason, check):
+    """
+    Validate each entry of a table. `reason(code)` gives the reason an
+    entry fails (None if it does not), given only its code, or `_CHECK` if
+    that depends on more; then `check(entry, code)` gives it.
+    """
+    reasons_by_code = [reason(code) for code in range(16)]
+    codes = _entry_codes(table)
+    reasons = list(map(reasons_by_code.__getitem__, codes))
+    for i in compress(range(len(reasons)), map(is_, reasons, repeat(_CHECK))):
+        reasons[i] = check(i, codes[i])
+    for i in compress(range(len(reasons)), map(not_, table.valid)):
+        reasons[i] = INVALID
+    return Validation(bytearray(map(is_, reasons, repeat(None))), reasons)
+
+
+def batch_is_conventional_climatology(table):
+    """`is_conventional_climatology` of each entry of a table."""
+    is_climatological = _climatology_test(table)
+
+    def reason(code):
+        if code & _UNCONVENTIONAL:
+            return UNCONVENTIONAL_METHOD
+        if code & _NOT_TIME:
+            return NOT_TIME
+        return _CHECK
+
+    def check(i, code):
+        return None if is_climatological(i) else NOT_CLIMATOLOGICAL
+
+    return _validation(table, reason, check)
+
+
+def batch_is_conventional(table):
+    """`is_conventional` of each entry of a table."""
+    is_climatological = _climatology_test(table)
+
+    def reason(code):
+        if code & _UNCONVENTIONAL:
+            return UNCONVENTIONAL_METHOD
+        if code & _NOT_TIME:
+            return non_climatological_reason(code)
+        return _CHECK
+
+    def non_climatological_reason(code):
+        if code & _OVER_WITHOUT_WHERE:
+            return OVER_WITHOUT_WHERE
+        if code & _WITHIN:
+            return WITHIN_OUTSIDE_CLIMATOLOGY
+        return None
+
+    def check(i, code):
+        if is_climatological(i):
+            return None
+        return non_climatological_reason(code)
+
+    return _validation(table, reason, check)
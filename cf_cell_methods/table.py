@@ -0,0 +1,257 @@
+"""
+Columnar storage of many parsed cell_methods.
+
+A `CellMethodsTable` holds a sequence of entries, each a parsed
+cell_methods (`CellMethods`) or None (invalid), as a struct of arrays
+rather than as representation objects. Each cell method is a row; the rows
+of entry `i` are `offsets[i]:offsets[i + 1]`.
+
+String fields (names, methods, clauses, interval units, comments) are
+stored as integer ids into a string pool shared by the whole table, in
+which id 0 stands for None. Method parameters (tuples of floats) are
+likewise interned, in a pool of their own. The columns of the interval
+hold the first interval of extra info; all the intervals of extra info
+that has several are interned (as tuples of (value, unit) pairs) in a
+third pool.
+
+Columns are `array.array`s of 64-bit ints ("q") or floats ("d"), which
+NumPy can wrap without copying, e.g.,
+`numpy.frombuffer(table.columns["method"], dtype=numpy.int64)`.
+
+Queries (`select`) use an index per column, built on first use, mapping
+each id to the array of rows in which it occurs. A query thus costs time
+proportional to the number of rows it selects rather than to the size of
+the table, and no representation objects are built.
+"""
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from cf_cell_methods.representation import (
+    CellMethods, CellMethod, ExtraInfo, SxiInterval, Method,
+)
+
+
+class Pool:
+    """Interns values (e.g., strings) as integer ids. Id 0 stands for None."""
+
+    def __init__(self):
+        self.values = [None]
+        self._ids = {None: 0}
+
+    def __len__(self):
+        return len(self.values)
+
+    def intern(self, value):
+        """Return the id of a value, adding it to the pool if necessary."""
+        try:
+            return self._ids[value]
+        except KeyError:
+            id_ = self._ids[value] = len(self.values)
+            self.values.append(value)
+            return id_
+
+    def get(self, value):
+        """Return the id of a value, or None if it is not in the pool."""
+        return self._ids.get(value)
+
+
+def _first_interval(cm):
+    intervals = cm.extra_info and cm.extra_info.intervals
+    return intervals[0] if intervals else None
+
+
+# String-valued columns, and how to get their values from a `CellMethod`.
+_string_columns = (
+    ("name", lambda cm: cm.name),
+    ("method", lambda cm: cm.method.name),
+    ("where", lambda cm: cm.where),
+    ("over", lambda cm: cm.over),
+    ("within", lambda cm: cm.within),
+    ("unit", lambda cm: _first_interval(cm) and _first_interval(cm).unit),
+    ("comment", lambda cm: cm.extra_info and cm.extra_info.non_standardized),
+)
+
+
+class CellMethodsTable:
+    """
+    A columnar container of parsed cell_methods. See module docstring.
+    """
+
+    def __init__(self, entries=()):
+        self.pool = Pool()
+        self.params_pool = Pool()
+        self.intervals_pool = Pool()
+        self.columns = {name: array("q") for name, _ in _string_columns}
+        # Rows: the id of the params, whether there is extra info (0 or 1),
+        # the value of the interval (NaN if none), and the id of the
+        # intervals if there are several (0 otherwise).
+        self.columns["params"] = array("q")
+        self.columns["extra_info"] = array("q")
+        self.columns["interval"] = array("d")
+        self.columns["intervals"] = array("q")
+        # Entries: the offsets of their rows, and whether they are valid.
+        self.offsets = array("q", [0])
+        self.valid = array("q")
+        # Column indexes (see `index`), invalidated by `append`.
+        self._indexes = {}
+        self.extend(entries)
+
+    @classmethod
+    def from_strings(cls, strings, engine="fast"):
+        """Parse cell_methods strings into a table."""
+        from cf_cell_methods import parse_many
+
+        return cls(parse_many(strings, engine=engine))
+
+    def __len__(self):
+        return len(self.valid)
+
+    @property
+    def nrows(self):
+        return len(self.columns["name"])
+
+    def append(self, cell_methods):
+        """Append an entry: a sequence of `CellMethod`s, or None."""
+        columns = self.columns
+        intern = self.pool.intern
+        self._indexes.clear()
+        for cm in cell_methods or ():
+            for name, getter in _string_columns:
+                columns[name].append(intern(getter(cm)))
+            extra_info = cm.extra_info
+            intervals = extra_info.intervals if extra_info else ()
+            columns["extra_info"].append(extra_info is not None)
+            columns["interval"].append(
+                intervals[0].value if intervals else float("nan")
+            )
+            columns["intervals"].append(
+                self.intervals_pool.intern(
+                    tuple((i.value, i.unit) for i in intervals)
+                )
+                if len(intervals) > 1 else 0
+            )
+            columns["params"].append(
+                self.params_pool.intern(tuple(cm.method.params))
+            )
+        self.offsets.append(self.nrows)
+        self.valid.append(cell_methods is not None)
+
+    def extend(self, entries):
+        for cell_methods in entries:
+            self.append(cell_methods)
+
+    def cell_method(self, row):
+        """Build the `CellMethod` of a row."""
+        strings = self.pool.values
+        name, method, where, over, within, unit, comment = (
+            strings[self.columns[column][row]]
+            for column, _ in _string_columns
+        )
+        params = self.params_pool.values[self.columns["params"][row]]
+        extra_info = None
+        if self.columns["extra_info"][row]:
+            intervals = self.columns["intervals"][row]
+            if intervals:
+                standardized = tuple(
+                    SxiInterval(value, unit_)
+                    for value, unit_ in self.intervals_pool.values[intervals]
+                )
+            else:
+                standardized = unit and SxiInterval(
+                    self.columns["interval"][row], unit
+                )
+            extra_info = ExtraInfo(standardized, comment)
+        return CellMethod(
+            name,
+            Method(method, params),
+            where=where,
+            over=over,
+            within=within,
+            extra_info=extra_info,
+        )
+
+    def __getitem__(self, index):
+        """Build the `CellMethods` (or None) of an entry."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CellMethodsTable index out of range")
+        if not self.valid[index]:
+            return None
+        return CellMethods(
+            self.cell_method(row)
+            for row in range(self.offsets[index], self.offsets[index + 1])
+        )
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_cell_methods(self):
+        """Return a list of the entries as representation objects."""
+        return list(self)
+
+    def row_entries(self):
+        """Return an array of the index of the entry of each row."""
+        result = array("q")
+        offsets = self.offsets
+        for i in range(len(self)):
+            result.extend([i] * (offsets[i + 1] - offsets[i]))
+        return result
+
+    def index(self, column):
+        """
+        Return the index of an id column: a dict mapping each id in it to
+        an array of the rows in which it occurs.
+        """
+        try:
+            return self._indexes[column]
+        except KeyError:
+            pass
+        index = {}
+        for row, id_ in enumerate(self.columns[column]):
+            rows = index.get(id_)
+            if rows is None:
+                rows = index[id_] = array("q")
+            rows.append(row)
+        self._indexes[column] = index
+        return index
+
+    def select(self, **criteria):
+        """
+        Return an array of the indices of the rows (cell methods) that
+        match all criteria, in order. Criteria are given by column name
+        (name, method, where, over, within, unit, comment), with a string
+        value or None (absent), and by `params`, a tuple of values, e.g.,
+
+            table.select(method="percentile", params=(5,))
+        """
+        tests = []
+        for column, value in criteria.items():
+            if column == "params":
+                id_ = self.params_pool.get(tuple(float(p) for p in value))
+            elif column in self.columns and column not in (
+                "extra_info", "interval", "intervals"
+            ):
+                id_ = self.pool.get(value)
+            else:
+                raise ValueError(f"Cannot select on column '{column}'")
+            rows = None if id_ is None else self.index(column).get(id_)
+            if rows is None:
+                return array("q")
+            tests.append((len(rows), rows, column, id_))
+        if not tests:
+            return array("q", range(self.nrows))
+        # Start from the most selective criterion, and test the others on
+        # the rows it selects.
+        tests.sort(key=lambda test: test[0])
+        (_, rows, _, _), *others = tests
+        for _, _, column, id_ in others:
+            values = self.columns[column]
+            selected = map(id_.__eq__, map(values.__getitem__, rows))
+            rows = array("q", compress(rows, selected))
+        return array("q", rows)
+
+    def entries(self, rows):
+        """Return the sorted indices of the entries containing rows."""
+        offsets = self.offsets
+        return sorted({bisect_right(offsets, row) - 1 for row in rows})
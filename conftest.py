@@ -0,0 +1,3 @@
+# Puts the root of the repository on sys.path (pytest does so for the
+# directory of a rootdir conftest.py), so that the tests can import the
+# `benchmarks` package however pytest is invoked.
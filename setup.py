@@ -7,7 +7,7 @@ setup(
     description="Automated processing of CF Conventions cell_methods metadata "
                 "content",
     keywords="climate meteorology cf conventions metadata",
-    packages=find_packages(),
+    packages=find_packages(exclude=("benchmarks", "benchmarks.*")),
     version=".".join(str(d) for d in __version__),
     url="http://www.pacificclimate.org/",
     author="Rod Glover",
@@ -0,0 +1,236 @@
+import asyncio
+import gc
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import pytest
+from cf_cell_methods import aio, parse, parse_many
+from cf_cell_methods.instrumentation import instrument
+from cf_cell_methods.aio import AsyncParser, aparse
+
+
+strings = [
+    "time: mean",
+    "time: mean within days time: mean over days",
+    "explode my head",
+    "time: percentile[5] (interval: 1 day comment: frogs)",
+    "area: mean where sea_ice over sea (interval: 2 km)",
+    "time: mean",
+    "lon: median (frogs)",
+    b"lat: max",
+] * 3
+
+
+def pending_tasks(loop):
+    all_tasks = getattr(asyncio, "all_tasks", None) or asyncio.Task.all_tasks
+    return [task for task in all_tasks(loop) if not task.done()]
+
+
+def run(coroutine):
+    """
+    Run a coroutine in a new event loop, and close it. No tasks may be left
+    pending.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        assert pending_tasks(loop) == []
+        loop.close()
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_aparse(engine):
+    async def main():
+        return await asyncio.gather(*(aparse(s, engine) for s in strings))
+
+    assert run(main()) == parse_many(strings)
+    # Each event loop has its own parser.
+    assert run(main()) == parse_many(strings)
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_aparse_instrumented(engine):
+    async def main():
+        return await asyncio.gather(*(aparse(s, engine) for s in strings))
+
+    with instrument() as recorder:
+        run(main())
+    # Each distinct string is parsed once.
+    assert recorder.counters["strings"] == 7
+    assert recorder.counters["invalid"] == 1
+    assert "parse" in recorder.timings
+
+
+def test_aparse_then_close_loop():
+    # The batching task has stopped by the time the result is returned: the
+    # loop can be closed right away, without warnings.
+    errors = []
+    loop = asyncio.new_event_loop()
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+    assert loop.run_until_complete(aparse("time: mean")) == parse("time: mean")
+    assert pending_tasks(loop) == []
+    loop.close()
+    del loop
+    gc.collect()
+    assert errors == []
+
+
+def test_aparse_does_not_keep_loops():
+    loops = []
+
+    async def main():
+        loops.append(weakref.ref(asyncio.get_event_loop()))
+        return await aparse("time: mean")
+
+    for _ in range(3):
+        assert run(main()) == parse("time: mean")
+    gc.collect()
+    assert [loop() for loop in loops] == [None] * 3
+
+
+def test_batches():
+    async def main():
+        async with AsyncParser(window=0.05) as parser:
+            results = await asyncio.gather(*map(parser.parse, strings))
+        return results, parser.stats()
+
+    results, stats = run(main())
+    assert results == parse_many(strings)
+    assert stats == (len(strings), len(strings) - 7, 1, 7)
+
+
+def test_max_batch():
+    async def main():
+        async with AsyncParser(window=10, max_batch=4) as parser:
+            await asyncio.gather(
+                *(parser.parse(f"time: mean{i}") for i in range(12))
+            )
+        return parser.stats()
+
+    # The window is not waited for when a batch is full.
+    assert run(asyncio.wait_for(main(), 5)).batches == 3
+
+
+def test_shared():
+    async def main():
+        async with AsyncParser() as parser:
+            results = await asyncio.gather(
+                *(parser.parse("time: mean") for _ in range(50))
+            )
+        return results, parser.stats()
+
+    results, stats = run(main())
+    assert results == [parse("time: mean")] * 50
+    assert results[0] is not results[1]
+    assert stats.parsed == 1
+    assert stats.shared == 49
+
+
+def test_errors():
+    async def main():
+        async with AsyncParser() as parser:
+            return await asyncio.gather(
+                parser.parse(123),
+                parser.parse("time: mean"),
+                return_exceptions=True,
+            )
+
+    error, result = run(main())
+    assert isinstance(error, TypeError)
+    assert result == parse("time: mean")
+
+
+def test_executor_shut_down():
+    executor = ThreadPoolExecutor(1)
+    executor.shutdown()
+
+    async def main():
+        parser = AsyncParser(executor=executor)
+        return await asyncio.wait_for(
+            asyncio.gather(
+                parser.parse("time: mean"),
+                parser.parse("time: max"),
+                return_exceptions=True,
+            ),
+            5,
+        )
+
+    errors = run(main())
+    assert all(isinstance(error, RuntimeError) for error in errors)
+
+
+def test_batching_task_failure():
+    async def main():
+        parser = AsyncParser()
+        parser.max_batch = None  # The batching task fails on it.
+        error, = await asyncio.wait_for(
+            asyncio.gather(parser.parse("time: mean"), return_exceptions=True),
+            5,
+        )
+        assert isinstance(error, TypeError)
+        # Later requests fail at once.
+        with pytest.raises(RuntimeError, match="failed"):
+            await parser.parse("time: max")
+        await parser.aclose()
+
+    run(main())
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        AsyncParser(engine="frogs")
+
+
+def test_backpressure(monkeypatch):
+    gate = threading.Event()
+    parse_batch = aio._parse_batch
+
+    def gated_parse_batch(engine, strings):
+        gate.wait(5)
+        return parse_batch(engine, strings)
+
+    monkeypatch.setattr(aio, "_parse_batch", gated_parse_batch)
+
+    async def main():
+        parser = AsyncParser(
+            window=0, max_batch=2, max_queued=3, max_batches=1
+        )
+        tasks = [
+            asyncio.ensure_future(parser.parse(f"time: mean{i}"))
+            for i in range(20)
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # One batch is being parsed, one is waiting to be dispatched, and
+        # the queue is full: the other requests wait for room.
+        assert parser._queue.qsize() == 3
+        assert parser.stats().parsed == 2
+        gate.set()
+        results = await asyncio.gather(*tasks)
+        await parser.aclose()
+        return results
+
+    results = run(main())
+    assert results == [parse(f"time: mean{i}") for i in range(20)]
+
+
+def test_cancelled_caller_does_not_cancel_others():
+    async def main():
+        async with AsyncParser(window=0.01) as parser:
+            first = asyncio.ensure_future(parser.parse("time: mean"))
+            second = asyncio.ensure_future(parser.parse("time: mean"))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second, first.cancelled()
+
+    assert run(main()) == (parse("time: mean"), True)
+
+
+def test_process_pool():
+    async def main():
+        with ProcessPoolExecutor(1) as executor:
+            async with AsyncParser(executor=executor) as parser:
+                return await asyncio.gather(*map(parser.parse, strings))
+
+    assert run(main()) == parse_many(strings)
@@ -0,0 +1,74 @@
+import pickle
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.binary import (
+    FORMAT_VERSION, encode, decode, encode_many, decode_many,
+)
+from cf_cell_methods.frozen import freeze
+from cf_cell_methods.representation import to_plain
+
+
+strings = [
+    "time: mean",
+    "time: mean within days time: mean over days",
+    "explode my head",
+    "time: percentile[5] (interval: 1 day comment: frogs)",
+    "time: percentile[5, 25.5, 95]",
+    "time: mean (interval: 1 day interval: 2 hour)",
+    "time: mean (interval: 1 day interval: 2 hour comment: frogs)",
+    "area: mean where sea_ice over sea (interval: 2 km)",
+    "lon: median (frogs)",
+    "lat: max (comment: façade ✓)",
+    "time: mean ()",
+]
+
+
+@pytest.mark.parametrize("string", strings)
+def test_round_trip(string):
+    result = parse(string)
+    decoded = decode(encode(result))
+    # Equality of plain forms is equality of representations.
+    assert to_plain(decoded) == to_plain(result)
+    assert to_plain(decode(encode(freeze(result)))) == to_plain(result)
+
+
+def test_round_trip_many():
+    results = [parse(s) for s in strings * 3] + [parse("time: mean")] * 2
+    decoded = decode_many(encode_many(results))
+    assert list(map(to_plain, decoded)) == list(map(to_plain, results))
+    assert decoded[-1] is not decoded[-2]
+    assert decoded[-1][0].method is not decoded[-2][0].method
+    assert decode_many(memoryview(encode_many(results))) == decoded
+    assert decode_many(encode_many([])) == []
+
+
+def test_many_strings():
+    # Varints of more than one byte.
+    results = [parse(f"time{i}: mean{i}") for i in range(300)]
+    assert decode_many(encode_many(results)) == results
+
+
+def test_compact():
+    results = [parse(s) for s in strings * 10]
+    encoded = encode_many(results)
+    assert len(encoded) < len(" ".join(strings * 10).encode("utf-8")) / 2
+    assert len(encoded) < len(pickle.dumps(results)) / 5
+    # Strings are stored once.
+    assert encoded.count(b"sea_ice") == 1
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    (
+        (b"", "Not an encoding"),
+        (b"PICKLE", "Not an encoding"),
+        (b"CFCM" + bytes([FORMAT_VERSION + 1]), "Unsupported"),
+        (encode(parse("time: mean"))[:-1], "Truncated"),
+        (encode(parse("time: percentile[5]"))[:12], "Truncated"),
+        (encode(parse("time: mean")) + b"\0", "Trailing"),
+        (encode_many([None, None]), "Expected 1"),
+    ),
+)
+def test_invalid(data, message):
+    with pytest.raises(ValueError, match=message):
+        decode(data)
@@ -0,0 +1,111 @@
+import pytest
+from cf_cell_methods import parse, parse_many
+from cf_cell_methods.cache import normalize, ParseCache, CacheStats
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    (
+        ("time: mean", "time:mean"),
+        ("time:mean", "time:mean"),
+        ("  time :  mean\t", "time:mean"),
+        ("time: mean within days", "time:mean within days"),
+        ("time: percentile[ 5 , 6 ]", "time:percentile[5,6]"),
+        ("time: mean (interval: 1 day)", "time:mean(interval: 1 day)"),
+        (
+            "time: mean  (interval:  1 day)  lon: max",
+            "time:mean(interval:  1 day)lon:max",
+        ),
+    ),
+)
+def test_normalize(data, expected):
+    assert normalize(data) == expected
+
+
+@pytest.mark.parametrize(
+    "data",
+    (
+        "time: mean",
+        "time: mean within days time: mean over days",
+        "time: percentile[5] (interval: 1 day comment: frogs)",
+        "time: mean (frogs) lon: median lat: standard_deviation",
+        "area: mean where sea_ice over sea",
+    ),
+)
+def test_normalize_preserves_parse(data):
+    assert parse(normalize(data)) == parse(data)
+
+
+def test_cache_hits_and_misses():
+    cache = ParseCache(maxsize=10)
+    cache("time: mean")
+    cache("time:mean")
+    cache("time: mean  ")
+    cache("time: max")
+    assert cache.stats() == CacheStats(hits=2, misses=2, maxsize=10, currsize=2)
+    assert "time :mean" in cache
+    assert "time: median" not in cache
+
+
+def test_cache_result():
+    cache = ParseCache()
+    for _ in range(2):
+        assert cache("time: mean within days time: mean over days") == parse(
+            "time: mean within days time: mean over days"
+        )
+    assert cache("explode my head") is None
+    assert cache("explode my head") is None
+
+
+def test_cache_bytes():
+    cache = ParseCache()
+    expected = parse("time: mean (interval: 1 day)")
+    assert cache(b"time: mean (interval: 1 day)") == expected
+    assert cache(bytearray(b"time:mean (interval: 1 day)")) == expected
+    assert cache(memoryview(b"time: mean  (interval: 1 day)")) == expected
+    assert cache("time: mean (interval: 1 day)") == expected
+    assert cache.stats() == CacheStats(
+        hits=3, misses=1, maxsize=1024, currsize=1
+    )
+    assert b"time :mean (interval: 1 day)" in cache
+    assert bytearray(b"time: max") not in cache
+
+
+def test_parse_many_bytes_with_cache():
+    strings = [b"time: mean", bytearray(b"time: mean"), "time:mean"]
+    results = parse_many(strings, cache=ParseCache())
+    assert results == [parse("time: mean")] * 3
+
+
+def test_cache_returns_unshared_objects():
+    cache = ParseCache()
+    first = cache("time: mean (interval: 1 day)")
+    second = cache("time: mean (interval: 1 day)")
+    assert first == second
+    assert first is not second
+    first[0].method.name = "max"
+    first[0].extra_info.standardized.unit = "year"
+    first.append(first[0])
+    assert cache("time: mean (interval: 1 day)") == parse(
+        "time: mean (interval: 1 day)"
+    )
+
+
+def test_cache_eviction():
+    cache = ParseCache(maxsize=2)
+    cache("time: mean")
+    cache("time: max")
+    cache("time: mean")  # Most recently used
+    cache("time: min")  # Evicts "time: max"
+    assert "time: mean" in cache
+    assert "time: max" not in cache
+    assert "time: min" in cache
+    assert len(cache) == 2
+
+
+def test_cache_clear():
+    cache = ParseCache()
+    cache("time: mean")
+    cache("time: mean")
+    cache.clear()
+    assert cache.stats() == CacheStats(hits=0, misses=0, maxsize=1024, currsize=0)
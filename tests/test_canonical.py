@@ -0,0 +1,107 @@
+import random
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.canonical import canonicalize, fingerprint
+from cf_cell_methods.representation import to_plain
+
+
+@pytest.mark.parametrize(
+    "strings",
+    (
+        ("time: mean", "time:mean", " time : mean\t", b"time: mean"),
+        (
+            "time: percentile[5]",
+            "time: percentile[5.0]",
+            "time:percentile[ 5 ]",
+        ),
+        (
+            "time: mean (interval: 1 day)",
+            "time: mean (interval:  1.0 day)",
+            "time: mean(interval: 1.00 day)",
+        ),
+        (
+            "time: mean within days time: max over days",
+            "time:mean within days time:max over days ",
+        ),
+        ("time: mean !", "time: mean"),  # lexical errors are skipped
+    ),
+)
+def test_same(strings):
+    assert len({canonicalize(s) for s in strings}) == 1
+    assert len({fingerprint(s) for s in strings}) == 1
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    (
+        ("time: mean", "time: max"),
+        ("time: mean", "time: mean ()"),
+        ("time: mean (x)", "time: mean ( x)"),  # comments are verbatim
+        ("time: percentile[5]", "time: percentile[5,5]"),
+        ("time: mean (interval: 1 day)", "time: mean (interval: 1 days)"),
+    ),
+)
+def test_different(a, b):
+    assert canonicalize(a) != canonicalize(b)
+    assert fingerprint(a) != fingerprint(b)
+
+
+@pytest.mark.parametrize("string", ("explode my head", "", "time: mean over"))
+def test_invalid(string):
+    assert canonicalize(string) is None
+    assert fingerprint(string) is None
+
+
+def test_fingerprint_is_stable():
+    # Fingerprints are stored; they must not change between versions.
+    assert fingerprint("time: mean") == -7459568913448667028
+    assert -2 ** 63 <= fingerprint("time: max") < 2 ** 63
+
+
+def random_spelling(rng):
+    """A random cell_methods string, spelled in one of several ways."""
+    def space():
+        return rng.choice(("", " ", "  ", "\t"))
+
+    def cell_method():
+        name = rng.choice(("time", "lat", "area"))
+        method = rng.choice(("mean", "max", "percentile"))
+        if method == "percentile":
+            params = rng.sample(("5", "5.0", "5.00", "95", "95.0"), 2)
+            method += f"[{space()}{params[0]},{space()}{params[1]}{space()}]"
+        clause = rng.choice(("", "where land", "over years", "within days"))
+        extra_info = rng.choice(
+            (
+                "",
+                "()",
+                "(frogs)",
+                "( frogs)",
+                f"(interval:{space()} {rng.choice(('1', '1.0'))} day)",
+                "(interval: 1 day comment: frogs)",
+                "(interval: 1 day interval: 2 hour)",
+            )
+        )
+        return (
+            f"{name}{space()}:{space()}{method} {clause}{space()}{extra_info}"
+        )
+
+    return " ".join(cell_method() for _ in range(rng.randint(1, 2)))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_agrees_with_parse(seed):
+    rng = random.Random(seed)
+    strings = [random_spelling(rng) for _ in range(300)]
+    strings += ["explode my head", "time: mean !", "time: mean over"]
+    parsed = [parse(s) for s in strings]
+    canonical = [canonicalize(s) for s in strings]
+    fingerprints = [fingerprint(s) for s in strings]
+    for p, c in zip(parsed, canonical):
+        assert c == (None if p is None else str(p))
+    # Equality of plain forms is equality of representations.
+    plain = [to_plain(p) for p in parsed]
+    for i in range(len(strings)):
+        for j in range(i):
+            assert (fingerprints[i] == fingerprints[j]) == (
+                plain[i] == plain[j]
+            )
@@ -0,0 +1,92 @@
+import random
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.classifier import Classifier
+from cf_cell_methods.patterns import PatternSet
+
+
+patterns = {
+    "streamflow_raw": "time: mean within days",
+    "streamflow_climatology": "time: mean within days time: mean over days",
+    "rp5_climatology": (
+        "time: mean within days time: max over days time: mean over days"
+    ),
+    "rp5_ensemble_percentile": (
+        "time: mean within days time: max over days time: mean over days "
+        "models: percentile[{p}]"
+    ),
+    "climatology": "time: * within {period} time: * over {period}",
+    "any_percentile": "{axis}: percentile[{p}]",
+    "any_single": "*: *",
+    "mean_with_info": "time: mean (*)",
+    "interval": "time: mean (interval: 1 day)",
+    "where": "area: mean where * over *",
+}
+
+inputs = (
+    "time: mean within days",
+    "time: mean within days time: mean over days",
+    "time: mean within days time: max over days time: mean over days",
+    "time: mean within days time: max over days time: mean over days "
+    "models: percentile[5]",
+    "time: max within years time: min over years",
+    "time: max within years time: min over days",
+    "lon: percentile[95]",
+    "lon: percentile[5, 95]",
+    "time: mean",
+    "time: mean (interval: 1 day)",
+    "time: mean (interval: 2 day)",
+    "area: mean where land over sea",
+    "area: mean where land",
+    "explode my head",
+)
+
+
+@pytest.mark.parametrize("string", inputs)
+def test_classify_agrees_with_pattern_set(string):
+    classifier = Classifier(patterns)
+    expected = PatternSet(patterns).match(string)
+    assert classifier.classify(string) == expected
+    assert classifier.classify(parse(string)) == expected
+    assert classifier.classify(string.encode()) == expected
+
+
+def test_classify():
+    classifier = Classifier(patterns)
+    assert len(classifier) == len(patterns)
+    assert classifier.classify("time: mean (interval: 1 day)") == {
+        "mean_with_info": {},
+        "interval": {},
+    }
+    assert classifier.classify("time: max within years time: min over years") \
+        == {"climatology": {"period": "years"}}
+    assert classifier.classify("lat: median lon: median") == {}
+
+
+def test_duplicate_name():
+    classifier = Classifier(patterns)
+    with pytest.raises(ValueError):
+        classifier.add("streamflow_raw", "time: max")
+
+
+def test_classify_random():
+    """Random patterns and inputs: the trie agrees with linear matching."""
+    rng = random.Random(42)
+    names = ("time", "lat", "lon", "*", "{a}")
+    methods = ("mean", "max", "percentile[5]", "percentile[{p}]", "*")
+    clauses = ("", " within days", " over years", " where land", " over *")
+
+    def random_string(placeholders):
+        return " ".join(
+            f"{rng.choice(names[:len(names) - 2 * (not placeholders)])}: "
+            f"{rng.choice(methods[:len(methods) - 2 * (not placeholders)])}"
+            f"{rng.choice(clauses[:len(clauses) - (not placeholders)])}"
+            for _ in range(rng.randint(1, 3))
+        )
+
+    registry = {i: random_string(True) for i in range(200)}
+    classifier = Classifier(registry)
+    linear = PatternSet(registry)
+    for _ in range(300):
+        string = random_string(False)
+        assert classifier.classify(string) == linear.match(string)
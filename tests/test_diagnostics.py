@@ -0,0 +1,149 @@
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.diagnostics import (
+    diagnose,
+    quiet_parse,
+    diagnose_many,
+    error_counts,
+    Diagnostic,
+    UNEXPECTED_CHARACTER,
+    UNEXPECTED_TOKEN,
+    UNEXPECTED_END,
+)
+
+
+@pytest.mark.parametrize(
+    "string, expected_result, expected_diagnostics",
+    (
+        ("time: mean", "time: mean", ()),
+        ("time: mean lat: max", "time: mean lat: max", ()),
+        (
+            "time: mean !",
+            "time: mean",
+            ((11, UNEXPECTED_CHARACTER, "!", ()),),
+        ),
+        (
+            "# time: mean",
+            "time: mean",
+            ((0, UNEXPECTED_CHARACTER, "#", ()),),
+        ),
+        (
+            "explode my head",
+            None,
+            ((8, UNEXPECTED_TOKEN, "my", ("COLON",)),),
+        ),
+        ("", None, ((0, UNEXPECTED_END, "", ("NAME",)),)),
+        (
+            "time: mean over",
+            None,
+            ((15, UNEXPECTED_END, "", ("NAME",)),),
+        ),
+        (
+            "time: mean lat:",
+            "time: mean",
+            ((15, UNEXPECTED_END, "", ("NAME",)),),
+        ),
+        (
+            "time: mean where land: max lat: max",
+            "land: max lat: max",
+            ((17, UNEXPECTED_TOKEN, "land", ("NAME",)),),
+        ),
+        (
+            "time: percentile[5 lat: max",
+            "lat: max",
+            ((19, UNEXPECTED_TOKEN, "lat", ("COMMA", "RBRACKET")),),
+        ),
+        (
+            "time: percentile[2.5, x] lat: max",
+            "lat: max",
+            ((22, UNEXPECTED_TOKEN, "x", ("NUM",)),),
+        ),
+        (
+            "time: mean (frogs) (toads) lat: max",
+            "lat: max",
+            ((19, UNEXPECTED_TOKEN, "(toads)", ("END", "NAME")),),
+        ),
+        (
+            "time: mean ! lat max area: sum % x: y",
+            "area: sum x: y",
+            (
+                (11, UNEXPECTED_CHARACTER, "!", ()),
+                (17, UNEXPECTED_TOKEN, "max", ("COLON",)),
+                (31, UNEXPECTED_CHARACTER, "%", ()),
+            ),
+        ),
+    ),
+)
+def test_diagnose(string, expected_result, expected_diagnostics):
+    result, diagnostics = diagnose(string)
+    if expected_result is None:
+        assert result is None
+    else:
+        assert result == parse(expected_result)
+    assert diagnostics == tuple(
+        Diagnostic(*diagnostic) for diagnostic in expected_diagnostics
+    )
+
+
+@pytest.mark.parametrize(
+    "string",
+    (
+        "time: mean",
+        "time: mean !",
+        "explode my head",
+        "time: mean where land: max lat: max",
+        "time: percentile[5 lat: max",
+    ),
+)
+def test_no_output(capsys, string):
+    diagnose(string)
+    assert capsys.readouterr() == ("", "")
+
+
+@pytest.mark.parametrize(
+    "string",
+    (
+        "time: mean within days time: max over days",
+        "time: mean (interval: 1 day comment: frogs) lat: max",
+        "time: mean ! area: sum",
+        "time:@mean",
+    ),
+)
+def test_agrees_with_parse(string):
+    # Without syntax errors, results are those of `parse`.
+    assert diagnose(string).result == parse(string)
+
+
+def test_bytes_like():
+    assert diagnose(b"time: mean !") == diagnose("time: mean !")
+
+
+def test_diagnose_many():
+    strings = ["time: mean", "time: mean !", "lat", "time: mean !", b"lat"]
+    diagnoses = diagnose_many(strings)
+    assert diagnoses == [diagnose(string) for string in strings]
+    assert diagnoses[1].result is not diagnoses[3].result
+    assert error_counts(diagnoses) == {
+        "strings": 4,
+        UNEXPECTED_CHARACTER: 2,
+        UNEXPECTED_END: 2,
+    }
+
+
+@pytest.mark.parametrize(
+    "string",
+    (
+        "time: mean",
+        "time: mean !",
+        "explode my head",
+        # SLY's error recovery gives results for some syntax errors.
+        "%time: mean where land),]time: mean",
+        "1 lon: percentile[5, 10] (interval: 1 day), (x) lat: max",
+    ),
+)
+def test_quiet_parse(capsys, string):
+    expected = parse(string)
+    capsys.readouterr()
+    result = quiet_parse(string)
+    assert capsys.readouterr() == ("", "")
+    assert str(result) == str(expected)
@@ -0,0 +1,96 @@
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.cache import copy_cell_methods
+from cf_cell_methods.extra_info import scan_extra_info, parse_extra_info
+from cf_cell_methods.frozen import freeze, thaw
+from cf_cell_methods.representation import (
+    ExtraInfo, SxiInterval, to_plain, from_plain,
+)
+from cf_cell_methods.table import CellMethodsTable
+
+
+@pytest.mark.parametrize(
+    "text, intervals, comment",
+    (
+        ("interval: 1 day", [(1, "day")], None),
+        ("  interval:  1.5 day", [(1.5, "day")], None),
+        ("frogs", [], "frogs"),
+        ("comment: frogs", [], "comment: frogs"),
+        ("interval: 1 day comment: frogs", [(1, "day")], "frogs"),
+        ("interval: 1 day frogs", [(1, "day")], " frogs"),
+        ("interval: x day", [], "interval: x day"),
+        (
+            "interval: 1 day interval: 0.5 degree",
+            [(1, "day"), (0.5, "degree")],
+            None,
+        ),
+        (
+            "interval: 1 day interval: 0.5 degree comment: frogs",
+            [(1, "day"), (0.5, "degree")],
+            "frogs",
+        ),
+        (
+            "interval: 1 day interval: x comment: frogs",
+            [(1, "day")],
+            " interval: x comment: frogs",
+        ),
+        (
+            "interval: 1 day comment: frogs\ntoads",
+            [(1, "day")],
+            "frogs\ntoads",
+        ),
+        ("", [], None),
+    ),
+)
+def test_scan_extra_info(text, intervals, comment):
+    assert scan_extra_info(text) == (
+        [SxiInterval(float(value), unit) for value, unit in intervals],
+        comment,
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    (
+        ("frogs", ExtraInfo(None, "frogs")),
+        ("interval: 1 day", ExtraInfo(SxiInterval(1.0, "day"), None)),
+        (
+            "interval: 1 day interval: 2 hour comment: frogs",
+            ExtraInfo(
+                (SxiInterval(1.0, "day"), SxiInterval(2.0, "hour")), "frogs"
+            ),
+        ),
+    ),
+)
+def test_parse_extra_info(text, expected):
+    result = parse_extra_info(text)
+    assert result == expected
+    assert result.intervals == expected.intervals
+
+
+def test_long_comment():
+    comment = "frogs and toads " * 1000
+    result = parse_extra_info(f"interval: 1 day comment: {comment}")
+    assert result.non_standardized == comment
+
+
+@pytest.mark.parametrize(
+    "string",
+    (
+        "time: mean (interval: 1 day interval: 2 hour)",
+        "time: mean (interval: 1 day interval: 2 hour comment: frogs) "
+        "lat: max (interval: 0.5 degree)",
+    ),
+)
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_several_intervals(string, engine):
+    cell_methods = parse(string, engine=engine)
+    assert len(cell_methods[0].extra_info.intervals) == 2
+    assert parse(str(cell_methods)) == cell_methods
+    assert copy_cell_methods(cell_methods) == cell_methods
+    assert thaw(freeze(cell_methods)) == cell_methods
+    assert str(freeze(cell_methods)) == str(cell_methods)
+    assert from_plain(to_plain(cell_methods)) == cell_methods
+    table = CellMethodsTable([cell_methods])
+    assert table[0] == cell_methods
+    assert list(table.select(unit="day")) == [0]
@@ -0,0 +1,122 @@
+"""
+Differential tests: the fast engine must produce output identical to the
+SLY engine.
+"""
+import pytest
+import test_cache
+import test_frozen
+import test_parser
+import test_semantics
+from cf_cell_methods import parse
+from cf_cell_methods.representation import CellMethods
+from cf_cell_methods.fast_parser import scan
+
+
+def parametrized_strings(*modules):
+    """All strings in the parametrizations of tests in the given modules."""
+    strings = set()
+    for module in modules:
+        for test in vars(module).values():
+            for mark in getattr(test, "pytestmark", ()):
+                if mark.name != "parametrize":
+                    continue
+                for values in mark.args[1]:
+                    if not isinstance(values, tuple):
+                        values = (values,)
+                    strings.update(v for v in values if isinstance(v, str))
+    return sorted(strings)
+
+
+corpus = parametrized_strings(
+    test_parser, test_semantics, test_cache, test_frozen
+)
+
+edge_cases = (
+    # Spacing and delimiting
+    "time:mean",
+    "time : mean\t lon :max",
+    "time: mean[5]within days",
+    "time: percentile[ 5 , 6.5 ]",
+    "time: mean(interval: 1 day)lon: max",
+    "time: meanwithin days",
+    "time: mean whereland",
+    "time: mean where_land",
+    "overtime: mean overall",
+    "time: mean where land over years (interval: 1 day) lon: max",
+    "time: mean (a (b)",
+    "time: mean ()",
+    "time: mean (interval: 1.5 hours)",
+    "time: mean (interval: 1 day foo)",
+    "time: max[1.] lon: mean",
+    "time: max[1.5.5]",
+    # Malformed
+    "",
+    "   ",
+    "time",
+    "time:",
+    "time: mean lon",
+    "time: mean over",
+    "time: mean over days where land",
+    "time: mean within days where land",
+    "time: mean (x) within days",
+    "time: mean lon: max : lat: min",
+    "time: mean ; lon: max",
+    "time: mean ) lon: max",
+    "time: mean (abc",
+    "time: mean\nlon: max",
+    "where: mean",
+    "time: within",
+    "time: mean[]",
+    "time: mean[5,]",
+    "time: mean[a]",
+    "a: b c: d: e f: g",
+)
+
+
+@pytest.mark.parametrize("string", corpus + list(edge_cases))
+def test_engines_agree(string):
+    expected = parse(string, engine="sly")
+    result = parse(string, engine="fast")
+    assert result == expected
+    if expected is not None:
+        assert isinstance(result, CellMethods)
+        assert str(result) == str(CellMethods(expected))
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+@pytest.mark.parametrize("convert", (bytes, bytearray, memoryview))
+@pytest.mark.parametrize(
+    "string",
+    corpus + list(edge_cases) + ["time: mean (comment: 5 °C)"],
+)
+def test_bytes_like(string, convert, engine):
+    data = convert(string.encode("utf-8"))
+    assert parse(data, engine=engine) == parse(string, engine="sly")
+
+
+def test_bytes_like_slice():
+    data = memoryview(b"tas:cell_methods = time: mean within days")[19:]
+    assert parse(data, engine="fast") == parse("time: mean within days")
+
+
+def test_corpus():
+    assert len(corpus) > 30
+
+
+@pytest.mark.parametrize(
+    "string, n",
+    (
+        ("time: mean", 1),
+        ("time: mean within days time: mean over days", 2),
+        ("time: mean lon", None),
+        ("time: mean ; lon: max", None),
+    ),
+)
+def test_scan(string, n):
+    matches = scan(string)
+    assert (matches and len(matches)) == n
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        parse("time: mean", engine="yacc")
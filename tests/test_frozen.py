@@ -0,0 +1,151 @@
+import pickle
+import pytest
+from cf_cell_methods import parse, representation
+from cf_cell_methods.cache import ParseCache
+from cf_cell_methods.frozen import (
+    freeze,
+    thaw,
+    parse as frozen_parse,
+    CellMethods,
+    CellMethod,
+    ExtraInfo,
+    SxiInterval,
+    Method,
+)
+
+
+strings = (
+    "time: mean",
+    "time: percentile[5]",
+    "time: mean where land over years",
+    "time: mean within days time: mean over days",
+    "time: mean (interval: 1 day)",
+    "time: mean (frogs)",
+    "time: percentile[5] (interval: 1 day comment: frogs)",
+    "time: mean lon: median lat: standard_deviation",
+)
+
+
+@pytest.mark.parametrize("string", strings)
+def test_round_trip(string):
+    frozen = frozen_parse(string)
+    assert isinstance(frozen, CellMethods)
+    assert str(frozen) == str(representation.CellMethods(parse(string)))
+    assert frozen_parse(str(frozen)) == frozen
+    assert thaw(frozen) == parse(string)
+    assert freeze(thaw(frozen)) == frozen
+
+
+@pytest.mark.parametrize("string", strings)
+def test_hashable(string):
+    a, b = frozen_parse(string), frozen_parse(string)
+    assert a is not b
+    assert hash(a) == hash(b)
+    assert {a: string}[b] == string
+    assert len({a, b}) == 1
+
+
+@pytest.mark.parametrize("string", strings)
+def test_pickle(string):
+    frozen = frozen_parse(string)
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+@pytest.mark.parametrize(
+    "a, b, equal",
+    (
+        (Method("mean", None), Method("mean", ()), True),
+        (Method("percentile", (5,)), Method("percentile", (5.0,)), True),
+        (Method("median", None), Method("mean", None), False),
+        (SxiInterval(1.0, "day"), SxiInterval(1.0, "day"), True),
+        (SxiInterval(1.0, "day"), SxiInterval(1.0, "year"), False),
+        (ExtraInfo(None, "foo"), ExtraInfo(None, "foo"), True),
+        (ExtraInfo(None, "foo"), ExtraInfo(None, "bar"), False),
+        (
+            CellMethod("time", Method("mean", None), where="land"),
+            CellMethod("time", Method("mean", None), where="land"),
+            True,
+        ),
+        (
+            CellMethod("time", Method("mean", None), where="land"),
+            CellMethod("time", Method("mean", None), over="land"),
+            False,
+        ),
+        (Method("value", None), SxiInterval("value", None), False),
+    ),
+)
+def test__eq__(a, b, equal):
+    assert (a == b) is equal
+    assert (a != b) is not equal
+
+
+def test_immutable():
+    cm = frozen_parse("time: mean (interval: 1 day)")
+    with pytest.raises(AttributeError):
+        cm[0].name = "lon"
+    with pytest.raises(AttributeError):
+        cm[0].method.params = (5,)
+    with pytest.raises(AttributeError):
+        cm[0].extra_info.standardized.unit = "year"
+    with pytest.raises(AttributeError):
+        del cm[0].where
+    with pytest.raises(TypeError):
+        cm[0] = cm[0]
+
+
+def test_no_instance_dict():
+    cm = frozen_parse("time: mean (interval: 1 day)")[0]
+    for obj in (cm, cm.method, cm.extra_info, cm.extra_info.standardized):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_within_exclusive():
+    with pytest.raises(ValueError):
+        CellMethod("time", Method("mean", None), where="foo", within="days")
+
+
+def test_cell_methods_slicing():
+    cms = frozen_parse("time: mean within days time: mean over days lon: max")
+    assert isinstance(cms[0:2], CellMethods)
+    assert cms[0:2] == frozen_parse(
+        "time: mean within days time: mean over days"
+    )
+    assert isinstance(cms[0:2] + cms[2:], CellMethods)
+    assert cms[0:2] + cms[2:] == cms
+
+
+def test_match():
+    cm = frozen_parse("time: percentile[5] within days")[0]
+    assert cm.match(method={"name": "percentile"}, within="days")
+    assert not cm.match(method={"params": (6,)})
+
+
+def test_frozen_cache_shares_results():
+    cache = ParseCache(parse=frozen_parse, copy=None)
+    assert cache("time: mean") is cache("time:mean")
+
+
+def test_cell_methods_str_cached():
+    cms = frozen_parse("time: mean within days time: max over days")
+    string = str(cms)
+    assert string == "time: mean within days time: max over days"
+    assert str(cms[0]) is str(cms[0])
+    assert str(cms) == string
+    assert not hasattr(cms, "__dict__")
+    assert pickle.loads(pickle.dumps(cms)) == cms
+    assert cms[0] == frozen_parse("time: mean within days")[0]
+
+
+def test_cell_methods_add():
+    cms = frozen_parse("time: mean lat: max")
+    for result in (cms + (cms[0],), (cms[0],) + cms, [cms[0]] + cms):
+        assert isinstance(result, type(cms))
+        assert len(result) == 3
+    assert ((cms[1],) + cms)[0] == cms[1]
+
+
+def test_cell_methods_startswith_endswith():
+    cms = frozen_parse("time: mean within days time: mean over days lon: max")
+    assert cms.startswith(cms[:2])
+    assert cms.endswith(cms[1:])
+    assert not cms.startswith(cms[1:])
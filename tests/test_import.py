@@ -0,0 +1,59 @@
+"""
+Guard the cost of importing the package: the SLY lexer and parser (whose
+construction dominates import time) must not be imported until first used.
+"""
+import subprocess
+import sys
+import pytest
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+
+
+@pytest.mark.parametrize(
+    "module",
+    (
+        "cf_cell_methods",
+        "cf_cell_methods.semantics",
+        "cf_cell_methods.representation",
+        "cf_cell_methods.frozen",
+    ),
+)
+def test_import_is_lazy(module):
+    loaded = run_python(
+        f"import sys, {module}; "
+        f"print(' '.join(sorted(sys.modules)))"
+    ).split()
+    for lazy in ("sly", "cf_cell_methods.lexer", "cf_cell_methods.parser"):
+        assert lazy not in loaded
+
+
+def test_sly_loaded_on_first_parse():
+    assert run_python(
+        "import sys, cf_cell_methods; "
+        "cf_cell_methods.parse('time: mean'); "
+        "print('sly' in sys.modules, type(cf_cell_methods.lexer).__name__)"
+    ).split() == ["True", "CfcmLexer"]
+
+
+def test_sly_loaded_on_attribute_access():
+    assert run_python(
+        "import sys, cf_cell_methods as cfcm; "
+        "print(type(cfcm.token_parser).__name__, 'sly' in sys.modules)"
+    ).split() == ["CfcmParser", "True"]
+
+
+
+def test_singletons_after_submodule_import():
+    assert run_python(
+        "import cf_cell_methods.lexer, cf_cell_methods.parser; "
+        "import cf_cell_methods as cfcm; "
+        "print(type(cfcm.lexer).__name__, type(cfcm.token_parser).__name__)"
+    ).split() == ["CfcmLexer", "CfcmParser"]
@@ -0,0 +1,86 @@
+import random
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.incremental import IncrementalParse
+
+
+@pytest.mark.parametrize(
+    "string, offset, deleted, inserted",
+    (
+        ("time: mean area: sum", 6, 4, "max"),
+        ("time: mean area: sum", 10, 0, " where land"),
+        ("time: mean area: sum", 10, 0, " over"),  # keyword without name
+        ("time: mean area: sum", 11, 0, "where land "),
+        ("time: mean area: sum", 0, 11, ""),
+        ("time: mean area: sum", 20, 0, " lat: max (interval: 1 day)"),
+        ("time: mean area: sum", 20, 0, " lat"),  # incomplete
+        ("time: mean area: sum", 4, 1, ""),  # joins tokens
+        ("time: mean area: sum", 12, 2, "!"),  # lexical error
+        ("time: mean (frogs) area: sum", 17, 1, ""),  # unclosed
+        ("time: mean (frogs area: sum", 17, 0, ")"),  # closed
+        ("time: mean lat", 14, 0, ": max"),  # invalid to valid
+        ("", 0, 0, "time: mean"),
+        ("time: mean", 0, 10, ""),
+        ("time: mean  ", 11, 1, ""),
+        ("time: percentile[5] area: sum", 17, 1, "95"),
+    ),
+)
+def test_edit(string, offset, deleted, inserted):
+    edited = IncrementalParse(string).edit(offset, deleted, inserted)
+    expected = string[:offset] + inserted + string[offset + deleted:]
+    assert edited.string == expected
+    assert edited.result == parse(expected)
+
+
+def test_reuse():
+    string = " ".join(f"time: mean (step {i})" for i in range(100))
+    state = IncrementalParse(string)
+    offset = string.index("step 50") + 5
+    edited = state.edit(offset, 2, "fifty")
+    assert edited.result[50].extra_info.non_standardized == "step fifty"
+    assert edited.result == parse(edited.string)
+    reused = [a is b for a, b in zip(state.result, edited.result)]
+    assert reused.count(False) <= 2
+    assert reused[:49] == [True] * 49
+    assert reused[51:] == [True] * 49
+
+
+@pytest.mark.parametrize("offset, deleted", ((-1, 0), (0, 11), (11, 0)))
+def test_edit_out_of_range(offset, deleted):
+    with pytest.raises(ValueError):
+        IncrementalParse("time: mean").edit(offset, deleted, "x")
+
+
+def test_bytes_like():
+    state = IncrementalParse(b"time: mean").edit(10, 0, b" area: sum")
+    assert state.result == parse("time: mean area: sum")
+
+
+def test_malformed_is_quiet(capsys):
+    state = IncrementalParse("time: mean area: sum").edit(4, 1, "")
+    assert state.result == parse("time mean area: sum")
+    capsys.readouterr()
+    state.edit(0, 0, "!").edit(0, 0, "lat: ")
+    assert capsys.readouterr() == ("", "")
+
+
+pieces = (
+    "time: mean", " lat: max", " where land", " over years", " within days",
+    " (interval: 1 day)", " (x)", "[5]", " ", "  ", "where", "over", "(",
+    ")", ":", "a", "1", "!", " lon: percentile[5, 10]",
+)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        state = IncrementalParse(
+            "".join(rng.choice(pieces) for _ in range(rng.randint(0, 8)))
+        )
+        for _ in range(5):
+            offset = rng.randint(0, len(state.string))
+            deleted = rng.randint(0, min(5, len(state.string) - offset))
+            inserted = rng.choice(pieces)[:rng.randint(0, 20)]
+            state = state.edit(offset, deleted, inserted)
+            assert state.result == parse(state.string)
@@ -0,0 +1,156 @@
+import threading
+import pytest
+from cf_cell_methods import parse, parse_many, instrumentation
+from cf_cell_methods.cache import ParseCache
+from cf_cell_methods.instrumentation import instrument
+from cf_cell_methods.parallel import parse_parallel
+from cf_cell_methods.persistent import PersistentCache
+from cf_cell_methods.semantics import (
+    is_streamflow_raw,
+    is_rp5_streamflow_ensemble_percentile,
+)
+
+
+def test_inactive_by_default():
+    assert instrumentation.active is None
+    parse("time: mean")
+    assert instrumentation.active is None
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_counters(engine):
+    with instrument() as recorder:
+        assert instrumentation.active is recorder
+        parse("time: mean (interval: 1 day) lon: max", engine=engine)
+        parse("time: mean within days", engine=engine)
+        parse("explode my head", engine=engine)
+    assert instrumentation.active is None
+    data = recorder.as_dict()
+    counters = data["counters"]
+    assert counters["strings"] == 3
+    assert counters["invalid"] == 1
+    assert counters["extra_info"] == 1
+    if engine == "sly":
+        # NAME COLON NAME EXTRA_INFO NAME COLON NAME;
+        # NAME COLON NAME WITHIN NAME; NAME NAME NAME
+        assert counters["tokens"] == 7 + 5 + 3
+        assert counters["reductions"] > 0
+    # The fast engine falls back to SLY for the invalid string.
+    assert counters["errors"] == 1
+    assert set(data["timings"]) == {"parse", "lex", "reduce", "extra_info"}
+    assert all(t >= 0 for t in data["timings"].values())
+
+
+batch = [
+    "time: mean (interval: 1 day) lon: max",
+    "time: mean within days",
+    "explode my head",
+    "time: mean within days",
+]
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_parse_many(engine):
+    with instrument() as recorder:
+        results = parse_many(batch, engine=engine)
+    assert results == [parse(s) for s in batch]
+    data = recorder.as_dict()
+    counters = data["counters"]
+    # Repeated strings are parsed once.
+    assert counters["strings"] == 3
+    assert counters["invalid"] == 1
+    assert counters["extra_info"] == 1
+    assert counters["errors"] == 1
+    if engine == "sly":
+        assert counters["tokens"] == 7 + 5 + 3
+    assert data["timings"]["parse"] >= 0
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_batch_entry_points(engine, tmp_path):
+    with instrument() as recorder:
+        parse_parallel(batch, max_workers=1, engine=engine)
+    # The worker processes report what they parsed.
+    assert recorder.counters["strings"] == 3
+    assert recorder.counters["invalid"] == 1
+    assert "parse" in recorder.timings
+
+    with PersistentCache(tmp_path / "cache.db", engine=engine) as cache:
+        with instrument() as recorder:
+            parse_many(batch, cache=cache)
+            cache(batch[0])
+    assert recorder.counters["strings"] == 3
+    assert recorder.counters["invalid"] == 1
+    assert recorder.counters["cache_misses"] == 3
+    assert recorder.counters["cache_hits"] == 1
+
+
+def test_results_unchanged():
+    strings = (
+        "time: mean within days time: max over days models: percentile[5]",
+        "area: mean where sea_ice over sea (interval: 1 day comment: x)",
+    )
+    expected = [parse(s) for s in strings]
+    with instrument():
+        assert [parse(s) for s in strings] == expected
+
+
+def test_reductions_per_string():
+    with instrument() as recorder:
+        parse("time: mean")
+    once = recorder.counters["reductions"]
+    with instrument() as recorder:
+        parse("time: mean")
+        parse("time: mean")
+    assert recorder.counters["reductions"] == 2 * once
+
+
+def test_cache_and_semantics():
+    cache = ParseCache(parse=parse)
+    with instrument() as recorder:
+        parse_many(["time: mean", "time: max", "time: mean"], cache=cache)
+        cache("time:mean")
+        is_streamflow_raw("time: mean within days")
+        is_rp5_streamflow_ensemble_percentile(5, "time: mean")
+    assert recorder.counters["cache_misses"] == 2
+    assert recorder.counters["cache_hits"] == 1
+    assert recorder.counters["semantics"] == 2
+
+
+def test_callback_and_nesting():
+    exported = []
+    with instrument(exported.append) as outer:
+        parse("time: mean")
+        with instrument(exported.append) as inner:
+            parse("time: mean")
+            parse("time: max")
+        assert instrumentation.active is outer
+        parse("time: mean")
+    assert [d["counters"]["strings"] for d in exported] == [2, 2]
+    assert inner.counters["strings"] == 2
+
+
+def test_enable_disable():
+    recorder = instrumentation.enable()
+    try:
+        parse("time: mean")
+    finally:
+        assert instrumentation.disable() is recorder
+    assert recorder.counters["strings"] == 1
+    recorder.reset()
+    assert recorder.as_dict() == {"counters": {}, "timings": {}}
+
+
+def test_threads():
+    def work():
+        for _ in range(100):
+            parse("time: mean (interval: 1 day)")
+
+    with instrument() as recorder:
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert recorder.counters["strings"] == 400
+    assert recorder.counters["extra_info"] == 400
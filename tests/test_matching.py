@@ -0,0 +1,148 @@
+import random
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.frozen import freeze
+from cf_cell_methods.matching import (
+    Matcher, AnyOf, Range, Regex, MatchSpec, compile_match,
+    compile_cell_methods_match,
+)
+from cf_cell_methods.representation import ExtraInfo, SxiInterval
+
+
+cm = parse(
+    "models: percentile[95] over ensemble "
+    "(interval: 1 day comment: frogs and toads)"
+)[0]
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    (
+        ({}, True),
+        ({"name": "models"}, True),
+        ({"name": "time"}, False),
+        ({"where": None}, True),
+        ({"over": None}, False),
+        ({"method": {"name": "percentile", "params": (95,)}}, True),
+        ({"method": {"params": (5,)}}, False),
+        ({"name": AnyOf("time", "models")}, True),
+        ({"name": AnyOf("time", "area")}, False),
+        ({"method": {"params": (Range(90, 100),)}}, True),
+        ({"method": {"params": (Range(high=90),)}}, False),
+        ({"method": {"params": (Range(90), Range(90))}}, False),
+        ({"extra_info": {"non_standardized": Regex("toad")}}, True),
+        ({"extra_info": {"non_standardized": Regex("^toad")}}, False),
+        ({"extra_info": {"standardized": {"unit": "day"}}}, True),
+        ({"extra_info": {"standardized": {"value": Range(2)}}}, False),
+        ({"extra_info": {"standardized": SxiInterval(1, "day")}}, True),
+        ({"over": AnyOf(None, "ensemble")}, True),
+        ({"where": AnyOf("sea", "land")}, False),
+        ({"extra_info": AnyOf(None)}, False),
+        ({"extra_info": None}, False),
+    ),
+)
+def test_match(spec, expected):
+    compiled = compile_match(**spec)
+    assert compiled.match(cm) is expected
+    assert compiled(freeze(cm)) is expected
+    # Matchers also work with the uncompiled `match`.
+    assert cm.match(**spec) is expected
+
+
+@pytest.mark.parametrize(
+    "spec",
+    (
+        {"extra_info": {"non_standardized": Regex("frogs")}},
+        {"extra_info": {"standardized": {"unit": "day"}}},
+    ),
+)
+def test_match_absent_compound(spec):
+    assert not compile_match(**spec).match(parse("time: mean")[0])
+    several = parse("time: mean (interval: 1 day interval: 2 hour)")[0]
+    assert not compile_match(
+        extra_info={"standardized": {"unit": "day"}}
+    ).match(several)
+
+
+@pytest.mark.parametrize(
+    "spec, message",
+    (
+        ({"nom": "time"}, "no field 'nom'"),
+        ({"method": {"nom": "mean"}}, "Method has no field 'nom'"),
+        ({"name": {"x": 1}}, "not compound"),
+    ),
+)
+def test_invalid_spec(spec, message):
+    with pytest.raises(ValueError, match=message):
+        compile_match(**spec)
+
+
+def test_matcher_is_abstract():
+    with pytest.raises(TypeError):
+        Matcher()
+
+    class Even(Matcher):
+        def test(self, value):
+            return value % 2 == 0
+
+    assert compile_match(method={"params": (Even(),)}).match(cm) is False
+
+
+def test_spec_for_other_class():
+    spec = MatchSpec({"standardized": {"unit": "day"}}, ExtraInfo)
+    assert spec.match(cm.extra_info)
+    with pytest.raises(ValueError):
+        MatchSpec({}, dict)
+
+
+cms = parse("time: mean within days time: max over days lat: mean")
+
+
+@pytest.mark.parametrize(
+    "specs, strict, expected",
+    (
+        ((), False, True),
+        ((), True, False),
+        (({"name": "time"},), False, True),
+        (({"name": "time"},), True, False),
+        (({"name": "time"}, {"method": {"name": "max"}}), False, True),
+        (({"name": "time"}, {"method": {"name": "mean"}}), False, False),
+        (({}, {}, {"name": "lat"}), True, True),
+        (({}, {}, {}, {}), False, False),
+    ),
+)
+def test_match_cell_methods(specs, strict, expected):
+    assert cms.match(*specs, strict=strict) is expected
+    assert freeze(cms).match(*specs, strict=strict) is expected
+    compiled = compile_cell_methods_match(*specs, strict=strict)
+    assert compiled.match(cms) is expected
+    assert compiled.match(None) is False
+
+
+def random_spec(rng):
+    spec = {}
+    if rng.random() < 0.5:
+        spec["name"] = rng.choice(("time", "lat", AnyOf("time", "area")))
+    if rng.random() < 0.5:
+        spec["method"] = {
+            "name": rng.choice(("mean", "percentile", Regex("^m"))),
+        }
+    if rng.random() < 0.3:
+        spec["method"] = {"params": rng.choice(((5.0,), (Range(1, 10),)))}
+    if rng.random() < 0.3:
+        spec["within"] = rng.choice((None, "days"))
+    return spec
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_agrees_with_match(seed):
+    rng = random.Random(seed)
+    cell_methods = parse(
+        "time: mean within days time: percentile[5] lat: max "
+        "area: mean over sea models: percentile[50]"
+    )
+    for _ in range(200):
+        spec = random_spec(rng)
+        compiled = compile_match(**spec)
+        for cm in cell_methods:
+            assert compiled.match(cm) is cm.match(**spec)
@@ -0,0 +1,198 @@
+import struct
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.netcdf import (
+    scan, scan_cdl, scan_file, scan_netcdf3, Record,
+)
+
+
+cdl = r'''netcdf tas_day {
+dimensions:
+	time = UNLIMITED ; // (365 currently)
+	lat = 2 ;
+variables:
+	double time(time) ;
+		time:units = "days since 1950-01-01" ;
+	float lat(lat) ;
+	float tas(time, lat) ;
+		tas:units = "K" ;
+		tas:cell_methods = "time: mean (interval: 1 day)" ;
+	float tasmax(time, lat) ;
+		tasmax:cell_methods = "time: maximum within days " ;
+	float pr(time, lat) ;
+		pr:cell_methods = "time: mean within days ",
+			"time: mean over days" ;
+	float bad(time, lat) ;
+		bad:cell_methods = "explode my head" ;
+	float q\:x(time, lat) ;
+		string q\:x:cell_methods = "area: mean where \"land\"" ;
+
+// global attributes:
+		:cell_methods = "time: point" ;
+		:title = "tas:cell_methods = \"not an attribute\"" ;
+}
+'''
+
+cdl_expected = [
+    ("tas", "time: mean (interval: 1 day)"),
+    ("tasmax", "time: maximum within days"),
+    ("pr", "time: mean within days time: mean over days"),
+    ("bad", "explode my head"),
+    ("q:x", 'area: mean where "land"'),
+]
+
+
+def records(expected, file):
+    return [Record(file, v, parse(cm)) for v, cm in expected]
+
+
+def test_scan_cdl():
+    result = list(scan_cdl(cdl.splitlines(keepends=True), file="x.cdl"))
+    assert result == records(cdl_expected, "x.cdl")
+
+
+def test_scan_cdl_is_lazy():
+    lines = iter(cdl.splitlines(keepends=True))
+    records = scan_cdl(lines)
+    assert next(records).variable == "tas"
+    assert next(lines).strip().startswith("float tasmax")
+
+
+# Writer for NetCDF classic headers. Values of the data section are not
+# written; a scanner must not need them.
+
+def pack_non_neg(n, version):
+    return struct.pack(">Q" if version == 5 else ">I", n)
+
+
+def pack_name(name, version):
+    data = name.encode()
+    return pack_non_neg(len(data), version) + data + b"\0" * (-len(data) % 4)
+
+
+def pack_attributes(attributes, version):
+    if not attributes:
+        return b"\0" * 4 + pack_non_neg(0, version)
+    result = struct.pack(">I", 12) + pack_non_neg(len(attributes), version)
+    for name, value in attributes:
+        result += pack_name(name, version)
+        if isinstance(value, str):
+            data = value.encode()
+            result += struct.pack(">I", 2) + pack_non_neg(len(data), version)
+        else:
+            data = struct.pack(f">{len(value)}d", *value)
+            result += struct.pack(">I", 6) + pack_non_neg(len(value), version)
+        result += data + b"\0" * (-len(data) % 4)
+    return result
+
+
+def netcdf3(variables, version=1, global_attributes=()):
+    """
+    Return the header of a NetCDF classic file with dimensions time, lat,
+    and the given variables, each a (name, attributes) pair.
+    """
+    result = b"CDF" + bytes([version]) + pack_non_neg(0, version)
+    dims = (("time", 0), ("lat", 2))
+    result += struct.pack(">I", 10) + pack_non_neg(len(dims), version)
+    for name, length in dims:
+        result += pack_name(name, version) + pack_non_neg(length, version)
+    result += pack_attributes(global_attributes, version)
+    result += struct.pack(">I", 11) + pack_non_neg(len(variables), version)
+    for name, attributes in variables:
+        result += pack_name(name, version)
+        result += pack_non_neg(2, version)
+        result += pack_non_neg(0, version) + pack_non_neg(1, version)
+        result += pack_attributes(attributes, version)
+        result += struct.pack(">I", 5) + pack_non_neg(8, version)
+        result += struct.pack(">I" if version == 1 else ">Q", 1024)
+    return result
+
+
+netcdf3_variables = [
+    ("time", [("units", "days since 1950-01-01")]),
+    (
+        "tas",
+        [
+            ("units", "K"),
+            ("valid_range", (200.0, 350.0)),
+            ("cell_methods", "time: mean (interval: 1 day)"),
+        ],
+    ),
+    ("tasmax", [("cell_methods", "time: maximum within days\0")]),
+    ("bad", [("cell_methods", "explode my head")]),
+]
+
+netcdf3_expected = [
+    ("tas", "time: mean (interval: 1 day)"),
+    ("tasmax", "time: maximum within days"),
+    ("bad", "explode my head"),
+]
+
+
+@pytest.mark.parametrize("version", (1, 2, 5))
+def test_scan_netcdf3(tmp_path, version):
+    path = tmp_path / "tas.nc"
+    path.write_bytes(
+        netcdf3(
+            netcdf3_variables,
+            version=version,
+            global_attributes=[("cell_methods", "time: point")],
+        )
+        # Data section
+        + b"\0" * 4096
+    )
+    expected = records(netcdf3_expected, path)
+    assert list(scan_netcdf3(path)) == expected
+    assert list(scan_file(path)) == expected
+
+
+def test_scan_netcdf3_no_variables(tmp_path):
+    path = tmp_path / "empty.nc"
+    path.write_bytes(netcdf3([]))
+    assert list(scan_netcdf3(path)) == []
+
+
+def test_scan(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "tas.nc").write_bytes(netcdf3(netcdf3_variables))
+    (tmp_path / "a" / "tas.cdl").write_text(cdl)
+    (tmp_path / "a" / "other.nc").write_bytes(b"\x89HDF\r\n\x1a\n")
+    (tmp_path / "a" / "notes.txt").write_text("tas:cell_methods = ...")
+    (tmp_path / "b.cdl").write_text(cdl)
+    result = list(scan([tmp_path / "b.cdl", str(tmp_path / "a")]))
+    assert result == (
+        records(cdl_expected, tmp_path / "b.cdl")
+        + records(cdl_expected, str(tmp_path / "a" / "tas.cdl"))
+        + records(netcdf3_expected, str(tmp_path / "a" / "tas.nc"))
+    )
+
+
+def test_scan_skips_bad_files(tmp_path):
+    # Files are scanned in sorted order: the bad ones come first.
+    (tmp_path / "a.nc").write_bytes(b"CDF\x03" + b"\0" * 32)
+    (tmp_path / "b.nc").write_bytes(b"CDF\x01\x00\x00")
+    (tmp_path / "c.nc").write_bytes(netcdf3(netcdf3_variables)[:40])
+    (tmp_path / "d.nc").write_bytes(netcdf3(netcdf3_variables))
+    assert list(scan([str(tmp_path)])) == records(
+        netcdf3_expected, str(tmp_path / "d.nc")
+    )
+
+
+def test_scan_skips_unreadable_files(tmp_path):
+    (tmp_path / "a.cdl").write_text(cdl)
+    (tmp_path / "b.nc").symlink_to(tmp_path / "missing.nc")
+    (tmp_path / "c.cdl").write_text(cdl)
+    assert list(scan([str(tmp_path)])) == (
+        records(cdl_expected, str(tmp_path / "a.cdl"))
+        + records(cdl_expected, str(tmp_path / "c.cdl"))
+    )
+
+
+def test_scan_file_unsupported(tmp_path):
+    path = tmp_path / "x.nc"
+    path.write_bytes(b"\x89HDF\r\n\x1a\n")
+    with pytest.raises(ValueError):
+        scan_file(path)
+    path.write_bytes(b"CDF\x03" + b"\0" * 32)
+    with pytest.raises(ValueError, match="unsupported"):
+        scan_file(path)
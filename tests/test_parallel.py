@@ -0,0 +1,58 @@
+import pytest
+from cf_cell_methods import parse, parse_many
+from cf_cell_methods.parallel import parse_parallel
+from cf_cell_methods.representation import to_plain, from_plain
+
+
+strings = [
+    "time: mean",
+    "time: mean within days time: mean over days",
+    "explode my head",
+    "time: percentile[5] (interval: 1 day comment: frogs)",
+    "area: mean where sea_ice over sea (interval: 2 km)",
+    "time: mean",
+    "lon: median (frogs)",
+] * 3
+
+
+@pytest.mark.parametrize("string", set(strings))
+def test_plain_round_trip(string):
+    assert from_plain(to_plain(parse(string))) == parse(string)
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+@pytest.mark.parametrize("chunksize", (1, 3, 1000))
+def test_parse_parallel(engine, chunksize):
+    results = parse_parallel(
+        strings, max_workers=2, chunksize=chunksize, engine=engine
+    )
+    assert results == parse_many(strings)
+    assert results[0] is not results[5]
+
+
+@pytest.mark.parametrize(
+    "errors, check",
+    (
+        ("capture", lambda r: isinstance(r, TypeError)),
+        ("ignore", lambda r: r is None),
+    ),
+)
+def test_parse_parallel_errors(errors, check):
+    results = parse_parallel(["time: mean", 42], max_workers=1, errors=errors)
+    assert results[0] == parse("time: mean")
+    assert check(results[1])
+
+
+def test_parse_parallel_errors_raise():
+    with pytest.raises(TypeError):
+        parse_parallel(["time: mean", 42], max_workers=1)
+
+
+def test_parse_parallel_unhashable():
+    items = ["time: mean", ["time: mean"], bytearray(b"lat: max"), 42]
+    results = parse_parallel(items, max_workers=1, errors="capture")
+    expected = parse_many(items, errors="capture")
+    assert results[0] == expected[0]
+    assert isinstance(results[1], TypeError)
+    assert results[2] == expected[2] == parse("lat: max")
+    assert isinstance(results[3], TypeError)
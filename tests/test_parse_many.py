@@ -0,0 +1,87 @@
+import pytest
+from cf_cell_methods import parse, parse_many
+from cf_cell_methods.cache import ParseCache
+
+
+strings = (
+    "time: mean",
+    "time: mean within days time: mean over days",
+    "time: mean",
+    "explode my head",
+    "time: percentile[5] (interval: 1 day comment: frogs)",
+    "time: mean within days time: mean over days",
+    "time: mean",
+)
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_parse_many(engine):
+    results = parse_many(strings, engine=engine)
+    assert results == [parse(s) for s in strings]
+
+
+def test_parse_many_iterable():
+    assert parse_many(iter(strings)) == [parse(s) for s in strings]
+    assert parse_many([]) == []
+
+
+def test_parse_many_deduplicates():
+    calls = []
+
+    def counting_parse(string):
+        calls.append(string)
+        return parse(string)
+
+    cache = ParseCache(parse=counting_parse)
+    parse_many(strings, cache=cache)
+    assert sorted(calls) == sorted(set(strings))
+
+
+def test_parse_many_bytes_like():
+    strings = [b"time: mean", bytearray(b"time: mean"), "time: mean"]
+    results = parse_many(strings + [memoryview(b"time: max")])
+    assert results[:3] == [parse("time: mean")] * 3
+    assert results[3] == parse("time: max")
+
+
+def test_parse_many_unshared():
+    results = parse_many(["time: mean", "time: mean"])
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+    assert results[0][0] is not results[1][0]
+
+
+def test_parse_many_prewarmed_cache():
+    cache = ParseCache()
+    cache("time: mean")
+    parse_many(["time:mean", "time: max", "time: max"], cache=cache)
+    hits, misses, _, currsize = cache.stats()
+    assert (hits, misses, currsize) == (1, 2, 2)
+
+
+@pytest.mark.parametrize(
+    "errors, check",
+    (
+        ("capture", lambda r: isinstance(r, TypeError)),
+        ("ignore", lambda r: r is None),
+    ),
+)
+def test_parse_many_errors(errors, check):
+    results = parse_many(["time: mean", None, ["x"], "time: max"], errors=errors)
+    assert results[0] == parse("time: mean")
+    assert check(results[1])
+    assert check(results[2])
+    assert results[3] == parse("time: max")
+
+
+def test_parse_many_errors_raise():
+    with pytest.raises(TypeError):
+        parse_many(["time: mean", None])
+
+
+@pytest.mark.parametrize(
+    "kwargs", ({"errors": "explode"}, {"engine": "yacc"})
+)
+def test_parse_many_bad_arguments(kwargs):
+    with pytest.raises(ValueError):
+        parse_many(strings, **kwargs)
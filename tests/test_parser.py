@@ -1,7 +1,7 @@
 import pytest
 from cf_cell_methods import parse
 from cf_cell_methods.representation import (
-    CellMethod, Method, ExtraInfo, SxiInterval,
+    CellMethods, CellMethod, Method, ExtraInfo, SxiInterval,
 )
 
 @pytest.mark.parametrize(
@@ -98,3 +98,11 @@ def test_syntax_error(data, expected):
     cell_methods = parse(data)
     print(cell_methods)
     assert cell_methods == expected
+
+
+@pytest.mark.parametrize("n", (1, 2, 50, 2000))
+def test_long_chain(n):
+    result = parse(" ".join(f"time: mean (step {i})" for i in range(n)))
+    assert isinstance(result, CellMethods)
+    assert len(result) == n
+    assert result[-1].extra_info.non_standardized == f"step {n - 1}"
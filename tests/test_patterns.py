@@ -0,0 +1,107 @@
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.frozen import parse as frozen_parse
+from cf_cell_methods.patterns import compile_pattern, PatternSet
+
+
+@pytest.mark.parametrize(
+    "template, string, expected",
+    (
+        # Exact
+        ("time: mean", "time: mean", {}),
+        ("time: mean", "time:mean", {}),
+        ("time: mean", "time: max", None),
+        ("time: mean", "time: mean within days", None),
+        ("time: mean", "time: mean (interval: 1 day)", None),
+        ("time: mean", "time: mean lon: mean", None),
+        ("time: mean", "explode my head", None),
+        ("time: mean (interval: 1 day)", "time: mean (interval: 1 day)", {}),
+        ("time: mean (interval: 1 day)", "time: mean (interval: 2 day)", None),
+        ("time: percentile[5]", "time: percentile[5.0]", {}),
+        ("time: percentile[5]", "time: percentile[5, 6]", None),
+        # Wildcards
+        ("*: mean", "lon: mean", {}),
+        ("time: *", "time: max", {}),
+        ("time: *", "time: percentile[5]", None),
+        ("time: *[*]", "time: percentile[5]", {}),
+        ("time: *[*]", "time: percentile[5, 6]", None),
+        ("time: mean within *", "time: mean within days", {}),
+        ("time: mean within *", "time: mean", None),
+        ("time: mean where * over *", "time: mean where land over sea", {}),
+        ("time: mean (*)", "time: mean", {}),
+        ("time: mean (*)", "time: mean (frogs)", {}),
+        # Variables
+        ("{axis}: mean", "lon: mean", {"axis": "lon"}),
+        ("time: percentile[{p}]", "time: percentile[5]", {"p": 5.0}),
+        (
+            "time: percentile[{p}, {q}] over {x}",
+            "time: percentile[5, 95] over years",
+            {"p": 5.0, "q": 95.0, "x": "years"},
+        ),
+        ("{a}: mean {a}: max", "lon: mean lon: max", {"a": "lon"}),
+        ("{a}: mean {a}: max", "lon: mean lat: max", None),
+        (
+            "time: mean within days time: max over days "
+            "time: mean over days models: percentile[{p}]",
+            "time: mean within days time: max over days "
+            "time: mean over days models: percentile[5]",
+            {"p": 5.0},
+        ),
+    ),
+)
+def test_pattern_match(template, string, expected):
+    pattern = compile_pattern(template)
+    assert pattern.match(string) == expected
+    assert pattern.match(parse(string)) == expected
+    assert pattern.match(frozen_parse(string)) == expected
+    assert pattern.match(string.encode()) == expected
+    assert pattern.match(bytearray(string.encode())) == expected
+
+
+@pytest.mark.parametrize(
+    "string",
+    (
+        "time: mean",
+        "time: mean within days time: mean over days",
+        "time: percentile[5] (interval: 1 day comment: frogs)",
+        "area: mean where sea_ice over sea",
+    ),
+)
+def test_pattern_exact_is_equality(string):
+    pattern = compile_pattern(string)
+    assert pattern.match(string) == {}
+    assert pattern.match(parse(string)) == {}
+
+
+@pytest.mark.parametrize(
+    "template", ("explode my head", "time: {p", "time: mean[*,]", "")
+)
+def test_invalid_template(template):
+    with pytest.raises(ValueError):
+        compile_pattern(template)
+
+
+def test_pattern_set():
+    patterns = PatternSet(
+        {
+            "mean": "time: mean",
+            "any": "*: *",
+            "percentile": "{axis}: percentile[{p}]",
+            "climatology": "time: mean within * time: mean over *",
+        }
+    )
+    assert len(patterns) == 4
+    assert patterns.match("time: mean") == {"mean": {}, "any": {}}
+    assert patterns.match(parse("lon: percentile[5]")) == {
+        "percentile": {"axis": "lon", "p": 5.0},
+    }
+    assert patterns.match("time: mean within days time: mean over days") == {
+        "climatology": {},
+    }
+    assert patterns.match("time: mean lon: mean lat: mean") == {}
+    assert patterns.match("explode my head") == {}
+    assert patterns.match(b"time: mean") == {"mean": {}, "any": {}}
+    assert patterns.match(memoryview(b"lon: percentile[5]")) == {
+        "percentile": {"axis": "lon", "p": 5.0},
+    }
+    assert patterns.match(b"x") == {}
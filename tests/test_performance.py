@@ -1,24 +1,120 @@
+import json
 import pytest
 from cf_cell_methods import parse
-import time
+from benchmarks import corpus, suite, timing
+from benchmarks.cli import main, run
+
+
+def test_corpus_is_deterministic():
+    assert corpus.generate(10, seed=3) == corpus.generate(10, seed=3)
+    assert corpus.generate(10, seed=3) != corpus.generate(10, seed=4)
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_corpus_is_valid(engine):
+    for name, strings in corpus.generate(5).items():
+        assert len(strings) == 5
+        for string in strings:
+            assert parse(string, engine=engine) is not None, string
+
+
+def test_corpus_features():
+    corpora = corpus.generate(20)
+    assert all(len(parse(s, engine="fast")) == 50 for s in corpora["many"])
+    assert all(len(s) > 1000 for s in corpora["comment"])
+    assert any("percentile[" in s for s in corpora["percentile"])
+
+
+def test_summarize():
+    summary = timing.summarize([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert summary["min"] == 1.0
+    assert summary["max"] == 5.0
+    assert summary["median"] == 3.0
+    assert summary["mean"] == 3.0
+    assert summary["iqr"] == 3.0
+
+
+def test_measure():
+    result = timing.measure(
+        lambda: sum(range(100)), ops=10, repeat=3, min_time=0.001
+    )
+    assert len(result["samples"]) == 3
+    assert result["loops"] >= 1
+    assert result["ops"] == 10
+    assert 0 < result["min"] <= result["median"] <= result["max"]
 
 
 @pytest.mark.parametrize(
-    "string, n",
+    "current, threshold, expected",
     (
-        ("time: mean", 10000),
-        (
-            "time: mean within days time:max over days "
-            "time: mean over days models: percentile[5]",
-            10000,
-        ),
-    )
+        (1.05, 0.1, []),
+        (1.2, 0.1, ["a"]),
+        (1.2, 0.25, []),
+        (0.5, 0.1, []),
+    ),
 )
-def test_parser_speed(string, n):
-    start_time = time.time()
-    for i in range(n):
-        parse(string)
-    elapsed_time = time.time() - start_time
-    print(
-        f"\nelapsed time: {elapsed_time}; time per parse: {elapsed_time / n}"
+def test_compare(current, threshold, expected):
+    baseline = {"a": {"median": 1.0}, "b": {"median": 1.0}}
+    results = {"a": {"median": current}, "c": {"median": 10.0}}
+    regressions = timing.compare(results, baseline, threshold)
+    assert [r.name for r in regressions] == expected
+
+
+def test_benchmarks():
+    corpora = corpus.generate(3)
+    benchmarks = suite.benchmarks(corpora)
+    names = [b.name for b in benchmarks]
+    assert len(set(names)) == len(names)
+    for stage in ("lex", "parse.sly", "parse.fast", "build", "str",
+                  "round_trip", "eq", "match"):
+        for name in corpora:
+            assert f"{stage}/{name}" in names
+    assert "semantics.is_conventional/long" in names
+    assert all(
+        b.name.startswith("parallel.")
+        for b in benchmarks if not b.default
     )
+    assert suite.select(benchmarks, ["parallel.fast"]) == [
+        b for b in benchmarks if b.name.startswith("parallel.fast")
+    ]
+    for benchmark in suite.select(benchmarks):
+        case = benchmark.setup()
+        assert callable(case.func) and case.ops > 0
+
+
+def test_benchmarks_are_lazy(monkeypatch):
+    def fail(*args):
+        raise AssertionError("benchmark data built before setup")
+
+    monkeypatch.setattr(suite, "_parse", fail)
+    monkeypatch.setattr(suite, "PersistentCache", fail)
+    benchmarks = suite.benchmarks(corpus.generate(3))
+    assert "scaling.parse.sly.3000/chain" in [b.name for b in benchmarks]
+
+
+def test_run():
+    benchmarks = suite.select(
+        suite.benchmarks(corpus.generate(3)), ["/short", "semantics."]
+    )
+    results = run(benchmarks, repeat=2, min_time=0.0001, warmup=0)
+    assert set(results) == {b.name for b in benchmarks}
+    assert all(r["median"] > 0 for r in results.values())
+
+
+def test_main(tmp_path, capsys):
+    args = ["-k", "parse.fast/short", "--size", "3", "--repeat", "2",
+            "--min-time", "0.0001"]
+    output = tmp_path / "results.json"
+    assert main(args + ["--json", str(output)]) == 0
+    data = json.loads(output.read_text())
+    assert list(data["results"]) == ["parse.fast/short"]
+    assert "python" in data["meta"]
+
+    # Make the baseline impossibly fast.
+    data["results"]["parse.fast/short"]["median"] = 1e-12
+    output.write_text(json.dumps(data))
+    assert main(args + ["--baseline", str(output)]) == 1
+    assert "REGRESSION parse.fast/short" in capsys.readouterr().err
+    assert main(
+        args + ["--baseline", str(output), "--threshold", "1e20"]
+    ) == 0
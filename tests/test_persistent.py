@@ -0,0 +1,180 @@
+import multiprocessing
+import sqlite3
+import subprocess
+import sys
+import threading
+from contextlib import closing
+from types import SimpleNamespace
+import pytest
+from cf_cell_methods import parse, parse_many, persistent
+from cf_cell_methods.cache import ParseCache
+from cf_cell_methods.persistent import PersistentCache
+
+
+strings = [
+    "time: mean",
+    "time:mean ",
+    "time: mean within days time: mean over days",
+    "explode my head",
+    "time: percentile[5] (interval: 1 day comment: frogs)",
+    "time: mean (interval: 1 day interval: 2 hour)",
+    "area: mean where sea_ice over sea (interval: 2 km)",
+    "lon: median (frogs)",
+    b"lat: max",
+]
+
+
+def no_parse(string):
+    raise AssertionError(f"parsed {string!r}")
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "parses.db")
+
+
+@pytest.mark.parametrize("engine", ("sly", "fast"))
+def test_round_trip(path, engine):
+    with PersistentCache(path, engine=engine) as cache:
+        assert [cache(s) for s in strings] == [parse(s) for s in strings]
+        # Before and after the pending results are written.
+        assert [cache(s) for s in strings] == [parse(s) for s in strings]
+        cache.flush()
+        assert [cache(s) for s in strings] == [parse(s) for s in strings]
+        assert cache(strings[0]) is not cache(strings[0])
+        # "time: mean" and "time:mean " share an entry.
+        assert cache.stats()[:3] == (21, 8, 8)
+
+
+def test_warm_run_does_not_parse(path):
+    with PersistentCache(path) as cache:
+        parse_many(strings, cache=cache)
+    with PersistentCache(path) as cache:
+        cache._parse = no_parse
+        assert parse_many(strings, cache=cache) == parse_many(strings)
+        assert " time : mean" in cache
+        assert "time: max" not in cache
+
+
+def test_behind_parse_cache(path):
+    with PersistentCache(path) as cache:
+        cache._parse = lambda string: parse(string, engine="fast")
+        front = ParseCache(parse=cache)
+        assert front("time: mean") == front("time: mean")
+        assert front("time: mean") == parse("time: mean")
+        assert cache.stats()[:2] == (0, 1)
+
+
+def test_grammar_change_invalidates(path, monkeypatch):
+    with PersistentCache(path) as cache:
+        parse_many(strings, cache=cache)
+    with PersistentCache(path) as cache:
+        assert len(cache) == 8
+    monkeypatch.setattr(persistent, "_grammar_version", "another grammar")
+    with PersistentCache(path) as cache:
+        assert len(cache) == 0
+
+
+def test_path_like(tmp_path):
+    with PersistentCache(tmp_path / "parses.db") as cache:
+        cache("time: mean")
+    assert (tmp_path / "parses.db").exists()
+
+
+def test_python_version_in_grammar_version(monkeypatch):
+    monkeypatch.setattr(persistent, "_grammar_version", None)
+    version = persistent.grammar_version()
+    monkeypatch.setattr(persistent, "_grammar_version", None)
+    monkeypatch.setattr(
+        persistent, "sys", SimpleNamespace(version_info=(3, 99, 0))
+    )
+    assert persistent.grammar_version() != version
+
+
+def test_eviction(path):
+    max_bytes = 64 * 1024
+    with PersistentCache(path, max_bytes=max_bytes, batch_size=100) as cache:
+        comment = "x" * 50
+        for i in range(5000):
+            cache(f"time: mean (interval: {i} day comment: {comment})")
+        stats = cache.stats()
+        assert stats.bytes <= max_bytes
+        assert 0 < stats.entries < 5000
+        # The oldest entries go first.
+        assert f"time: mean (interval: 4999 day comment: {comment})" in cache
+        assert f"time: mean (interval: 0 day comment: {comment})" not in cache
+
+
+def test_clear_and_close(path):
+    cache = PersistentCache(path)
+    cache("time: mean")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()[:2] == (0, 0)
+    cache.close()
+    cache.close()
+    with pytest.raises(ValueError):
+        cache("time: mean")
+
+
+def test_unknown_engine(path):
+    with pytest.raises(ValueError):
+        PersistentCache(path, engine="frogs")
+
+
+def test_threads(path):
+    with PersistentCache(path, batch_size=3) as cache:
+        results = {}
+
+        def work(i):
+            results[i] = [cache(s) for s in strings]
+
+        threads = [
+            threading.Thread(target=work, args=(i,)) for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert all(r == parse_many(strings) for r in results.values())
+
+
+def test_shared_between_processes(path):
+    # Another process fills the cache; this one reads it without parsing.
+    code = (
+        "import sys\n"
+        "from cf_cell_methods.persistent import PersistentCache\n"
+        "with PersistentCache(sys.argv[1]) as cache:\n"
+        f"    [cache(s) for s in {strings!r}]\n"
+    )
+    subprocess.run([sys.executable, "-c", code, path], check=True)
+    with PersistentCache(path) as cache:
+        cache._parse = no_parse
+        assert [cache(s) for s in strings] == [parse(s) for s in strings]
+
+
+def _child(cache, queue):
+    queue.put(cache("time: max"))
+    cache.close()
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs fork",
+)
+def test_fork(path):
+    # A forked process opens its own connection.
+    with PersistentCache(path) as cache:
+        cache("time: mean")
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        process = context.Process(target=_child, args=(cache, queue))
+        process.start()
+        assert queue.get(timeout=30) == parse("time: max")
+        process.join()
+        assert process.exitcode == 0
+        # The child wrote its result, but not those pending in the parent.
+        with closing(sqlite3.connect(path)) as db:
+            written = db.execute("SELECT string FROM entries").fetchall()
+        assert written == [("time:max",)]
+        assert "time: max" in cache
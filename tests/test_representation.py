@@ -126,6 +126,27 @@ def test_eq(a, b, attrs, expected):
 )
 def test__eq__(a, b, equal):
     assert (a == b) is equal
+    assert (a != b) is not equal
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    (
+        (ExtraInfo(None, "foo"), None),
+        (CellMethod("time", "mean"), None),
+        (SxiInterval(1, "day"), "interval: 1 day"),
+        (Method("mean", None), ("mean", ())),
+        (
+            CellMethod("time", "mean", extra_info=ExtraInfo(None, "foo")),
+            CellMethod("time", "mean"),
+        ),
+    ),
+)
+def test__eq__other(a, b):
+    # Objects of other kinds, including None, are not equal.
+    assert a != b
+    assert b != a
+    assert not (a == b)
 
 
 @pytest.mark.parametrize(
@@ -217,3 +238,37 @@ class Thang:
 )
 def test__match(obj, what, expected):
     assert _match(obj, what) is expected
+
+
+def test_cell_methods_concatenation_and_slicing():
+    a = CellMethods([CellMethod("time", Method("mean", None))])
+    b = CellMethods([CellMethod("lon", Method("max", None))])
+    for result in (a + b, a + list(b), list(a) + b, a[:] + b[0:1]):
+        assert isinstance(result, CellMethods)
+        assert str(result) == "time: mean lon: max"
+    assert len(a) == len(b) == 1
+    c = a + b
+    c += a
+    assert isinstance(c, CellMethods)
+    assert isinstance(c[1:], CellMethods)
+    assert str(c[::2]) == "time: mean time: mean"
+    assert isinstance(c[0], CellMethod)
+
+
+@pytest.mark.parametrize(
+    "string, affix, startswith, endswith",
+    (
+        ("time: mean lon: max", "time: mean", True, False),
+        ("time: mean lon: max", "lon: max", False, True),
+        ("time: mean lon: max", "time: mean lon: max", True, True),
+        ("time: mean", "time: mean lon: max", False, False),
+        ("time: mean time: mean", "time: mean", True, True),
+    ),
+)
+def test_cell_methods_startswith_endswith(string, affix, startswith, endswith):
+    from cf_cell_methods import parse
+
+    cms, affix = parse(string), parse(affix)
+    assert cms.startswith(affix) is startswith
+    assert cms.endswith(affix) is endswith
+    assert cms.startswith([]) and cms.endswith([])
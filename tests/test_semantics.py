@@ -1,5 +1,7 @@
+import random
 import pytest
 from cf_cell_methods import parse
+from cf_cell_methods.table import CellMethodsTable
 from cf_cell_methods.semantics import (
     is_streamflow_raw,
     is_streamflow_climatology,
@@ -7,6 +9,17 @@ from cf_cell_methods.semantics import (
     is_extended_1,
     is_conventional_climatology,
     is_conventional,
+    is_rp5_streamflow_ensemble_percentile,
+    batch_is_conventional_1,
+    batch_is_extended_1,
+    batch_is_conventional_climatology,
+    batch_is_conventional,
+    INVALID,
+    UNCONVENTIONAL_METHOD,
+    NOT_TIME,
+    NOT_CLIMATOLOGICAL,
+    OVER_WITHOUT_WHERE,
+    WITHIN_OUTSIDE_CLIMATOLOGY,
 )
 
 
@@ -22,6 +35,20 @@ def test_is_streamflow_raw(cell_method_str, expected):
     assert is_streamflow_raw(cell_method_str) is expected
 
 
+@pytest.mark.parametrize("convert", (bytes, bytearray, memoryview))
+@pytest.mark.parametrize(
+    "cell_method_str, expected",
+    (
+        ("time: mean within days", True),
+        ("time: mean within years", False),
+        ("x", False),
+    ),
+)
+def test_is_streamflow_raw_bytes_like(convert, cell_method_str, expected):
+    value = convert(cell_method_str.encode())
+    assert is_streamflow_raw(value) is expected
+
+
 @pytest.mark.parametrize(
     "cell_method_str, expected",
     (
@@ -98,3 +125,117 @@ def test_is_conventional_climatology(cell_method_str, expected):
 def test_is_conventional(cell_method_str, expected):
     cell_methods = parse(cell_method_str)
     assert is_conventional(cell_methods) is expected
+
+
+@pytest.mark.parametrize(
+    "p, cell_method_str, expected",
+    (
+        (
+            5,
+            "time: mean within days time: max over days time: mean over days "
+            "models: percentile[5]",
+            True,
+        ),
+        (
+            95,
+            "time: mean within days time: max over days time: mean over days "
+            "models: percentile[5]",
+            False,
+        ),
+        (
+            5,
+            "time: mean within days time: max over days time: mean over days",
+            False,
+        ),
+        (5, "models: percentile[5]", False),
+    ),
+)
+def test_is_rp5_streamflow_ensemble_percentile(p, cell_method_str, expected):
+    for cell_methods in (cell_method_str, parse(cell_method_str)):
+        assert (
+            is_rp5_streamflow_ensemble_percentile(p, cell_methods) is expected
+        )
+
+
+def random_cell_methods(rng):
+    """A random cell_methods string, likely to be climatological or not."""
+    names = ("time", "time", "time", "lat", "area")
+    methods = (
+        "mean", "median", "standard_deviation", "point", "percentile[5]",
+        "percentile[5,95]", "mean[3]", "unconventional",
+    )
+    clauses = (
+        "", "within days", "within years", "over days", "over years",
+        "over centuries", "where land", "where sea_ice over sea",
+    )
+    return " ".join(
+        f"{rng.choice(names)}: {rng.choice(methods)} {rng.choice(clauses)}"
+        for _ in range(rng.randint(1, 3))
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batch_validation_agrees(seed):
+    rng = random.Random(seed)
+    strings = [random_cell_methods(rng) for _ in range(500)]
+    strings += [
+        "time: mean within years time: median over years",
+        "time: mean within days time: median over days time: "
+        "standard_deviation over years",
+        "explode my head",
+    ]
+    table = CellMethodsTable.from_strings(strings)
+    parsed = [parse(s) for s in strings]
+    valid = [cms for cms in parsed if cms is not None]
+    cell_methods = [cm for cms in valid for cm in cms]
+
+    for batch, scalar, subjects in (
+        (batch_is_conventional_1, is_conventional_1, cell_methods),
+        (batch_is_extended_1, is_extended_1, cell_methods),
+        (
+            batch_is_conventional_climatology,
+            is_conventional_climatology,
+            parsed,
+        ),
+        (batch_is_conventional, is_conventional, parsed),
+    ):
+        mask, reasons = batch(table)
+        assert len(mask) == len(reasons) == len(subjects)
+        for ok, reason, subject in zip(mask, reasons, subjects):
+            if subject is None:
+                assert (ok, reason) == (0, INVALID)
+                continue
+            assert bool(ok) is scalar(subject)
+            assert (reason is None) is bool(ok)
+    # Both outcomes occur.
+    assert 0 < sum(batch_is_conventional(table).mask) < len(strings)
+    assert 0 < sum(batch_is_conventional_climatology(table).mask)
+
+
+@pytest.mark.parametrize(
+    "cell_method_str, reason",
+    (
+        ("time: mean within days time: median over days", None),
+        ("time: mean within days time: frog over days", UNCONVENTIONAL_METHOD),
+        ("time: mean within days lat: median over days", NOT_TIME),
+        ("time: mean within days time: median over years", NOT_CLIMATOLOGICAL),
+    ),
+)
+def test_batch_climatology_reasons(cell_method_str, reason):
+    table = CellMethodsTable.from_strings([cell_method_str])
+    assert batch_is_conventional_climatology(table).reasons == [reason]
+
+
+@pytest.mark.parametrize(
+    "cell_method_str, reason",
+    (
+        ("time: mean within days time: median over days", None),
+        ("area: mean where sea_ice over sea", None),
+        ("time: percentile[5]", UNCONVENTIONAL_METHOD),
+        ("area: mean over sea", OVER_WITHOUT_WHERE),
+        ("area: mean within years", WITHIN_OUTSIDE_CLIMATOLOGY),
+    ),
+)
+def test_batch_conventional_reasons(cell_method_str, reason):
+    table = CellMethodsTable.from_strings([cell_method_str])
+    assert batch_is_conventional(table).reasons == [reason]
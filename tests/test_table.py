@@ -0,0 +1,95 @@
+import pytest
+from cf_cell_methods import parse
+from cf_cell_methods.table import CellMethodsTable, Pool
+
+
+strings = (
+    "time: mean",
+    "time: mean within days time: max over days time: mean over days "
+    "models: percentile[5]",
+    "area: mean where sea_ice over sea (interval: 1 day comment: frogs)",
+    "explode my head",
+    "time: percentile[5,95] (interval: 1.5 hours)",
+    "lat: percentile[5] (comment only)",
+    "lon: max ()",
+    "models: percentile[95]",
+)
+
+
+def test_string_pool():
+    pool = Pool()
+    assert pool.intern(None) == 0
+    assert pool.intern("time") == pool.intern("time") == 1
+    assert pool.intern("mean") == 2
+    assert pool.get("time") == 1
+    assert pool.get("lon") is None
+    assert pool.values == [None, "time", "mean"]
+
+
+def test_round_trip():
+    table = CellMethodsTable.from_strings(strings)
+    expected = [parse(s) for s in strings]
+    assert len(table) == len(strings)
+    assert table.nrows == sum(len(e) for e in expected if e)
+    assert table.to_cell_methods() == expected
+    assert table[-1] == expected[-1]
+    assert table[3] is None
+    assert [str(e) for e in table if e] == [str(e) for e in expected if e]
+    with pytest.raises(IndexError):
+        table[len(strings)]
+
+
+def test_from_representations():
+    table = CellMethodsTable(parse(s) for s in strings)
+    assert table.to_cell_methods() == [parse(s) for s in strings]
+    table.append(parse("time: sum"))
+    assert table[len(strings)] == parse("time: sum")
+
+
+def test_interned():
+    table = CellMethodsTable.from_strings(strings)
+    assert len(table.pool) == len(set(table.pool.values))
+    assert table.pool.get("time") == table.columns["name"][0]
+
+
+@pytest.mark.parametrize(
+    "criteria, expected",
+    (
+        ({"method": "percentile", "params": (5,)}, [1, 5]),
+        ({"method": "percentile"}, [1, 4, 5, 7]),
+        ({"name": "time", "over": "days"}, [1]),
+        ({"name": "time", "over": None, "within": None}, [0, 4]),
+        ({"unit": "hours"}, [4]),
+        ({"comment": "frogs"}, [2]),
+        ({"method": "nonesuch"}, []),
+        ({"params": (5, 95)}, [4]),
+        ({}, [0, 1, 2, 4, 5, 6, 7]),
+    ),
+)
+def test_select(criteria, expected):
+    table = CellMethodsTable.from_strings(strings)
+    rows = table.select(**criteria)
+    assert table.entries(rows) == expected
+    cell_methods = [table.cell_method(row) for row in rows]
+    for cm in cell_methods:
+        for column in ("name", "where", "over", "within"):
+            if column in criteria:
+                assert getattr(cm, column) == criteria[column]
+
+
+@pytest.mark.parametrize("column", ("interval", "extra_info", "nonesuch"))
+def test_select_bad_column(column):
+    with pytest.raises(ValueError):
+        CellMethodsTable().select(**{column: "x"})
+
+
+def test_row_entries():
+    table = CellMethodsTable.from_strings(strings)
+    assert list(table.row_entries()) == [0, 1, 1, 1, 1, 2, 4, 5, 6, 7]
+
+
+def test_index_invalidated_by_append():
+    table = CellMethodsTable.from_strings(strings)
+    assert table.entries(table.select(name="models")) == [1, 7]
+    table.append(parse("models: mean"))
+    assert table.entries(table.select(name="models")) == [1, 7, 8]
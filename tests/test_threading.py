@@ -0,0 +1,63 @@
+"""
+Stress tests of concurrent parsing: results from many threads must agree
+with serial results.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from cf_cell_methods import parse, cached_parse, parse_many
+from cf_cell_methods.cache import ParseCache
+
+
+strings = [
+    f"time: mean within days time: max over days "
+    f"time: mean over days models: percentile[{i}]"
+    for i in range(50)
+] + [
+    "time: mean",
+    "area: mean where sea_ice over sea (interval: 2 km comment: frogs)",
+    "lon: median (frogs) lat: standard_deviation",
+    "explode my head",
+]
+
+
+def hammer(func, n_threads=8, repeats=5):
+    """Apply `func` to all strings from `n_threads` threads concurrently."""
+    barrier = threading.Barrier(n_threads)
+
+    def work(offset):
+        barrier.wait()
+        results = {}
+        for i in range(repeats * len(strings)):
+            string = strings[(offset + i) % len(strings)]
+            result = func(string)
+            if results.setdefault(string, result) != result:
+                return string
+        return results
+
+    with ThreadPoolExecutor(n_threads) as executor:
+        return list(executor.map(work, range(n_threads)))
+
+
+@pytest.mark.parametrize(
+    "func",
+    (
+        parse,
+        lambda s: parse(s, engine="fast"),
+        cached_parse,
+        ParseCache(maxsize=7),
+        lambda s: parse_many([s, s])[1],
+    ),
+)
+def test_concurrent_parse(func):
+    expected = {string: parse(string) for string in strings}
+    for results in hammer(func):
+        assert results == expected
+
+
+def test_concurrent_cache_stats():
+    cache = ParseCache(maxsize=len(strings))
+    hammer(cache, n_threads=4, repeats=5)
+    hits, misses, maxsize, currsize = cache.stats()
+    assert hits + misses == 4 * 5 * len(strings)
+    assert currsize == len(strings)